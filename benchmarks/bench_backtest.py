@@ -0,0 +1,77 @@
+"""
+Compare the events/second of a backtest run through the threaded Control queue against the in thread BacktestDriver
+
+Usage: python benchmarks/bench_backtest.py [EVENTS]
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from threading import Thread
+
+from peoples_advisor.backtest.common.common import BacktestDriver
+from peoples_advisor.backtest.common.history import HistoryWriter, history_events
+from peoples_advisor.backtest.oanda.oanda_backtest import OandaBacktestingGen
+from peoples_advisor.control.control import Control
+from peoples_advisor.event.event import ExitEvent, PriceEvent, QuoteEvent, StartEvent
+from peoples_advisor.strategy.example_strategy import TestSignalStrategy, TestSizingStrategy
+
+INSTRUMENTS = ["EUR_USD", "GBP_USD", "EUR_JPY", "USD_JPY"]
+
+
+def write_sample(path: Path, events: int):
+    start = datetime(2021, 1, 1)
+    with HistoryWriter(path) as writer:
+        for i in range(events):
+            instrument = INSTRUMENTS[i % len(INSTRUMENTS)]
+            event_class = QuoteEvent if instrument == "USD_JPY" else PriceEvent
+            bid = Decimal(100000 + i % 1000).scaleb(-5)
+            writer.write(event_class(instrument, start + timedelta(seconds=5 * (i // 4)), bid, bid + Decimal("0.0001")))
+
+
+def queued(path: Path):
+    sig_strategy, size_strategy = TestSignalStrategy(), TestSizingStrategy()
+    control = Control(sig_strategy, size_strategy, backtesting=True)
+    control_thread = Thread(target=control.run, daemon=True)
+    control_thread.start()
+    control.queue_event(StartEvent())
+    control.run_flag.wait()
+    for _ in OandaBacktestingGen(control.events, control.run_flag, path).gen():
+        pass
+    # Wait for Control to drain the queue, Control only leaves its loop on an exit event
+    control.events.join()
+    control.queue_event(ExitEvent())
+    control_thread.join()
+    return sig_strategy.ticks, size_strategy.ticks
+
+
+def direct(path: Path):
+    sig_strategy, size_strategy = TestSignalStrategy(), TestSizingStrategy()
+    for _ in BacktestDriver(sig_strategy, size_strategy).run(history_events(path)):
+        pass
+    return sig_strategy.ticks, size_strategy.ticks
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "sample.hist"
+        write_sample(path, events)
+        results = {}
+        for label, backtest in (("queued", queued), ("direct", direct)):
+            # Control prints every price it handles, which would otherwise dominate the queued timing
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                start = time.perf_counter()
+                results[label] = backtest(path)
+                elapsed = time.perf_counter() - start
+            print(f"{label:>6}: {events / elapsed:12,.0f} events/second ({elapsed:.2f}s)")
+        prices, signals = results["direct"]
+        print(f"prices: {prices:,}, signals: {signals:,}, identical: {results['queued'] == results['direct']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compare the ticks/second of filling conditional orders by calling trigger on every pending order for every tick
+against the price sorted ladders of the SimulatedBroker, with thousands of orders resting
+
+Usage: python benchmarks/bench_broker.py [ORDERS] [TICKS]
+"""
+import random
+import sys
+import time
+from decimal import Decimal
+
+from peoples_advisor.backtest.common.broker import SimulatedBroker
+from peoples_advisor.common.fixed_price import FixedPrice
+from peoples_advisor.event.event import PriceEvent
+from peoples_advisor.order.forex.common.common import LimitOrder, StopLossOrder, StopOrder, TakeProfitOrder
+
+ORDER_CLASSES = [LimitOrder, StopOrder, TakeProfitOrder, StopLossOrder]
+
+
+def sample(orders: int, ticks: int):
+    rng = random.Random(19)
+    book = []
+    for _ in range(orders):
+        units = rng.choice([-1, 1]) * rng.randrange(1, 1000)
+        trigger = Decimal(117500 + rng.randrange(-5000, 5000)) / 100000
+        book.append(rng.choice(ORDER_CLASSES)("EUR_USD", units, trigger))
+    prices, mid = [], 117500
+    for i in range(ticks):
+        mid += rng.randrange(-3, 4)
+        prices.append(PriceEvent("EUR_USD", i, FixedPrice(mid, 5), FixedPrice(mid + 12, 5)))
+    return book, prices
+
+
+def scan(book, prices):
+    # Every pending order asked whether each price triggers it
+    pending = dict(enumerate(book))
+    fills = 0
+    for price in prices:
+        ask, bid = price.ask.decimal, price.bid.decimal
+        triggered = [order_id for order_id, order in pending.items() if order.trigger(ask if order.units > 0 else bid)]
+        for order_id in triggered:
+            del pending[order_id]
+        fills += len(triggered)
+    return fills
+
+
+def ladders(book, prices):
+    broker = SimulatedBroker()
+    for order in book:
+        broker.submit(order)
+    return sum(len(broker.update_price(price)) for price in prices)
+
+
+def main():
+    orders = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    book, prices = sample(orders, count)
+    scanned_count = max(count // 50, 1)
+    start = time.perf_counter()
+    scanned = scan(book, prices[:scanned_count])
+    scan_time = time.perf_counter() - start
+    start = time.perf_counter()
+    laddered = ladders(book, prices)
+    ladder_time = time.perf_counter() - start
+    print(f"trigger scan: {scanned_count / scan_time:10,.0f} ticks/second ({scanned_count:,} ticks, {scanned:,} fills)")
+    print(f"ladders:      {count / ladder_time:10,.0f} ticks/second ({count:,} ticks, {laddered:,} fills)")
+    print(f"fills agree over the first {scanned_count:,} ticks: {scanned == ladders(book, prices[:scanned_count])}")
+
+
+if __name__ == "__main__":
+    main()
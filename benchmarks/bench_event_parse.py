@@ -0,0 +1,90 @@
+"""
+Compare the lines/second of the eval based event parser against the table driven parser
+
+Usage: python benchmarks/bench_event_parse.py [LINES]
+"""
+import sys
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+# The legacy parser evals class names, so every event class must be importable from this module
+from peoples_advisor.event.event import (
+    PriceEvent,
+    QuoteEvent,
+    SignalEvent,
+    StartEvent,
+    StopEvent,
+    ExitEvent,
+    event_from_repr,
+    events_from_reprs,
+)
+
+INSTRUMENTS = ["EUR_USD", "GBP_USD", "EUR_JPY", "USD_JPY"]
+
+
+def legacy_event_from_repr(repr_string):
+    # The parser as it was before the dispatch table, kept here as the baseline
+    repr_string = repr_string.replace("\n", "")
+    event_type = repr_string.split(",")[0].title() + "Event"
+    return eval(f"{event_type}.from_repr('{repr_string}')")
+
+
+def write_sample(path: Path, lines: int):
+    start = int(datetime(2021, 1, 1).timestamp())
+    with open(path, "w") as f:
+        for i in range(lines):
+            instrument = INSTRUMENTS[i % len(INSTRUMENTS)]
+            event_type = "PRICE" if instrument != "USD_JPY" else "QUOTE"
+            bid = Decimal(110000 + i % 997).scaleb(-3 if "JPY" in instrument else -5)
+            f.write(f"{event_type},{instrument},{start + 5 * (i // len(INSTRUMENTS))},{bid},{bid}\n")
+
+
+def run(label, parse, path: Path, lines: int):
+    begin = time.perf_counter()
+    count = parse(path)
+    elapsed = time.perf_counter() - begin
+    assert count == lines
+    print(f"{label:<24}{lines / elapsed:>14,.0f} lines/second ({elapsed:.2f}s)")
+
+
+def parse_legacy(path):
+    count = 0
+    with open(path) as f:
+        for line in f:
+            legacy_event_from_repr(line)
+            count += 1
+    return count
+
+
+def parse_lines(path):
+    count = 0
+    with open(path) as f:
+        for line in f:
+            event_from_repr(line)
+            count += 1
+    return count
+
+
+def parse_blocks(path):
+    count = 0
+    with open(path) as f:
+        while True:
+            lines = f.readlines(1 << 20)
+            if not lines:
+                break
+            count += len(events_from_reprs(lines))
+    return count
+
+
+if __name__ == "__main__":
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "sample.txt"
+        write_sample(path, lines)
+        print(f"Parsing {lines:,} lines")
+        run("eval (legacy)", parse_legacy, path, lines)
+        run("event_from_repr", parse_lines, path, lines)
+        run("events_from_reprs", parse_blocks, path, lines)
@@ -0,0 +1,60 @@
+"""
+Compare the memory per event and the events/second of the slotted PriceEvent against the previous __dict__ based one
+
+Usage: python benchmarks/bench_events.py [EVENTS]
+"""
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+
+from peoples_advisor.event.event import PriceEvent
+
+INSTRUMENTS = ["EUR_USD", "GBP_USD", "EUR_JPY", "USD_JPY"]
+
+
+class LegacyPriceEvent:
+    # The event as it was before slots, kept here as the baseline
+    def __init__(self, instrument, time, bid, ask):
+        self.priority = 4
+        self.type = "PRICE"
+        self.instrument = instrument
+        self.time = time
+        self.bid = bid
+        self.ask = ask
+
+
+def fields(count: int):
+    # Instrument names are rebuilt for every event, as they are when decoded from a stream or a file
+    time = datetime(2021, 1, 1)
+    bid, ask = Decimal("1.12345"), Decimal("1.12355")
+    return [("".join(INSTRUMENTS[i % len(INSTRUMENTS)]), time, bid, ask) for i in range(count)]
+
+
+def measure(event_class, count: int):
+    rows = fields(count)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    events = [event_class(*row) for row in rows]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del events
+
+    start = time.perf_counter()
+    events = [event_class(*row) for row in rows]
+    elapsed = time.perf_counter() - start
+    del events
+    return allocated / count, count / elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    for label, event_class in (("dict", LegacyPriceEvent), ("slots", PriceEvent)):
+        per_event, rate = measure(event_class, count)
+        print(f"{label:>5}: {per_event:6.1f} bytes/event, {rate:12,.0f} events/second")
+
+
+if __name__ == "__main__":
+    main()
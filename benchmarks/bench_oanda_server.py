@@ -0,0 +1,53 @@
+"""
+Measure OandaApi against the local OANDA stand-in server: REST call and order latency, candle download throughput
+with the round trip latency of a real connection, and the ticks/second pricing_records decodes off the stream
+
+Usage: python benchmarks/bench_oanda_server.py [LATENCY_SECONDS]
+"""
+import itertools
+import sys
+import time
+
+from peoples_advisor.api.oanda.oanda_api import MarketOrderRequest
+from peoples_advisor.api.oanda.oanda_server import OandaStandInServer
+
+START = 1617235200
+
+
+def timed_calls(call, count: int):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.02
+    with OandaStandInServer(ticks_per_second=None) as server:
+        api = server.api(datetime_format="UNIX")
+        p50, p99 = timed_calls(api.get_account_summary, 500)
+        print(f"account summary           p50 {p50 * 1e3:7.2f} ms  p99 {p99 * 1e3:7.2f} ms")
+        p50, p99 = timed_calls(lambda: api.create_order(MarketOrderRequest("EUR_USD", 100)), 500)
+        print(f"market order              p50 {p50 * 1e3:7.2f} ms  p99 {p99 * 1e3:7.2f} ms")
+
+        for delay in (0.0, latency):
+            server.latency = delay
+            start = time.perf_counter()
+            pages = api.get_instrument_candles_in_range("EUR_USD", f"{START}", f"{START + 7 * 86400}", granularity="S5")
+            candles = sum(1 for _ in pages)
+            elapsed = time.perf_counter() - start
+            print(f"candles in range, {delay * 1e3:4.0f} ms  {candles / elapsed:12,.0f} candles/s  ({candles} candles)")
+        server.latency = 0.0
+
+        ticks = 200_000
+        start = time.perf_counter()
+        for _ in itertools.islice(api.pricing_records(["EUR_USD", "GBP_USD", "USD_JPY"]), ticks):
+            pass
+        print(f"pricing_records           {ticks / (time.perf_counter() - start):12,.0f} ticks/s")
+
+
+if __name__ == "__main__":
+    main()
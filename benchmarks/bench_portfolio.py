@@ -0,0 +1,102 @@
+"""
+Compare the ticks/second of a Portfolio holding thousands of positions, reading its equity, free margin and margin
+level after every tick, when those are recomputed from every lot (as the properties used to be) against the
+aggregates the Portfolio keeps up to date
+
+Usage: python benchmarks/bench_portfolio.py [POSITIONS] [TICKS]
+"""
+
+import random
+import sys
+import time
+from decimal import Decimal
+
+from peoples_advisor.common.fixed_price import FixedPrice
+from peoples_advisor.event.event import PriceEvent
+from peoples_advisor.portfolio.forex.common.common import Portfolio
+
+MIDS = {"EUR_USD": 1.175, "GBP_USD": 1.38, "USD_JPY": 110.1, "EUR_GBP": 0.851, "AUD_USD": 0.76, "USD_CAD": 1.25}
+RATES = {instrument: Decimal("0.02") for instrument in MIDS}
+
+
+def sample_ticks(count: int):
+    rng = random.Random(11)
+    mids = dict(MIDS)
+    ticks = []
+    for _ in range(count):
+        instrument = rng.choice(list(mids))
+        mids[instrument] *= 1 + rng.gauss(0, 0.0002)
+        places = 3 if "JPY" in instrument else 5
+        bid = round(mids[instrument] * 10**places)
+        ticks.append(PriceEvent(instrument, 0, FixedPrice(bid, places), FixedPrice(bid + 12, places)))
+    return ticks
+
+
+def sample_portfolio(positions: int) -> Portfolio:
+    rng = random.Random(13)
+    portfolio = Portfolio(Decimal(100000), "USD", RATES, list(MIDS))
+    for price in sample_ticks(len(MIDS) * 20):
+        portfolio.update_price(price)
+    for _ in range(positions):
+        instrument = rng.choice(list(MIDS))
+        price = portfolio.prices[instrument]
+        units = Decimal(rng.choice([-1, 1]) * rng.randrange(1, 10000))
+        portfolio.add_position(instrument, units, price["ask"] if units > 0 else price["bid"])
+    return portfolio
+
+
+def recomputed_reads(portfolio: Portfolio):
+    # The equity, free margin and margin level with every lot valued again on each read
+    def unrealized_pl():
+        unrealized = Decimal(0)
+        for instrument, positions in portfolio.positions.items():
+            price = portfolio.prices[instrument]
+            quote = portfolio.quote_currency(instrument)
+            for units, entry in positions:
+                profit = units * ((price["bid"] if units > 0 else price["ask"]) - entry)
+                unrealized += portfolio._convert(portfolio.home_cur, quote, profit)
+        return unrealized
+
+    def used_margin():
+        margin = Decimal(0)
+        for instrument, positions in portfolio.positions.items():
+            for units, _ in positions:
+                margin += portfolio.required_margin(instrument, units)
+        return margin
+
+    equity = portfolio.balance + unrealized_pl()
+    free_margin = equity - used_margin()
+    margin_level = (portfolio.balance + unrealized_pl()) / used_margin() * 100
+    return equity, free_margin, margin_level
+
+
+def main():
+    positions = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    ticks = sample_ticks(count)
+
+    portfolio = sample_portfolio(positions)
+    recomputed_count = max(count // 100, 1)
+    start = time.perf_counter()
+    for price in ticks[:recomputed_count]:
+        portfolio.update_price(price)
+        recomputed = recomputed_reads(portfolio)
+    recomputed_time = time.perf_counter() - start
+
+    portfolio = sample_portfolio(positions)
+    start = time.perf_counter()
+    for price in ticks:
+        portfolio.update_price(price)
+        incremental = portfolio.equity, portfolio.free_margin, portfolio.margin_level
+    incremental_time = time.perf_counter() - start
+
+    print(f"recomputed:  {recomputed_count / recomputed_time:12,.0f} ticks/second ({recomputed_count:,} ticks)")
+    print(f"incremental: {count / incremental_time:12,.0f} ticks/second ({count:,} ticks)")
+    print(
+        f"positions: {positions:,}, final equity: {incremental[0]:.2f}, "
+        f"recomputed after {recomputed_count:,}: {recomputed[0]:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
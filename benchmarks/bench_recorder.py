@@ -0,0 +1,49 @@
+"""
+Compare the time the pricing thread spends per tick saving live prices, writing and flushing every repr as
+OandaPricingGen used to against handing the event to a TickRecorder
+
+Usage: python benchmarks/bench_recorder.py [TICKS]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from peoples_advisor.common.fixed_price import FixedPrice
+from peoples_advisor.event.event import PriceEvent
+from peoples_advisor.price.common.recorder import TickRecorder
+
+
+def sample_events(count: int):
+    start = 1_617_278_400 * 1_000_000_000
+    return [
+        PriceEvent("EUR_USD", start + i * 250_000_000, FixedPrice(117500 + i % 50, 5), FixedPrice(117514 + i % 50, 5))
+        for i in range(count)
+    ]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    events = sample_events(count)
+    with tempfile.TemporaryDirectory() as directory:
+        with open(Path(directory) / "flushed.txt", "w") as f:
+            start = time.perf_counter()
+            for event in events:
+                f.write(repr(event) + "\n")
+                f.flush()
+            flushed = time.perf_counter() - start
+        recorder = TickRecorder(Path(directory) / "recorded")
+        start = time.perf_counter()
+        for event in events:
+            recorder.record(event)
+        recorded = time.perf_counter() - start
+        start = time.perf_counter()
+        recorder.close()
+        closed = time.perf_counter() - start
+    print(f"write+flush: {flushed / count * 1e9:8,.0f} ns/tick on the pricing thread")
+    print(f"recorder:    {recorded / count * 1e9:8,.0f} ns/tick on the pricing thread, {closed:.2f}s to drain on close")
+    print(f"recorded: {recorder.count:,}, dropped: {recorder.dropped:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Measure the time from interpreter start to a constructed CLI, and which heavy modules that pulls in
+
+The deferred row also imports the broker modules the CLI used to import eagerly, to show what startup no longer pays
+for. Neither row includes network time, which startup used to spend fetching accounts and instruments.
+
+Usage: python benchmarks/bench_startup.py [RUNS]
+"""
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ["requests", "peoples_advisor.api.oanda.oanda_api", "peoples_advisor.backtest.oanda.oanda_backtest"]
+
+STARTUP = """
+import json, sys, time
+start = time.perf_counter()
+from peoples_advisor.cli.cli import CLI
+cli = CLI()
+{deferred}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "modules": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+DEFERRED = """
+import peoples_advisor.backtest.oanda.oanda_backtest
+import peoples_advisor.price.oanda.oanda_price
+"""
+
+
+def measure(deferred: bool, runs: int):
+    code = STARTUP.format(deferred=DEFERRED if deferred else "", heavy=HEAVY_MODULES)
+    times, modules = [], []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], stdin=subprocess.DEVNULL, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result["elapsed"])
+        modules = result["modules"]
+    return statistics.median(times), modules
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for label, deferred in (("startup", False), ("startup + deferred", True)):
+        median, modules = measure(deferred, runs)
+        print(f"{label:>20}: {median * 1000:7.1f} ms median of {runs} runs, heavy modules: {modules or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
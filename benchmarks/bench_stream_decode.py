@@ -0,0 +1,83 @@
+"""
+Compare the ticks/second decoded from pricing stream lines by the old json.loads of every line against the
+PricingStreamDecoder, with the standard library json, with orjson (when installed) and with its scanning fast path
+
+Usage: python benchmarks/bench_stream_decode.py [LINES]
+"""
+import json
+import random
+import sys
+import time
+
+from peoples_advisor.api.oanda.oanda_stream import PricingStreamDecoder
+
+INSTRUMENTS = ["EUR_USD", "GBP_USD", "EUR_JPY", "USD_JPY"]
+
+
+def sample_lines(count: int):
+    # Pricing stream lines as OANDA sends them, with a heartbeat every 20 lines
+    rng = random.Random(3)
+    lines = []
+    for i in range(count):
+        time_str = f"2021-04-01T12:{i // 6000 % 60:02d}:{i // 100 % 60:02d}.{i % 1000000:06d}123Z"
+        if i % 20 == 19:
+            lines.append(json.dumps({"type": "HEARTBEAT", "time": time_str}, separators=(",", ":")).encode())
+            continue
+        instrument = INSTRUMENTS[i % len(INSTRUMENTS)]
+        places = 3 if "JPY" in instrument else 5
+        bid = rng.uniform(1, 2) * (100 if "JPY" in instrument else 1)
+        ask = bid + 10**-places * 14
+        price = {
+            "type": "PRICE",
+            "time": time_str,
+            "bids": [{"price": f"{bid:.{places}f}", "liquidity": 1000000}, {"price": "1.0", "liquidity": 2000000}],
+            "asks": [{"price": f"{ask:.{places}f}", "liquidity": 1000000}, {"price": "2.0", "liquidity": 2000000}],
+            "closeoutBid": f"{bid:.{places}f}",
+            "closeoutAsk": f"{ask:.{places}f}",
+            "status": "tradeable",
+            "tradeable": True,
+            "instrument": instrument,
+        }
+        lines.append(json.dumps(price, separators=(",", ":")).encode())
+    return lines
+
+
+def legacy(lines):
+    # The decoding pricing_stream and OandaPricingGen did before, kept here as the baseline
+    ticks = 0
+    for line in lines:
+        price = json.loads(line.decode("utf-8"))
+        if price.get("type") and price.get("type") == "PRICE" and price.get("tradeable"):
+            price.pop("status")
+            fields = (price["instrument"], price["time"], price["bids"][0]["price"], price["asks"][0]["price"])
+            ticks += fields is not None
+    return ticks
+
+
+def decoder(**kwargs):
+    def decode(lines):
+        return sum(1 for _ in PricingStreamDecoder(**kwargs).decode_lines(lines))
+
+    return decode
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    lines = sample_lines(count)
+    rows = [("legacy", legacy), ("json", decoder(scan=False, loads=json.loads))]
+    try:
+        import orjson
+
+        rows.append(("orjson", decoder(scan=False, loads=orjson.loads)))
+    except ImportError:
+        print("orjson is not installed, skipping its row")
+    rows.append(("scan", decoder()))
+    for label, decode in rows:
+        start = time.perf_counter()
+        ticks = decode(lines)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>6}: {ticks / elapsed:12,.0f} ticks/second ({ticks:,} ticks in {elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Measure what supervising the pricing stream costs per tick and what it keeps through network blips, reading the
+local OANDA stand-in server: ticks/second of pricing_records against SupervisedPricingStream on a steady stream, then
+the ticks and reconnects of a supervised stream that keeps being dropped or stalled
+
+Usage: python benchmarks/bench_supervised_stream.py [SECONDS]
+"""
+import sys
+import time
+
+from peoples_advisor.api.oanda.oanda_server import OandaStandInServer
+from peoples_advisor.api.oanda.oanda_supervisor import SupervisedPricingStream
+
+INSTRUMENTS = ["EUR_USD", "GBP_USD", "USD_JPY"]
+
+
+def read_for(records, seconds: float) -> int:
+    count = 0
+    end = time.perf_counter() + seconds
+    for _ in records:
+        count += 1
+        if not count % 1000 and time.perf_counter() >= end:
+            break
+    return count
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    with OandaStandInServer(ticks_per_second=None) as server:
+        api = server.api()
+        ticks = read_for(api.pricing_records(INSTRUMENTS), seconds)
+        print(f"pricing_records            {ticks / seconds:12,.0f} ticks/s")
+        ticks = read_for(SupervisedPricingStream(api, INSTRUMENTS), seconds)
+        print(f"SupervisedPricingStream    {ticks / seconds:12,.0f} ticks/s")
+
+        # A paced stream that every connection loses after 2,000 prices, by dropping it or by going silent
+        server.ticks_per_second = 2000
+        server.heartbeat_interval = 0.05
+        for blip in ("dropped", "stalled"):
+            server.stream_disconnect_after = 2000 if blip == "dropped" else None
+            server.stream_stall_after = 2000 if blip == "stalled" else None
+            stream = SupervisedPricingStream(api, INSTRUMENTS, heartbeat_timeout=0.2, backoff=0.05)
+            start = time.perf_counter()
+            ticks = read_for(stream, seconds)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{blip} every 2,000 prices  {ticks / elapsed:9,.0f} ticks/s  {stream.reconnects} reconnects  "
+                f"{stream.backfilled} backfilled  {stream.downtime:.2f} s reconnecting"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
-from peoples_advisor.api.oanda.oanda_api import OandaApi
+import hashlib
+from pathlib import Path
+
+from peoples_advisor.api.instrument_cache import InstrumentCache
 from peoples_advisor.settings import (
     BROKER,
     API_TOKEN,
@@ -7,9 +10,33 @@ from peoples_advisor.settings import (
     DATETIME_FORMAT,
 )
 
+instrument_cache_path = Path(__file__).parents[1] / "data" / "instruments.json"
+instrument_cache_ttl = 86400
+
+_instrument_cache = None
+
 
 def get_api():
     if BROKER == "OANDA":
+        from peoples_advisor.api.oanda.oanda_api import OandaApi
+
         return OandaApi(API_TOKEN, LIVE, ACCOUNT_INDEX, DATETIME_FORMAT)
     else:
         return None
+
+
+def get_instrument_cache():
+    """
+    Get the instrument metadata cache shared by the whole process
+    """
+    global _instrument_cache
+    if _instrument_cache is None and BROKER == "OANDA":
+        # The token is hashed so a cache written for another account is never reused, without storing the token
+        account = hashlib.sha256(f"{API_TOKEN}:{LIVE}:{ACCOUNT_INDEX}".encode("utf-8")).hexdigest()
+        _instrument_cache = InstrumentCache(
+            lambda: get_api().get_account_instruments()["instruments"],
+            ttl=instrument_cache_ttl,
+            path=instrument_cache_path,
+            key=account,
+        )
+    return _instrument_cache
@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+# The instrument fields kept by the cache, everything else returned by the broker is dropped
+cached_fields = ("name", "type", "displayName", "pipLocation", "displayPrecision", "marginRate")
+
+
+class InstrumentCache:
+    def __init__(
+        self,
+        loader: Callable[[], List[dict]],
+        ttl: Optional[float] = 86400,
+        path: Union[str, Path] = None,
+        key: str = "",
+    ):
+        """
+        A process wide cache of the instruments tradable by an account, refreshed once it is older than ttl
+
+        Args:
+            loader (Callable[[], List[dict]]): Fetches the account instruments from the broker
+                see Instrument in oanda_guide.txt
+            ttl (float, optional): The number of seconds the instruments are trusted for, None to never refresh
+            path (str, Path, optional): A json file to persist the instruments to, so they outlive the process
+            key (str, optional): Identifies the account the instruments belong to
+                A persisted file written for a different key is ignored
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.path = Path(path) if path else None
+        self.key = key
+        self._lock = threading.Lock()
+        self._instruments: Optional[Dict[str, dict]] = None
+        self._fetched = 0.0
+        self._load()
+
+    def instruments(self) -> Dict[str, dict]:
+        """
+        Get the metadata of every instrument by name, fetching it if the cache is empty or expired
+        """
+        with self._lock:
+            if self._instruments is None or self._expired():
+                self._refresh()
+            return self._instruments
+
+    def names(self) -> List[str]:
+        return list(self.instruments())
+
+    def margin_rate(self, instrument: str) -> Decimal:
+        return Decimal(self.instruments()[instrument]["marginRate"])
+
+    def pip_location(self, instrument: str) -> int:
+        return int(self.instruments()[instrument]["pipLocation"])
+
+    def display_precision(self, instrument: str) -> int:
+        return int(self.instruments()[instrument]["displayPrecision"])
+
+    def invalidate(self):
+        with self._lock:
+            self._instruments = None
+
+    def _expired(self) -> bool:
+        return self.ttl is not None and time.time() - self._fetched >= self.ttl
+
+    def _refresh(self):
+        # Must be called while holding the lock
+        instruments = {}
+        for instrument in self.loader():
+            instruments[instrument["name"]] = {field: instrument.get(field) for field in cached_fields}
+        self._instruments = instruments
+        self._fetched = time.time()
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(".tmp")
+            with open(temp_path, "w") as f:
+                json.dump({"key": self.key, "fetched": self._fetched, "instruments": instruments}, f)
+            temp_path.replace(self.path)
+
+    def _load(self):
+        if self.path is None or not self.path.is_file():
+            return
+        try:
+            with open(self.path) as f:
+                persisted = json.load(f)
+        except (OSError, ValueError):
+            return
+        if persisted.get("key") == self.key:
+            self._instruments = persisted["instruments"]
+            self._fetched = persisted["fetched"]
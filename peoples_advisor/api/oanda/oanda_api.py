@@ -3,7 +3,10 @@ import json
 from datetime import datetime
 from typing import List, Optional, Union
 
-import requests
+from peoples_advisor.api.oanda.oanda_prefetch import CandlePrefetcher
+from peoples_advisor.api.oanda.oanda_session import CallMetrics, OandaSession
+from peoples_advisor.api.oanda.oanda_stream import PricingStreamDecoder
+from peoples_advisor.common.timestamps import time_to_ns
 
 api_version = "v3"
 practice_url = "https://api-fxpractice.oanda.com"
@@ -17,9 +20,17 @@ def _conditional_update(store_dict, condition, key, value):
         store_dict.update({key: value})
 
 
+def _conditional_details(store_dict, details, key):
+    # Only call as_dict on details that were given
+    if details is not None:
+        store_dict[key] = details.as_dict()
+
+
 class OandaError(Exception):
-    def __init__(self, message="Null Message"):
+    def __init__(self, message="Null Message", status: Optional[int] = None):
         super().__init__(message)
+        # The http status of the response, for errors the api responded with
+        self.status = status
 
 
 class ClientExtensions:
@@ -302,42 +313,12 @@ class MarketOrderRequest(OrderRequest):
             "positionFill": self.position_fill,
         }
         _conditional_update(mor_dict, self.price_floor, "priceBound", str(self.price_floor))
-        _conditional_update(
-            mor_dict,
-            self.take_profit_on_fill,
-            "takeProfitOnFill",
-            self.take_profit_on_fill.as_dict(),
-        )
-        _conditional_update(
-            mor_dict,
-            self.stop_loss_on_fill,
-            "stopLossOnFill",
-            self.stop_loss_on_fill.as_dict(),
-        )
-        _conditional_update(
-            mor_dict,
-            self.guaranteed_stop_loss_on_fill,
-            "guaranteedStopLossOnFill",
-            self.guaranteed_stop_loss_on_fill.as_dict(),
-        )
-        _conditional_update(
-            mor_dict,
-            self.trailing_stop_loss_on_fill,
-            "trailingStopLossOnFill",
-            self.trailing_stop_loss_on_fill.as_dict(),
-        )
-        _conditional_update(
-            mor_dict,
-            self.client_extensions,
-            "clientExtensions",
-            self.client_extensions.as_dict(),
-        )
-        _conditional_update(
-            mor_dict,
-            self.trade_client_extensions,
-            "tradeClientExtensions",
-            self.trade_client_extensions.as_dict(),
-        )
+        _conditional_details(mor_dict, self.take_profit_on_fill, "takeProfitOnFill")
+        _conditional_details(mor_dict, self.stop_loss_on_fill, "stopLossOnFill")
+        _conditional_details(mor_dict, self.guaranteed_stop_loss_on_fill, "guaranteedStopLossOnFill")
+        _conditional_details(mor_dict, self.trailing_stop_loss_on_fill, "trailingStopLossOnFill")
+        _conditional_details(mor_dict, self.client_extensions, "clientExtensions")
+        _conditional_details(mor_dict, self.trade_client_extensions, "tradeClientExtensions")
         return mor_dict
 
 
@@ -423,42 +404,12 @@ class LimitOrderRequest(OrderRequest):
         if self.time_in_force == "GTD" and self.gtd_time is None:
             raise OandaError("Invalid GTD time provided. If time_in_force is GTD, you must specify a proper GTD time")
         _conditional_update(lor_dict, self.time_in_force == "GTD", "gtdTime", self.gtd_time)
-        _conditional_update(
-            lor_dict,
-            self.take_profit_on_fill,
-            "takeProfitOnFill",
-            self.take_profit_on_fill.as_dict(),
-        )
-        _conditional_update(
-            lor_dict,
-            self.stop_loss_on_fill,
-            "stopLossOnFill",
-            self.stop_loss_on_fill.as_dict(),
-        )
-        _conditional_update(
-            lor_dict,
-            self.guaranteed_stop_loss_on_fill,
-            "guaranteedStopLossOnFill",
-            self.guaranteed_stop_loss_on_fill.as_dict(),
-        )
-        _conditional_update(
-            lor_dict,
-            self.trailing_stop_loss_on_fill,
-            "trailingStopLossOnFill",
-            self.trailing_stop_loss_on_fill.as_dict(),
-        )
-        _conditional_update(
-            lor_dict,
-            self.client_extensions,
-            "clientExtensions",
-            self.client_extensions.as_dict(),
-        )
-        _conditional_update(
-            lor_dict,
-            self.trade_client_extensions,
-            "tradeClientExtensions",
-            self.trade_client_extensions.as_dict(),
-        )
+        _conditional_details(lor_dict, self.take_profit_on_fill, "takeProfitOnFill")
+        _conditional_details(lor_dict, self.stop_loss_on_fill, "stopLossOnFill")
+        _conditional_details(lor_dict, self.guaranteed_stop_loss_on_fill, "guaranteedStopLossOnFill")
+        _conditional_details(lor_dict, self.trailing_stop_loss_on_fill, "trailingStopLossOnFill")
+        _conditional_details(lor_dict, self.client_extensions, "clientExtensions")
+        _conditional_details(lor_dict, self.trade_client_extensions, "tradeClientExtensions")
         return lor_dict
 
 
@@ -549,42 +500,12 @@ class StopOrderRequest(OrderRequest):
             raise OandaError("Invalid GTD time provided. If time_in_force is GTD, you must specify a proper GTD time")
         _conditional_update(sor_dict, self.time_in_force == "GTD", "gtdTime", self.gtd_time)
         _conditional_update(sor_dict, self.price_floor, "priceBound", str(self.price_floor))
-        _conditional_update(
-            sor_dict,
-            self.take_profit_on_fill,
-            "takeProfitOnFill",
-            self.take_profit_on_fill.as_dict(),
-        )
-        _conditional_update(
-            sor_dict,
-            self.stop_loss_on_fill,
-            "stopLossOnFill",
-            self.stop_loss_on_fill.as_dict(),
-        )
-        _conditional_update(
-            sor_dict,
-            self.guaranteed_stop_loss_on_fill,
-            "guaranteedStopLossOnFill",
-            self.guaranteed_stop_loss_on_fill.as_dict(),
-        )
-        _conditional_update(
-            sor_dict,
-            self.trailing_stop_loss_on_fill,
-            "trailingStopLossOnFill",
-            self.trailing_stop_loss_on_fill.as_dict(),
-        )
-        _conditional_update(
-            sor_dict,
-            self.client_extensions,
-            "clientExtensions",
-            self.client_extensions.as_dict(),
-        )
-        _conditional_update(
-            sor_dict,
-            self.trade_client_extensions,
-            "tradeClientExtensions",
-            self.trade_client_extensions.as_dict(),
-        )
+        _conditional_details(sor_dict, self.take_profit_on_fill, "takeProfitOnFill")
+        _conditional_details(sor_dict, self.stop_loss_on_fill, "stopLossOnFill")
+        _conditional_details(sor_dict, self.guaranteed_stop_loss_on_fill, "guaranteedStopLossOnFill")
+        _conditional_details(sor_dict, self.trailing_stop_loss_on_fill, "trailingStopLossOnFill")
+        _conditional_details(sor_dict, self.client_extensions, "clientExtensions")
+        _conditional_details(sor_dict, self.trade_client_extensions, "tradeClientExtensions")
         return sor_dict
 
 
@@ -676,42 +597,12 @@ class MarketIfTouchedOrderRequest(OrderRequest):
             raise OandaError("Invalid GTD time provided. If time_in_force is GTD, you must specify a proper GTD time")
         _conditional_update(motor_dict, self.time_in_force == "GTD", "gtdTime", self.gtd_time)
         _conditional_update(motor_dict, self.price_floor, "priceBound", str(self.price_floor))
-        _conditional_update(
-            motor_dict,
-            self.take_profit_on_fill,
-            "takeProfitOnFill",
-            self.take_profit_on_fill.as_dict(),
-        )
-        _conditional_update(
-            motor_dict,
-            self.stop_loss_on_fill,
-            "stopLossOnFill",
-            self.stop_loss_on_fill.as_dict(),
-        )
-        _conditional_update(
-            motor_dict,
-            self.guaranteed_stop_loss_on_fill,
-            "guaranteedStopLossOnFill",
-            self.guaranteed_stop_loss_on_fill.as_dict(),
-        )
-        _conditional_update(
-            motor_dict,
-            self.trailing_stop_loss_on_fill,
-            "trailingStopLossOnFill",
-            self.trailing_stop_loss_on_fill.as_dict(),
-        )
-        _conditional_update(
-            motor_dict,
-            self.client_extensions,
-            "clientExtensions",
-            self.client_extensions.as_dict(),
-        )
-        _conditional_update(
-            motor_dict,
-            self.trade_client_extensions,
-            "tradeClientExtensions",
-            self.trade_client_extensions.as_dict(),
-        )
+        _conditional_details(motor_dict, self.take_profit_on_fill, "takeProfitOnFill")
+        _conditional_details(motor_dict, self.stop_loss_on_fill, "stopLossOnFill")
+        _conditional_details(motor_dict, self.guaranteed_stop_loss_on_fill, "guaranteedStopLossOnFill")
+        _conditional_details(motor_dict, self.trailing_stop_loss_on_fill, "trailingStopLossOnFill")
+        _conditional_details(motor_dict, self.client_extensions, "clientExtensions")
+        _conditional_details(motor_dict, self.trade_client_extensions, "tradeClientExtensions")
         return motor_dict
 
 
@@ -768,12 +659,7 @@ class TakeProfitOrderRequest(OrderRequest):
             raise OandaError("Invalid GTD time provided. If time_in_force is GTD, you must specify a proper GTD time")
         _conditional_update(tpor_dict, self.time_in_force == "GTD", "gtdTime", self.gtd_time)
         _conditional_update(tpor_dict, self.client_trade_id, "clientTradeID", self.client_trade_id)
-        _conditional_update(
-            tpor_dict,
-            self.client_extensions,
-            "clientExtensions",
-            self.client_extensions.as_dict(),
-        )
+        _conditional_details(tpor_dict, self.client_extensions, "clientExtensions")
         return tpor_dict
 
 
@@ -840,12 +726,7 @@ class StopLossOrderRequest(OrderRequest):
         slor_dict.update({"distance": str(self.distance)} if self.distance else {})
         _conditional_update(slor_dict, self.time_in_force == "GTD", "gtdTime", self.gtd_time)
         _conditional_update(slor_dict, self.client_trade_id, "clientTradeID", self.client_trade_id)
-        _conditional_update(
-            slor_dict,
-            self.client_extensions,
-            "clientExtensions",
-            self.client_extensions.as_dict(),
-        )
+        _conditional_details(slor_dict, self.client_extensions, "clientExtensions")
         return slor_dict
 
 
@@ -914,12 +795,7 @@ class GuaranteedStopLossOrderRequest(OrderRequest):
         gslor_dict.update({"distance": str(self.distance)} if self.distance else {})
         _conditional_update(gslor_dict, self.time_in_force == "GTD", "gtdTime", self.gtd_time)
         _conditional_update(gslor_dict, self.client_trade_id, "clientTradeID", self.client_trade_id)
-        _conditional_update(
-            gslor_dict,
-            self.client_extensions,
-            "clientExtensions",
-            self.client_extensions.as_dict(),
-        )
+        _conditional_details(gslor_dict, self.client_extensions, "clientExtensions")
         return gslor_dict
 
 
@@ -977,12 +853,7 @@ class TrailingStopLossOrderRequest(OrderRequest):
         tslor_dict.update({"distance": str(self.distance)} if self.distance else {})
         _conditional_update(tslor_dict, self.time_in_force == "GTD", "gtdTime", self.gtd_time)
         _conditional_update(tslor_dict, self.client_trade_id, "clientTradeID", self.client_trade_id)
-        _conditional_update(
-            tslor_dict,
-            self.client_extensions,
-            "clientExtensions",
-            self.client_extensions.as_dict(),
-        )
+        _conditional_details(tslor_dict, self.client_extensions, "clientExtensions")
         return tslor_dict
 
 
@@ -993,6 +864,10 @@ class OandaApi:
         live: bool = False,
         account_index: Optional[int] = 0,
         datetime_format: Optional[str] = "RFC3339",
+        url: Optional[str] = None,
+        stream_url: Optional[str] = None,
+        pool_size: int = 10,
+        max_retries: int = 3,
     ):
         """
         Initialize the API for a specific account under the given api token.
@@ -1003,10 +878,19 @@ class OandaApi:
             account_index (int, optional): The account index to use, should the api token govern multiple accounts
             datetime_format (str, optional): The datetime format to use
                 see AcceptDatetimeFormat in oanda_guide.txt
+            url (str, optional): Override the base url of the REST api, ex. to point at a local test server
+            stream_url (str, optional): Override the base url of the streaming api
+            pool_size (int, optional): The number of keep-alive connections pooled for each host
+            max_retries (int, optional): The number of times a call is retried on 429 or 5xx responses
         """
         self.auth = auth
         self.live = live
         self.datetime_format = datetime_format
+        self.url = url if url else (live_url if live else practice_url)
+        self.stream_url = stream_url if stream_url else (live_stream_url if live else practice_stream_url)
+        self.session = OandaSession(auth, datetime_format, pool_size=pool_size, max_retries=max_retries)
+        # Set before the first call, which is the one that finds it
+        self.account_id = None
         self.account_id = self.get_accounts()["accounts"][account_index]["id"]
 
     def get_accounts(self) -> dict:
@@ -1019,13 +903,13 @@ class OandaApi:
         """
         Get account details for the account specified at API initialization
         """
-        return self._oanda_api_call("get", f"accounts/{self.account_id}")
+        return self._oanda_api_call("get", "accounts/{accountID}")
 
     def get_account_summary(self) -> dict:
         """
         Get a summary for the account associated with the API
         """
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/summary")
+        return self._oanda_api_call("get", "accounts/{accountID}/summary")
 
     def get_account_instruments(self, instruments: Optional[List[str]] = None) -> dict:
         """
@@ -1036,7 +920,7 @@ class OandaApi:
                 see InstrumentName in oanda_guide.txt
         """
         params = {"instruments": ",".join(instruments)} if instruments else None
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/instruments", params=params)
+        return self._oanda_api_call("get", "accounts/{accountID}/instruments", params=params)
 
     def get_account_changes(self, since_transaction: int) -> dict:
         """
@@ -1047,7 +931,7 @@ class OandaApi:
                 see TransactionID in oanda_guide.txt
         """
         params = {"sinceTransactionID": str(since_transaction)}
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/changes", params=params)
+        return self._oanda_api_call("get", "accounts/{accountID}/changes", params=params)
 
     def configure_account(self, alias: Optional[str] = None, margin_rate: Optional[float] = None) -> dict:
         """
@@ -1061,7 +945,7 @@ class OandaApi:
         data = {}
         data.update({"alias": alias} if alias else {})
         data.update({"marginRate": str(margin_rate)} if margin_rate else {})
-        return self._oanda_api_call("patch", f"accounts/{self.account_id}/configuration", data=data)
+        return self._oanda_api_call("patch", "accounts/{accountID}/configuration", data=data)
 
     def get_instrument_candles(
         self,
@@ -1127,7 +1011,8 @@ class OandaApi:
         params.update({"units": str(units)} if units else {})
         return self._oanda_api_call(
             "get",
-            f"accounts/{self.account_id}/instruments/{instrument}/candles",
+            "accounts/{accountID}/instruments/{instrument}/candles",
+            instrument=instrument,
             params=params,
         )
 
@@ -1178,34 +1063,32 @@ class OandaApi:
                 see WeeklyAlignment in oanda_guide.txt
             units (float, optional): Number of units used to calculate the volume-weighted average bid and ask prices
         """
-        params = {"count": 5000}
-        params.update({"price": price} if price else {})
-        params.update({"granularity": granularity} if granularity else {})
-        params.update({"from": from_time} if from_time else {})
-        params.update({"smooth": str(smooth)} if smooth else {})
-        params.update({"includeFirst": str(include_first)} if include_first else {})
-        params.update({"dailyAlignment": str(daily_align)} if daily_align else {})
-        params.update({"alignmentTimezone": timezone_align} if timezone_align else {})
-        params.update({"weeklyAlignment": weekly_align} if weekly_align else {})
-        params.update({"units": str(units)} if units else {})
-
-        start = self.oanda_time_to_datetime(from_time)
-        end = self.oanda_time_to_datetime(to_time)
-        count = 5000
-        while start < end and count == 5000:
-            candles = self._oanda_api_call(
-                "get",
-                f"accounts/{self.account_id}/instruments/{instrument}/candles",
-                params=params,
-            )["candles"]
-            count = len(candles)
-            params.update({"from": candles[-1]["time"]})
-            start = self.oanda_time_to_datetime(candles[-1]["time"])
-            for candle in candles:
-                if self.oanda_time_to_datetime(candle["time"]) < end:  # Strip Z and last 3 nanosecond digits
-                    yield candle
-                else:
-                    break
+        end = self.oanda_time_to_ns(to_time)
+        if self.oanda_time_to_ns(from_time) >= end:
+            return
+        # The next page is downloaded in the background while the current one is being consumed
+        prefetcher = CandlePrefetcher(
+            self,
+            [instrument],
+            from_time,
+            is_past_end=lambda time: self.oanda_time_to_ns(time) >= end,
+            max_in_flight=1,
+            price=price,
+            granularity=granularity,
+            smooth=smooth,
+            include_first=include_first,
+            daily_align=daily_align,
+            timezone_align=timezone_align,
+            weekly_align=weekly_align,
+            units=units,
+        )
+        with prefetcher:
+            for candles in prefetcher.pages(instrument):
+                for candle in candles:
+                    if self.oanda_time_to_ns(candle["time"]) < end:
+                        yield candle
+                    else:
+                        return
 
     def get_instrument_order_book(self, instrument: str, time: Optional[str] = None) -> dict:
         """
@@ -1219,7 +1102,7 @@ class OandaApi:
         """
         params = {}
         params.update({"time": time} if time else {})
-        return self._oanda_api_call("get", f"instruments/{instrument}/orderBook", params=params)
+        return self._oanda_api_call("get", "instruments/{instrument}/orderBook", instrument=instrument, params=params)
 
     def get_instrument_position_book(self, instrument: str, time: Optional[str] = None) -> dict:
         """
@@ -1233,7 +1116,9 @@ class OandaApi:
         """
         params = {}
         params.update({"time": time} if time else {})
-        return self._oanda_api_call("get", f"instruments/{instrument}/positionBook", params=params)
+        return self._oanda_api_call(
+            "get", "instruments/{instrument}/positionBook", instrument=instrument, params=params
+        )
 
     def get_orders(
         self,
@@ -1264,13 +1149,13 @@ class OandaApi:
         params.update({"instrument": instrument} if instrument else {})
         params.update({"count": str(count)} if count else {})
         params.update({"beforeID": str(before_id)} if before_id else {})
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/orders", params=params)
+        return self._oanda_api_call("get", "accounts/{accountID}/orders", params=params)
 
     def get_pending_orders(self) -> dict:
         """
         Get all pending orders in the account
         """
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/pendingOrders")
+        return self._oanda_api_call("get", "accounts/{accountID}/pendingOrders")
 
     def get_order_details(self, order_id: int) -> dict:
         """
@@ -1280,7 +1165,7 @@ class OandaApi:
             order_id (int): The id of the order to retrieve details for
                 see OrderID in oanda_guide.txt
         """
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/orders/{str(order_id)}")
+        return self._oanda_api_call("get", "accounts/{accountID}/orders/{orderSpecifier}", orderSpecifier=order_id)
 
     def create_order(self, order: OrderRequest) -> dict:
         """
@@ -1291,7 +1176,7 @@ class OandaApi:
                 NOTE: You may use any of the 8 available sub-classes of OrderRequest, but not OrderRequest itself
                 see OrderRequest in oanda_guide.txt
         """
-        return self._oanda_api_call("post", f"accounts/{self.account_id}/orders", data=order.as_dict())
+        return self._oanda_api_call("post", "accounts/{accountID}/orders", data={"order": order.as_dict()})
 
     def replace_order(self, order_id: int, order: OrderRequest) -> dict:
         """
@@ -1306,8 +1191,9 @@ class OandaApi:
         """
         return self._oanda_api_call(
             "put",
-            f"accounts/{self.account_id}/orders/{str(order_id)}",
-            data=order.as_dict(),
+            "accounts/{accountID}/orders/{orderSpecifier}",
+            orderSpecifier=order_id,
+            data={"order": order.as_dict()},
         )
 
     def cancel_order(self, order_id: int) -> dict:
@@ -1318,7 +1204,9 @@ class OandaApi:
             order_id (int): The id of the order to cancel
                 see OrderID in oanda_guide.txt
         """
-        return self._oanda_api_call("put", f"accounts/{self.account_id}/orders/{str(order_id)}/cancel")
+        return self._oanda_api_call(
+            "put", "accounts/{accountID}/orders/{orderSpecifier}/cancel", orderSpecifier=order_id
+        )
 
     def update_order_client_extensions(
         self,
@@ -1342,7 +1230,8 @@ class OandaApi:
         data.update({"tradeClientExtensions": trade_client_extensions.as_dict()} if trade_client_extensions else {})
         return self._oanda_api_call(
             "put",
-            f"accounts/{self.account_id}/orders/{str(order_id)}/clientExtensions",
+            "accounts/{accountID}/orders/{orderSpecifier}/clientExtensions",
+            orderSpecifier=order_id,
             data=data,
         )
 
@@ -1375,13 +1264,13 @@ class OandaApi:
         params.update({"instrument": instrument} if instrument else {})
         params.update({"count": str(count)} if count else {})
         params.update({"beforeID": str(before_id)} if before_id else {})
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/trades", params=params)
+        return self._oanda_api_call("get", "accounts/{accountID}/trades", params=params)
 
     def get_open_trades(self) -> dict:
         """
         Get a list of open trades for the account
         """
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/openTrades")
+        return self._oanda_api_call("get", "accounts/{accountID}/openTrades")
 
     def get_trade_details(self, trade_id: int) -> dict:
         """
@@ -1391,7 +1280,7 @@ class OandaApi:
             trade_id (int): The id of the trade to retrieve details for
                 see TradeId in oanda_guide.txt
         """
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/trades/{str(trade_id)}")
+        return self._oanda_api_call("get", "accounts/{accountID}/trades/{tradeSpecifier}", tradeSpecifier=trade_id)
 
     def close_trade(self, trade_id: int, units: Optional[float] = None) -> dict:
         """
@@ -1406,7 +1295,9 @@ class OandaApi:
                 NOTE: This number must be positive
         """
         data = {"units": "ALL"} if units is None else {"units": str(units)}
-        return self._oanda_api_call("put", f"accounts/{self.account_id}/trades/{str(trade_id)}/close", data=data)
+        return self._oanda_api_call(
+            "put", "accounts/{accountID}/trades/{tradeSpecifier}/close", tradeSpecifier=trade_id, data=data
+        )
 
     def modify_trade_dependent_orders(
         self,
@@ -1469,7 +1360,8 @@ class OandaApi:
             )
         return self._oanda_api_call(
             "put",
-            f"accounts/{self.account_id}/trades/{str(trade_id)}/orders",
+            "accounts/{accountID}/trades/{tradeSpecifier}/orders",
+            tradeSpecifier=trade_id,
             data=data,
         )
 
@@ -1489,7 +1381,8 @@ class OandaApi:
         data.update({"clientExtensions": client_extensions.as_dict()} if client_extensions else {})
         return self._oanda_api_call(
             "put",
-            f"accounts/{self.account_id}/orders/{str(trade_id)}/clientExtensions",
+            "accounts/{accountID}/trades/{tradeSpecifier}/clientExtensions",
+            tradeSpecifier=trade_id,
             data=data,
         )
 
@@ -1497,13 +1390,13 @@ class OandaApi:
         """
         Get a list of positions for the account
         """
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/positions")
+        return self._oanda_api_call("get", "accounts/{accountID}/positions")
 
     def get_open_positions(self) -> dict:
         """
         Get a list of open positions for the account
         """
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/openPositions")
+        return self._oanda_api_call("get", "accounts/{accountID}/openPositions")
 
     def get_instrument_position(self, instrument: str) -> dict:
         """
@@ -1513,7 +1406,7 @@ class OandaApi:
             instrument (str): Name of the instrument
                 see InstrumentName in oanda_guide.txt
         """
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/positions/{instrument}")
+        return self._oanda_api_call("get", "accounts/{accountID}/positions/{instrument}", instrument=instrument)
 
     def close_instrument_position(
         self,
@@ -1553,7 +1446,9 @@ class OandaApi:
             )
         data.update({"longClientExtensions": long_client_extensions.as_dict()} if long_client_extensions else {})
         data.update({"shortClientExtensions": short_client_extensions.as_dict()} if short_client_extensions else {})
-        return self._oanda_api_call("put", f"accounts/{self.account_id}/positions/{instrument}/close", data=data)
+        return self._oanda_api_call(
+            "put", "accounts/{accountID}/positions/{instrument}/close", instrument=instrument, data=data
+        )
 
     def get_transactions(
         self,
@@ -1582,7 +1477,7 @@ class OandaApi:
         params.update({"to": to_time} if to_time else {})
         params.update({"pageSize": str(page_size)} if page_size else {})
         params.update({"type": ",".join(transaction_type)} if transaction_type else {})
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/transactions", params=params)
+        return self._oanda_api_call("get", "accounts/{accountID}/transactions", params=params)
 
     def get_transaction_details(self, transaction_id: id) -> dict:
         """
@@ -1592,7 +1487,9 @@ class OandaApi:
             transaction_id (int): The id of the transaction to retrieve details for
                 see TransactionID in oanda_guide.txt
         """
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/transactions/{str(transaction_id)}")
+        return self._oanda_api_call(
+            "get", "accounts/{accountID}/transactions/{transactionID}", transactionID=transaction_id
+        )
 
     def get_transactions_in_range(self, from_id: int, to_id: int, transaction_type: Optional[List[str]] = None) -> dict:
         """
@@ -1608,7 +1505,7 @@ class OandaApi:
         """
         params = {"from": str(from_id), "to": str(to_id)}
         params.update({"type": ",".join(transaction_type)} if transaction_type else {})
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/transactions/idrange", params=params)
+        return self._oanda_api_call("get", "accounts/{accountID}/transactions/idrange", params=params)
 
     def get_transactions_since_id(self, from_id: int, transaction_type: Optional[List[str]] = None) -> dict:
         """
@@ -1622,7 +1519,7 @@ class OandaApi:
         """
         params = {"id": str(from_id)}
         params.update({"type": ",".join(transaction_type)} if transaction_type else {})
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/transactions/sinceid", params=params)
+        return self._oanda_api_call("get", "accounts/{accountID}/transactions/sinceid", params=params)
 
     def transaction_stream(self):
         """
@@ -1638,7 +1535,7 @@ class OandaApi:
             # It will produce new transactions as transactions are made
         -------------
         """
-        stream = self._oanda_api_stream_call("get", f"accounts/{self.account_id}/transactions/stream")
+        stream = self._oanda_api_stream_call("get", "accounts/{accountID}/transactions/stream")
         with stream as stream:
             for transaction in stream.iter_lines():
                 transaction = json.loads(transaction.decode("utf-8"))
@@ -1678,7 +1575,7 @@ class OandaApi:
         params.update({"dailyAlignment": str(daily_align)} if daily_align else {})
         params.update({"alignmentTimezone": timezone_align} if timezone_align else {})
         params.update({"weeklyAlignment": weekly_align} if weekly_align else {})
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/candles/latest", params=params)
+        return self._oanda_api_call("get", "accounts/{accountID}/candles/latest", params=params)
 
     def get_instrument_pricing(
         self,
@@ -1700,7 +1597,7 @@ class OandaApi:
         params = {"instruments": ",".join(instruments)}
         params.update({"since": since} if since else {})
         params.update({"includeHomeConversion": str(convert)} if convert else {})
-        return self._oanda_api_call("get", f"accounts/{self.account_id}/pricing", params=params)
+        return self._oanda_api_call("get", "accounts/{accountID}/pricing", params=params)
 
     def pricing_stream(
         self,
@@ -1732,7 +1629,7 @@ class OandaApi:
         params = {"instruments": ",".join(instruments)}
         params.update({"snapshot": str(snapshot)} if snapshot else {})
         params.update({"includeHomeConversion": str(convert)} if convert else {})
-        stream = self._oanda_api_stream_call("get", f"accounts/{self.account_id}/pricing/stream", params=params)
+        stream = self._oanda_api_stream_call("get", "accounts/{accountID}/pricing/stream", params=params)
         with stream as stream:
             for price in stream.iter_lines():
                 price = json.loads(price.decode("utf-8"))
@@ -1740,6 +1637,37 @@ class OandaApi:
                     price.pop("status")
                     yield price
 
+    def pricing_records(
+        self, instruments: List[str], snapshot: Optional[bool] = None, heartbeat_timeout: Optional[float] = None
+    ):
+        """
+        Connect to the pricing stream, producing only the instrument, time and best bid and ask of each tradeable price
+        NOTE: This returns a generator
+
+        Much cheaper per tick than pricing_stream, see PricingStreamDecoder
+
+        Args:
+            instruments (List[str]): A list of instruments
+                see InstrumentName in oanda_guide.txt
+            snapshot (bool, optional): Flag that enables/disables the sending of a pricing snapshot on connection
+                default: True
+            heartbeat_timeout (float, optional): Raise a requests.ConnectionError once nothing, heartbeats included,
+                has arrived for this many seconds, default: wait forever
+                NOTE: OANDA sends a heartbeat every 5 seconds
+
+        --- Usage ---
+        for record in API.pricing_records(['EUR_USD', 'GBP_USD']):
+            print(record.instrument, record.time, record.bid, record.ask)
+        -------------
+        """
+        params = {"instruments": ",".join(instruments)}
+        params.update({"snapshot": str(snapshot)} if snapshot else {})
+        stream = self._oanda_api_stream_call(
+            "get", "accounts/{accountID}/pricing/stream", params=params, read_timeout=heartbeat_timeout
+        )
+        with stream as stream:
+            yield from PricingStreamDecoder().decode_lines(stream.iter_lines())
+
     def oanda_time_to_datetime(self, time_str: str):
         if self.datetime_format == "RFC3339":
             if time_str[-1] == "Z":
@@ -1751,6 +1679,14 @@ class OandaApi:
         else:
             raise OandaError("Improper datetime format. Must be 'RFC3339' or 'UNIX'")
 
+    def oanda_time_to_ns(self, time_str: str) -> int:
+        """
+        Parse a time string of the api straight to int epoch nanoseconds, keeping every digit OANDA sent
+        """
+        if self.datetime_format not in ("RFC3339", "UNIX"):
+            raise OandaError("Improper datetime format. Must be 'RFC3339' or 'UNIX'")
+        return time_to_ns(time_str, self.datetime_format)
+
     def datetime_to_oanda_time(self, date: datetime):
         if self.datetime_format == "RFC3339":
             return date.isoformat("T") + "000Z"
@@ -1759,32 +1695,43 @@ class OandaApi:
         else:
             raise OandaError("Improper datetime format. Must be 'RFC3339' or 'UNIX'")
 
-    def _oanda_api_call(self, method, endpoint, params=None, data=None):
+    @property
+    def metrics(self) -> CallMetrics:
+        """
+        Latency statistics for every call made through this api, see CallMetrics.summary()
+        """
+        return self.session.metrics
+
+    def _oanda_api_call(self, method, endpoint, params=None, data=None, **path):
+        # endpoint is a template such as 'accounts/{accountID}/orders/{orderSpecifier}', the ids in path only go into
+        # the url, so metrics are kept per endpoint rather than per order, trade or transaction
         params = params if params != {} else None
         data = data if data != {} else None
-        base_url = live_url if self.live else practice_url
-        full_url = f"{base_url}/{api_version}/{endpoint}"
-        headers = {
-            "Authorization": f"Bearer {self.auth}",
-            "Content-Type": "application/json",
-            "Accept-Datetime-Format": self.datetime_format,
-        }
-        response = getattr(requests, method)(full_url, headers=headers, params=params, json=data)
+        full_url = f"{self.url}/{api_version}/{endpoint.format(accountID=self.account_id, **path)}"
+        response = self.session.request(method, full_url, endpoint, params=params, json=data)
         if response.status_code >= 300:
-            raise OandaError("HTTP Error {}: {}".format(response.status_code, response.json()["errorMessage"]))
+            raise OandaError(
+                "HTTP Error {}: {}".format(response.status_code, response.json()["errorMessage"]), response.status_code
+            )
         return response.json()
 
-    def _oanda_api_stream_call(self, method, endpoint, params=None, data=None):
+    def _oanda_api_stream_call(self, method, endpoint, params=None, data=None, read_timeout=None):
         params = params if params != {} else None
         data = data if data != {} else None
-        base_url = live_stream_url if self.live else practice_stream_url
-        full_url = f"{base_url}/{api_version}/{endpoint}"
-        headers = {
-            "Authorization": f"Bearer {self.auth}",
-            "Content-Type": "application/json",
-            "Accept-Datetime-Format": self.datetime_format,
-        }
-        response = getattr(requests, method)(full_url, headers=headers, params=params, json=data, stream=True)
+        full_url = f"{self.stream_url}/{api_version}/{endpoint.format(accountID=self.account_id)}"
+        # Streams stay open indefinitely, so only the connection attempt and, if given, the silence between reads
+        # are bounded
+        response = self.session.request(
+            method,
+            full_url,
+            endpoint,
+            timeout=(self.session.timeout, read_timeout),
+            params=params,
+            json=data,
+            stream=True,
+        )
         if response.status_code >= 300:
-            raise OandaError("HTTP Error {}: {}".format(response.status_code, response.json()["errorMessage"]))
+            raise OandaError(
+                "HTTP Error {}: {}".format(response.status_code, response.json()["errorMessage"]), response.status_code
+            )
         return response
@@ -0,0 +1,152 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from peoples_advisor.common.timestamps import NS_PER_SECOND
+
+default_path = Path(__file__).parents[2] / "data" / "candles" / "candles.sqlite3"
+
+_schema = """
+CREATE TABLE IF NOT EXISTS candles (
+    instrument TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    price TEXT NOT NULL,
+    format TEXT NOT NULL,
+    time REAL NOT NULL,
+    candle TEXT NOT NULL,
+    PRIMARY KEY (instrument, granularity, price, format, time)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    instrument TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    price TEXT NOT NULL,
+    format TEXT NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_key ON coverage (instrument, granularity, price, format, start);
+"""
+_key = "instrument = ? AND granularity = ? AND price = ? AND format = ?"
+
+
+class OandaCandleCache:
+    def __init__(self, api, path: Union[str, Path] = None):
+        """
+        A persistent candle store that answers get_instrument_candles from disk whenever it can
+
+        For each (instrument, granularity, price component) the cache keeps the candles it has seen and the time
+        intervals it knows to be complete. A request that falls inside a complete interval costs no network time,
+        and a request that runs past one only fetches candles from the end of the interval onwards.
+        Incomplete candles are passed through but never stored.
+
+        Args:
+            api (OandaApi): The api used to fetch candles that are not cached
+            path (str, Path, optional): The sqlite database to store candles in
+                default: data/candles/candles.sqlite3
+        """
+        self.api = api
+        self.path = Path(path) if path else default_path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.executescript(_schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def get_instrument_candles(
+        self,
+        instrument: str,
+        price: Optional[str] = None,
+        granularity: Optional[str] = None,
+        count: Optional[int] = None,
+        from_time: Optional[str] = None,
+        to_time: Optional[str] = None,
+        **kwargs,
+    ) -> dict:
+        """
+        A drop in replacement for OandaApi.get_instrument_candles
+
+        Only requests for a count of candles from a given time can be cached. Anything else is passed on to the api.
+        """
+        if from_time is None or count is None or to_time is not None or any(v is not None for v in kwargs.values()):
+            return self.api.get_instrument_candles(instrument, price, granularity, count, from_time, to_time, **kwargs)
+        key = (instrument, granularity or "S5", price or "M", self.api.datetime_format)
+        start = self._epoch(from_time)
+        candles = self._covered(key, start, count)
+        if len(candles) < count:
+            # Fetch the rest from the last cached candle onwards (or from the start if none are cached)
+            fetch_from = candles[-1]["time"] if candles else from_time
+            response = self.api.get_instrument_candles(
+                instrument, price, granularity, count, fetch_from, None, **kwargs
+            )
+            fetched = response.get("candles", [])
+            self._store(key, start, fetched)
+            if candles and fetched and fetched[0]["time"] == candles[-1]["time"]:
+                fetched = fetched[1:]
+            response["candles"] = (candles + fetched)[:count]
+            return response
+        return {"instrument": instrument, "granularity": key[1], "candles": candles}
+
+    def coverage(self, instrument: str, granularity: str = "S5", price: str = "M") -> List[Tuple[float, float]]:
+        """
+        Get the [start, end) epoch second intervals that are completely cached for the given candles
+        """
+        with self._lock:
+            return self._db.execute(
+                f"SELECT start, end FROM coverage WHERE {_key} ORDER BY start",
+                (instrument, granularity, price, self.api.datetime_format),
+            ).fetchall()
+
+    def _covered(self, key: tuple, start: float, count: int) -> List[dict]:
+        with self._lock:
+            interval = self._db.execute(
+                f"SELECT end FROM coverage WHERE {_key} AND start <= ? AND end > ?", (*key, start, start)
+            ).fetchone()
+            if interval is None:
+                return []
+            rows = self._db.execute(
+                f"SELECT candle FROM candles WHERE {_key} AND time >= ? AND time < ? ORDER BY time LIMIT ?",
+                (*key, start, interval[0], count),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def _store(self, key: tuple, start: float, candles: List[dict]):
+        complete = []
+        for candle in candles:
+            if not candle.get("complete", True):
+                break
+            complete.append((self._epoch(candle["time"]), candle))
+        if not complete:
+            return
+        # The last candle is stored but left outside the covered interval, since candles after it may be missing
+        end = complete[-1][0]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?)",
+                [(*key, time, json.dumps(candle)) for time, candle in complete],
+            )
+            if end <= start:
+                return
+            overlapping = self._db.execute(
+                f"SELECT MIN(start), MAX(end) FROM coverage WHERE {_key} AND start <= ? AND end >= ?",
+                (*key, end, start),
+            ).fetchone()
+            if overlapping[0] is not None:
+                start, end = min(start, overlapping[0]), max(end, overlapping[1])
+            self._db.execute(f"DELETE FROM coverage WHERE {_key} AND start <= ? AND end >= ?", (*key, end, start))
+            self._db.execute("INSERT INTO coverage VALUES (?, ?, ?, ?, ?, ?)", (*key, start, end))
+
+    def _epoch(self, time: str) -> float:
+        if self.api.datetime_format == "UNIX":
+            return float(time)
+        return self.api.oanda_time_to_ns(time) / NS_PER_SECOND
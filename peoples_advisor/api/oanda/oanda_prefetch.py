@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+class RateLimiter:
+    def __init__(self, rate: Optional[float] = None):
+        """
+        Space out calls so that no more than rate calls are started each second, across all threads
+
+        Args:
+            rate (float, optional): The maximum number of calls per second, None for no limit
+        """
+        self.interval = 1 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(self._next, now) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class _CandleStream:
+    def __init__(self, instrument: str, from_time: str):
+        self.instrument = instrument
+        self.from_time = from_time
+        self.pages = deque()
+        self.first = True
+        self.fetching = False
+        self.done = False
+        self.error: Optional[Exception] = None
+
+
+class CandlePrefetcher:
+    def __init__(
+        self,
+        source,
+        instruments: List[str],
+        from_time: str,
+        is_past_end: Optional[Callable[[str], bool]] = None,
+        count: int = 5000,
+        max_in_flight: int = 4,
+        buffer_pages: int = 2,
+        rate_limit: Optional[float] = 100,
+        **params,
+    ):
+        """
+        Download pages of candles for several instruments concurrently, ahead of when they are consumed
+
+        Pages of a single instrument are chained (each page starts at the time of the last candle of the previous
+        one), so each instrument has at most one page in flight. Concurrency comes from fetching the pages of
+        different instruments at the same time, and from fetching an instrument's next page while its current one
+        is being consumed.
+
+        Args:
+            source: Anything with an OandaApi compatible get_instrument_candles method
+            instruments (List[str]): The instruments to fetch candles for
+            from_time (str): The time to fetch the first page of each instrument from
+                see DateTime in oanda_guide.txt
+            is_past_end (Callable[[str], bool], optional): Given the time of the last candle of a page, whether no
+                more pages are needed for that instrument
+            count (int, optional): The number of candles in each page
+                max: 5000
+            max_in_flight (int, optional): The maximum number of pages being downloaded at once
+            buffer_pages (int, optional): The maximum number of downloaded pages waiting in each instrument's buffer
+            rate_limit (float, optional): The maximum number of requests started per second, None for no limit
+            **params: Any other arguments to pass along to get_instrument_candles (granularity, price, ...)
+        """
+        self.source = source
+        self.instruments = instruments
+        self.is_past_end = is_past_end
+        self.count = count
+        self.buffer_pages = buffer_pages
+        self.params = params
+        self.rate_limiter = RateLimiter(rate_limit)
+        self._streams: Dict[str, _CandleStream] = {
+            instrument: _CandleStream(instrument, from_time) for instrument in instruments
+        }
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="candle-prefetch")
+        self._closed = False
+        with self._condition:
+            for stream in self._streams.values():
+                self._schedule(stream)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def next_page(self, instrument: str) -> List[dict]:
+        """
+        Get the next page of candles for an instrument, blocking until it has been downloaded
+
+        Returns an empty list once every page of the instrument has been consumed
+        """
+        stream = self._streams[instrument]
+        with self._condition:
+            while not stream.pages and not stream.done and stream.error is None:
+                self._condition.wait()
+            if stream.pages:
+                page = stream.pages.popleft()
+                self._schedule(stream)
+                return page
+            if stream.error is not None:
+                raise stream.error
+            return []
+
+    def pages(self, instrument: str) -> Iterator[List[dict]]:
+        while True:
+            page = self.next_page(instrument)
+            if not page:
+                return
+            yield page
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule(self, stream: _CandleStream):
+        # Must be called while holding the condition
+        if (
+            not self._closed
+            and not stream.fetching
+            and not stream.done
+            and stream.error is None
+            and len(stream.pages) < self.buffer_pages
+        ):
+            stream.fetching = True
+            self._executor.submit(self._fetch, stream)
+
+    def _fetch(self, stream: _CandleStream):
+        try:
+            self.rate_limiter.acquire()
+            candles = self.source.get_instrument_candles(
+                stream.instrument, from_time=stream.from_time, count=self.count, **self.params
+            ).get("candles", [])
+        except Exception as error:
+            with self._condition:
+                stream.fetching = False
+                stream.error = error
+                self._condition.notify_all()
+            return
+        with self._condition:
+            stream.fetching = False
+            stream.pages.append(candles)
+            # Every page after the first starts with the last candle of the previous page
+            if (
+                len(candles) <= (0 if stream.first else 1)
+                or len(candles) < self.count
+                or (self.is_past_end is not None and self.is_past_end(candles[-1]["time"]))
+            ):
+                stream.done = True
+            else:
+                stream.from_time = candles[-1]["time"]
+            stream.first = False
+            self._schedule(stream)
+            self._condition.notify_all()
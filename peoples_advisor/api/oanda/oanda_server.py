@@ -0,0 +1,702 @@
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from peoples_advisor.api.oanda.oanda_api import OandaApi
+from peoples_advisor.common.timestamps import NS_PER_SECOND, time_to_ns
+from peoples_advisor.price.common.common import GRANULARITY_SECONDS
+
+ACCOUNT_ID = "101-001-0000000-001"
+TOKEN = "stand-in-token"
+
+# name -> (base price, display precision, pip location, margin rate)
+DEFAULT_INSTRUMENTS = {
+    "EUR_USD": (1.17, 5, -4, "0.0333"),
+    "GBP_USD": (1.38, 5, -4, "0.05"),
+    "USD_JPY": (110.0, 3, -2, "0.04"),
+    "EUR_JPY": (129.0, 3, -2, "0.04"),
+    "EUR_GBP": (0.85, 5, -4, "0.05"),
+    "AUD_USD": (0.76, 5, -4, "0.05"),
+    "USD_CAD": (1.25, 5, -4, "0.05"),
+}
+
+CANDLE_SECONDS = dict(GRANULARITY_SECONDS, D=86400)
+MAX_CANDLES = 5000
+# The spread of every price, in pips
+_SPREAD_PIPS = 1.4
+
+
+class StandInError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# Prices are a deterministic function of the instrument and the time, so the same candle request always gets the same
+# candles, and the pricing stream agrees with what candles and pricing return
+class _Instrument:
+    __slots__ = ("name", "base", "precision", "pip", "margin_rate", "phase", "half_spread")
+
+    def __init__(self, name: str, base: float, precision: int, pip_location: int, margin_rate: str, phase: float):
+        self.name = name
+        self.base = base
+        self.precision = precision
+        self.pip = pip_location
+        self.margin_rate = margin_rate
+        self.phase = phase
+        self.half_spread = _SPREAD_PIPS * 10**pip_location / 2
+
+    def mid(self, timestamp: int) -> float:
+        # A slow swing over hours with a faster wobble over a minute, the same for a given time on every call
+        seconds = timestamp / NS_PER_SECOND
+        return self.base * (
+            1 + 0.002 * math.sin(seconds / 3600 + self.phase) + 0.0003 * math.sin(seconds / 47 + 2 * self.phase)
+        )
+
+    def quote(self, timestamp: int) -> Tuple[str, str]:
+        # The (bid, ask) strings at a time
+        mid = self.mid(timestamp)
+        return self.format(mid - self.half_spread), self.format(mid + self.half_spread)
+
+    def format(self, price: float) -> str:
+        return f"{price:.{self.precision}f}"
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "type": "CURRENCY",
+            "displayName": self.name.replace("_", "/"),
+            "pipLocation": self.pip,
+            "displayPrecision": self.precision,
+            "tradeUnitsPrecision": 0,
+            "minimumTradeSize": "1",
+            "maximumOrderUnits": "100000000",
+            "marginRate": self.margin_rate,
+        }
+
+
+def format_time(timestamp: int, datetime_format: str) -> str:
+    """
+    Format epoch nanoseconds as the api would in either datetime format, 'RFC3339' or 'UNIX'
+    """
+    seconds, nanoseconds = divmod(timestamp, NS_PER_SECOND)
+    if datetime_format == "UNIX":
+        return f"{seconds}.{nanoseconds:09d}"
+    return f"{datetime.fromtimestamp(seconds, timezone.utc):%Y-%m-%dT%H:%M:%S}.{nanoseconds:09d}Z"
+
+
+class OandaStandInServer:
+    def __init__(
+        self,
+        instruments: Optional[Dict[str, tuple]] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        ticks_per_second: Optional[float] = 100.0,
+        heartbeat_interval: float = 5.0,
+        stream_disconnect_after: Optional[int] = None,
+        stream_stall_after: Optional[int] = None,
+        token: str = TOKEN,
+        account_id: str = ACCOUNT_ID,
+        balance: str = "100000.0000",
+        seed: int = 0,
+        port: int = 0,
+    ):
+        """
+        A local OANDA v3 api on 127.0.0.1 with synthetic prices, started by start() or entering it as a context
+
+        The attributes of the same names can be changed while the server runs, and apply from the next request.
+
+        Args:
+            instruments (Dict[str, tuple], optional): name -> (base price, display precision, pip location, margin
+                rate) of every instrument served, default: DEFAULT_INSTRUMENTS
+            latency (float, optional): Seconds every REST response and stream connection is delayed by
+            jitter (float, optional): Up to this many more seconds, at random, are added to the latency
+            error_rate (float, optional): The chance any request is answered with error_status instead
+            error_status (int, optional): The http status of the errors injected by error_rate
+            ticks_per_second (float, optional): The prices each pricing stream sends a second, None to send as fast as
+                the connection takes them
+            heartbeat_interval (float, optional): Seconds between the heartbeats of the pricing stream
+            stream_disconnect_after (int, optional): Drop every pricing stream connection after this many prices
+            stream_stall_after (int, optional): Stop sending anything, heartbeats included, on every pricing stream
+                after this many prices, until the client goes away or the server is closed
+            token (str, optional): The api token requests must carry
+            account_id (str, optional): The id of the single account served
+            balance (str, optional): The balance of the account
+            seed (int, optional): Seeds the random latency jitter and injected errors
+            port (int, optional): The port to listen on, default: any free port
+        """
+        self.instruments = {
+            name: _Instrument(name, *spec, phase=index)
+            for index, (name, spec) in enumerate((instruments or DEFAULT_INSTRUMENTS).items())
+        }
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.ticks_per_second = ticks_per_second
+        self.heartbeat_interval = heartbeat_interval
+        self.stream_disconnect_after = stream_disconnect_after
+        self.stream_stall_after = stream_stall_after
+        self.token = token
+        self.account_id = account_id
+        self.balance = balance
+        self.port = port
+        # (method, path) of the most recent requests, oldest first
+        self.requests = deque(maxlen=10000)
+        self.connections = 0
+        self.ticks_sent = 0
+        self.orders: Dict[str, dict] = {}
+        self.trades: Dict[str, dict] = {}
+        self.transactions: List[dict] = []
+        self._random = random.Random(seed)
+        self._failures = deque()
+        self._lock = threading.Lock()
+        self._ids = count(1)
+        self._stopping = threading.Event()
+        self._server = None
+        self._thread = None
+        self._transaction("CREATE", "RFC3339", divisionID=1, siteID=101, accountUserID=1, homeCurrency="USD")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start(self) -> "OandaStandInServer":
+        self._stopping.clear()
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), _StandInHandler)
+        self._server.daemon_threads = True
+        self._server.stand_in = self
+        self.port = self._server.server_port
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), name="OandaStandInServer", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def close(self):
+        if self._server is None:
+            return
+        # Open streams notice this and end, then the listening socket is shut
+        self._stopping.set()
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def api(self, **kwargs) -> OandaApi:
+        """
+        An OandaApi pointed at this server, kwargs are passed along to OandaApi
+        """
+        return OandaApi(self.token, url=self.url, stream_url=self.url, **kwargs)
+
+    def fail_next(self, status: int = 503, times: int = 1, message: str = "Injected error", retry_after=None):
+        """
+        Answer the next requests with an error, in the order failures were scripted
+
+        Args:
+            status (int, optional): The http status to answer with
+            times (int, optional): The number of requests to fail
+            message (str, optional): The errorMessage of the response
+            retry_after (float, optional): Sent as the Retry-After header
+        """
+        with self._lock:
+            self._failures.extend([(status, message, retry_after)] * times)
+
+    def candles(
+        self,
+        instrument: str,
+        granularity: str = "S5",
+        price: str = "M",
+        candle_count: Optional[int] = None,
+        from_ns: Optional[int] = None,
+        to_ns: Optional[int] = None,
+        include_first: bool = True,
+        datetime_format: str = "RFC3339",
+        now: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        The candles the candles endpoint returns, the last still open candle included and marked incomplete
+        """
+        spec = self._instrument(instrument)
+        if granularity not in CANDLE_SECONDS:
+            raise StandInError(400, f"Invalid value specified for 'granularity': {granularity}")
+        if from_ns is not None and to_ns is not None and candle_count is not None:
+            raise StandInError(400, "Cannot specify 'count' when 'from' and 'to' are both specified")
+        length = CANDLE_SECONDS[granularity] * NS_PER_SECOND
+        now = time.time_ns() if now is None else now
+        end = min(to_ns, now) if to_ns is not None else now
+        if from_ns is not None:
+            # The candle covering from, or the one after it
+            first = from_ns - from_ns % length
+            if first < from_ns and not include_first:
+                first += length
+            limit = (end - first + length - 1) // length if to_ns is not None else (candle_count or 500)
+        else:
+            limit = candle_count or 500
+            last = end - 1 - (end - 1) % length
+            first = last - (limit - 1) * length
+        if limit > MAX_CANDLES:
+            raise StandInError(400, f"Maximum value for 'count' exceeded, {limit} candles requested")
+        candles = []
+        for index in range(max(limit, 0)):
+            start = first + index * length
+            if start >= end:
+                break
+            candle = {
+                "complete": start + length <= now,
+                "volume": 1 + start // length % 97,
+                "time": format_time(start, datetime_format),
+            }
+            prices = [spec.mid(start), spec.mid(start + length // 2), spec.mid(start + length)]
+            for component, key, shift in (("B", "bid", -1), ("A", "ask", 1), ("M", "mid", 0)):
+                if component in price:
+                    shifted = [value + shift * spec.half_spread for value in prices]
+                    candle[key] = {
+                        "o": spec.format(shifted[0]),
+                        "h": spec.format(max(shifted)),
+                        "l": spec.format(min(shifted)),
+                        "c": spec.format(shifted[2]),
+                    }
+            candles.append(candle)
+        return candles
+
+    def price(self, instrument: str, timestamp: int, datetime_format: str = "RFC3339") -> dict:
+        """
+        The price of an instrument at a time, as the pricing endpoints send it
+        """
+        spec = self._instrument(instrument)
+        bid, ask = spec.quote(timestamp)
+        return {
+            "type": "PRICE",
+            "time": format_time(timestamp, datetime_format),
+            "bids": [{"price": bid, "liquidity": 1000000}],
+            "asks": [{"price": ask, "liquidity": 1000000}],
+            "closeoutBid": bid,
+            "closeoutAsk": ask,
+            "status": "tradeable",
+            "tradeable": True,
+            "instrument": instrument,
+        }
+
+    def create_order(self, order: dict, datetime_format: str = "RFC3339") -> dict:
+        """
+        Accept an order request, filling market orders at once and leaving every other order pending
+        """
+        instrument, order_type, units = self._validate_order(order)
+        timestamp = time.time_ns()
+        with self._lock:
+            fields = {key: value for key, value in order.items() if key != "type"}
+            created = self._transaction(f"{order_type}_ORDER", datetime_format, **fields)
+            order_id = created["id"]
+            response = {"orderCreateTransaction": created}
+            if order_type == "MARKET":
+                bid, ask = self.instruments[instrument].quote(timestamp)
+                price = ask if units > 0 else bid
+                trade = {
+                    "id": order_id,
+                    "instrument": instrument,
+                    "price": price,
+                    "openTime": created["time"],
+                    "state": "OPEN",
+                    "initialUnits": order["units"],
+                    "currentUnits": order["units"],
+                }
+                self.trades[order_id] = trade
+                filled = self._transaction(
+                    "ORDER_FILL",
+                    datetime_format,
+                    orderID=order_id,
+                    instrument=instrument,
+                    units=order["units"],
+                    price=price,
+                    tradeOpened={"tradeID": order_id, "units": order["units"], "price": price},
+                )
+                response["orderFillTransaction"] = filled
+            else:
+                self.orders[order_id] = dict(order, id=order_id, createTime=created["time"], state="PENDING")
+            response["relatedTransactionIDs"] = [t["id"] for t in response.values()]
+            response["lastTransactionID"] = self.transactions[-1]["id"]
+        return response
+
+    def replace_order(self, order_id: str, order: dict, datetime_format: str = "RFC3339") -> dict:
+        """
+        Cancel a pending order and create its replacement, leaving the original pending if the replacement is invalid
+        """
+        self._validate_order(order)
+        cancelled = self.cancel_order(order_id, datetime_format)
+        response = self.create_order(order, datetime_format)
+        response["orderCancelTransaction"] = cancelled["orderCancelTransaction"]
+        response["relatedTransactionIDs"] = cancelled["relatedTransactionIDs"] + response["relatedTransactionIDs"]
+        return response
+
+    def cancel_order(self, order_id: str, datetime_format: str = "RFC3339") -> dict:
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None or order["state"] != "PENDING":
+                raise StandInError(404, f"The Order specified does not exist or is not pending: {order_id}")
+            order["state"] = "CANCELLED"
+            cancelled = self._transaction("ORDER_CANCEL", datetime_format, orderID=order_id, reason="CLIENT_REQUEST")
+            return {
+                "orderCancelTransaction": cancelled,
+                "relatedTransactionIDs": [cancelled["id"]],
+                "lastTransactionID": cancelled["id"],
+            }
+
+    def _validate_order(self, order: dict) -> Tuple[str, str, float]:
+        instrument = order.get("instrument")
+        order_type = order.get("type")
+        try:
+            units = float(order.get("units", 0))
+        except ValueError:
+            units = 0
+        if order_type not in ("MARKET", "LIMIT", "STOP", "MARKET_IF_TOUCHED") or instrument not in self.instruments:
+            raise StandInError(400, f"Invalid order type {order_type} or instrument {instrument}")
+        if not units:
+            raise StandInError(400, "Order units specified are invalid")
+        return instrument, order_type, units
+
+    def _instrument(self, name: str) -> _Instrument:
+        spec = self.instruments.get(name)
+        if spec is None:
+            raise StandInError(400, f"Invalid value specified for 'instrument': {name}")
+        return spec
+
+    def _transaction(self, transaction_type: str, datetime_format: str, **fields) -> dict:
+        transaction_id = str(next(self._ids))
+        transaction = {
+            "id": transaction_id,
+            "time": format_time(time.time_ns(), datetime_format),
+            "userID": 1,
+            "accountID": self.account_id,
+            "batchID": transaction_id,
+            "type": transaction_type,
+        }
+        transaction.update(fields)
+        self.transactions.append(transaction)
+        return transaction
+
+    def _delay(self):
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _injected_failure(self) -> Optional[tuple]:
+        with self._lock:
+            if self._failures:
+                return self._failures.popleft()
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self.error_status, "Injected error", None
+        return None
+
+
+# (method, path pattern under /v3/, handler name)
+_ROUTES = [
+    (method, re.compile(pattern.replace("{account}", "(?P<account>[^/]+)") + "$"), name)
+    for method, pattern, name in [
+        ("GET", r"accounts", "accounts"),
+        ("GET", r"accounts/{account}", "account"),
+        ("GET", r"accounts/{account}/summary", "account"),
+        ("GET", r"accounts/{account}/instruments", "instruments"),
+        ("GET", r"accounts/{account}/instruments/(?P<instrument>[^/]+)/candles", "candles"),
+        ("GET", r"instruments/(?P<instrument>[^/]+)/candles", "candles"),
+        ("GET", r"accounts/{account}/pricing", "pricing"),
+        ("GET", r"accounts/{account}/pricing/stream", "pricing_stream"),
+        ("GET", r"accounts/{account}/orders", "orders"),
+        ("GET", r"accounts/{account}/pendingOrders", "orders"),
+        ("POST", r"accounts/{account}/orders", "create_order"),
+        ("GET", r"accounts/{account}/orders/(?P<order>\d+)", "order"),
+        ("PUT", r"accounts/{account}/orders/(?P<order>\d+)", "replace_order"),
+        ("PUT", r"accounts/{account}/orders/(?P<order>\d+)/cancel", "cancel_order"),
+        ("GET", r"accounts/{account}/trades", "trades"),
+        ("GET", r"accounts/{account}/openTrades", "trades"),
+        ("GET", r"accounts/{account}/transactions", "transactions"),
+        ("GET", r"accounts/{account}/transactions/idrange", "transaction_range"),
+        ("GET", r"accounts/{account}/transactions/sinceid", "transaction_range"),
+        ("GET", r"accounts/{account}/transactions/(?P<transaction>\d+)", "transaction"),
+    ]
+]
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so pooled connections are reused as they would be against OANDA
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes, which Nagle's algorithm would hold back for a delayed ack
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def log_message(self, *args):
+        pass
+
+    def _handle(self, method: str):
+        stand_in: OandaStandInServer = self.server.stand_in
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        stand_in.requests.append((method, url.path))
+        self.stand_in = stand_in
+        self.params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.datetime_format = self.headers.get("Accept-Datetime-Format", "RFC3339")
+        try:
+            if self.headers.get("Authorization") != f"Bearer {stand_in.token}":
+                raise StandInError(401, "Insufficient authorization to perform request.")
+            path = url.path[len("/v3/") :] if url.path.startswith("/v3/") else None
+            for route_method, pattern, name in _ROUTES:
+                match = pattern.match(path or "") if route_method == method else None
+                if match is None:
+                    continue
+                groups = match.groupdict()
+                if groups.pop("account", stand_in.account_id) != stand_in.account_id:
+                    raise StandInError(403, "The Account specified does not exist or is not accessible")
+                stand_in._delay()
+                failure = stand_in._injected_failure()
+                if failure is not None:
+                    status, message, retry_after = failure
+                    self._respond({"errorMessage": message}, status, retry_after)
+                    return
+                result = getattr(self, f"_{name}")(json.loads(body) if body else {}, **groups)
+                if result is not None:
+                    self._respond(result)
+                return
+            raise StandInError(404, f"Unknown endpoint {method} {url.path}")
+        except StandInError as error:
+            self._respond({"errorMessage": error.message}, error.status)
+        except (ValueError, KeyError) as error:
+            self._respond({"errorMessage": f"Invalid request: {error}"}, 400)
+
+    def _respond(self, body: dict, status: int = 200, retry_after=None):
+        body = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if retry_after is not None:
+            self.send_header("Retry-After", str(retry_after))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _time(self, key: str) -> Optional[int]:
+        value = self.params.get(key)
+        return time_to_ns(value, self.datetime_format) if value else None
+
+    def _last_id(self) -> str:
+        return self.stand_in.transactions[-1]["id"]
+
+    def _accounts(self, body):
+        return {"accounts": [{"id": self.stand_in.account_id, "tags": []}]}
+
+    def _account(self, body):
+        stand_in = self.stand_in
+        with stand_in._lock:
+            pending = sum(order["state"] == "PENDING" for order in stand_in.orders.values())
+            account = {
+                "id": stand_in.account_id,
+                "alias": "Stand-in",
+                "currency": "USD",
+                "balance": stand_in.balance,
+                "openTradeCount": len(stand_in.trades),
+                "pendingOrderCount": pending,
+                "lastTransactionID": self._last_id(),
+            }
+            return {"account": account, "lastTransactionID": self._last_id()}
+
+    def _instruments(self, body):
+        names = self.params.get("instruments")
+        names = names.split(",") if names else list(self.stand_in.instruments)
+        return {
+            "instruments": [self.stand_in._instrument(name).as_dict() for name in names],
+            "lastTransactionID": self._last_id(),
+        }
+
+    def _candles(self, body, instrument):
+        params = self.params
+        granularity = params.get("granularity", "S5")
+        candles = self.stand_in.candles(
+            instrument,
+            granularity,
+            params.get("price", "M"),
+            int(params["count"]) if "count" in params else None,
+            self._time("from"),
+            self._time("to"),
+            params.get("includeFirst", "True").lower() == "true",
+            self.datetime_format,
+        )
+        return {"instrument": instrument, "granularity": granularity, "candles": candles}
+
+    def _pricing(self, body):
+        names = self.params["instruments"].split(",")
+        since = self._time("since")
+        now = time.time_ns()
+        # Every synthetic price changes continuously, so each instrument has a newer price than any past since
+        prices = [
+            self.stand_in.price(name, now, self.datetime_format) for name in names if since is None or since < now
+        ]
+        return {"prices": prices, "time": format_time(now, self.datetime_format)}
+
+    def _pricing_stream(self, body):
+        stand_in = self.stand_in
+        names = self.params["instruments"].split(",")
+        for name in names:
+            stand_in._instrument(name)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        with stand_in._lock:
+            stand_in.connections += 1
+        try:
+            self._stream(stand_in, names)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        # A stream ended by the server is dropped without the last chunk, as a connection lost midway would be
+        self.close_connection = True
+
+    def _stream(self, stand_in: OandaStandInServer, names: List[str]):
+        datetime_format = self.datetime_format
+        dumps = json.JSONEncoder(separators=(",", ":")).encode
+        sent = 0
+        next_tick = next_heartbeat = time.monotonic()
+        while not stand_in._stopping.is_set():
+            disconnect, stall = stand_in.stream_disconnect_after, stand_in.stream_stall_after
+            if disconnect is not None and sent >= disconnect:
+                return
+            if stall is not None and sent >= stall:
+                stand_in._stopping.wait()
+                return
+            lines = []
+            now = time.monotonic()
+            tick_rate = stand_in.ticks_per_second
+            # Every price due by now goes out in one chunk, so fast streams are not one write per price
+            while len(lines) < 1000 and (tick_rate is None or next_tick <= now):
+                if (disconnect is not None and sent >= disconnect) or (stall is not None and sent >= stall):
+                    break
+                lines.append(dumps(stand_in.price(names[sent % len(names)], time.time_ns(), datetime_format)))
+                sent += 1
+                next_tick += 1 / tick_rate if tick_rate else 0
+            if now >= next_heartbeat:
+                lines.append(dumps({"type": "HEARTBEAT", "time": format_time(time.time_ns(), datetime_format)}))
+                next_heartbeat = now + stand_in.heartbeat_interval
+            if lines:
+                data = ("\n".join(lines) + "\n").encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+                with stand_in._lock:
+                    stand_in.ticks_sent += sum(line.startswith('{"type":"PRICE"') for line in lines)
+            if tick_rate:
+                wait = min(next_tick, next_heartbeat) - time.monotonic()
+                if wait > 0:
+                    stand_in._stopping.wait(wait)
+
+    def _orders(self, body):
+        with self.stand_in._lock:
+            orders = [order for order in self.stand_in.orders.values() if order["state"] == "PENDING"]
+            return {"orders": orders[::-1], "lastTransactionID": self._last_id()}
+
+    def _create_order(self, body):
+        if "order" not in body:
+            raise StandInError(400, "Missing order specification")
+        return self.stand_in.create_order(body["order"], self.datetime_format)
+
+    def _order(self, body, order):
+        with self.stand_in._lock:
+            if order not in self.stand_in.orders:
+                raise StandInError(404, f"The Order specified does not exist: {order}")
+            return {"order": self.stand_in.orders[order], "lastTransactionID": self._last_id()}
+
+    def _replace_order(self, body, order):
+        if "order" not in body:
+            raise StandInError(400, "Missing order specification")
+        return self.stand_in.replace_order(order, body["order"], self.datetime_format)
+
+    def _cancel_order(self, body, order):
+        return self.stand_in.cancel_order(order, self.datetime_format)
+
+    def _trades(self, body):
+        with self.stand_in._lock:
+            return {"trades": list(self.stand_in.trades.values())[::-1], "lastTransactionID": self._last_id()}
+
+    def _transactions(self, body):
+        with self.stand_in._lock:
+            transactions = self._filter(self.stand_in.transactions)
+            page_size = int(self.params.get("pageSize", 100))
+            first, last = self._time("from"), self._time("to")
+            if first is not None or last is not None:
+                # Transaction times are in the format they were made with, so they are compared as nanoseconds
+                transactions = [
+                    transaction
+                    for transaction in transactions
+                    if (first is None or self._transaction_time(transaction) >= first)
+                    and (last is None or self._transaction_time(transaction) <= last)
+                ]
+            ids = [int(transaction["id"]) for transaction in transactions]
+            pages = [
+                f"{self.stand_in.url}/v3/accounts/{self.stand_in.account_id}/transactions/idrange"
+                f"?from={ids[index]}&to={ids[min(index + page_size, len(ids)) - 1]}"
+                for index in range(0, len(ids), page_size)
+            ]
+            return {
+                "from": self.params.get("from"),
+                "to": self.params.get("to"),
+                "pageSize": page_size,
+                "count": len(ids),
+                "pages": pages,
+                "lastTransactionID": self._last_id(),
+            }
+
+    def _transaction_range(self, body):
+        with self.stand_in._lock:
+            first = int(self.params["from"] if "from" in self.params else self.params["id"])
+            last = int(self.params["to"]) if "to" in self.params else None
+            transactions = [
+                transaction
+                for transaction in self._filter(self.stand_in.transactions)
+                if (int(transaction["id"]) >= first if "from" in self.params else int(transaction["id"]) > first)
+                and (last is None or int(transaction["id"]) <= last)
+            ]
+            return {"transactions": transactions, "lastTransactionID": self._last_id()}
+
+    def _transaction(self, body, transaction):
+        with self.stand_in._lock:
+            index = int(transaction) - 1
+            if not 0 <= index < len(self.stand_in.transactions):
+                raise StandInError(404, f"The Transaction specified does not exist: {transaction}")
+            return {"transaction": self.stand_in.transactions[index], "lastTransactionID": self._last_id()}
+
+    def _filter(self, transactions: List[dict]) -> List[dict]:
+        types = self.params.get("type")
+        if not types:
+            return list(transactions)
+        types = set(types.split(","))
+        return [transaction for transaction in transactions if transaction["type"] in types]
+
+    @staticmethod
+    def _transaction_time(transaction: dict) -> int:
+        time_str = transaction["time"]
+        return time_to_ns(time_str, "RFC3339" if time_str.endswith("Z") else "UNIX")
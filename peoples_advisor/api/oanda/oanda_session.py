@@ -0,0 +1,166 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Responses that mean the request was not processed and may be sent again
+retry_any_method = {429}
+# Responses that may be retried for requests with no side effects
+retry_idempotent = {500, 502, 503, 504}
+idempotent_methods = {"get", "head", "options"}
+
+
+class CallStats:
+    def __init__(self, window: int):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.last = None
+        self.recent = deque(maxlen=window)
+
+    def record(self, latency: float, retries: int, error: bool):
+        self.count += 1
+        self.errors += int(error)
+        self.retries += retries
+        self.total += latency
+        self.min = latency if self.min is None else min(self.min, latency)
+        self.max = latency if self.max is None else max(self.max, latency)
+        self.last = latency
+        self.recent.append(latency)
+
+    def as_dict(self) -> dict:
+        recent = sorted(self.recent)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "last": self.last,
+            "p50": recent[len(recent) // 2] if recent else None,
+            "p99": recent[min(len(recent) - 1, int(len(recent) * 0.99))] if recent else None,
+        }
+
+
+class CallMetrics:
+    def __init__(self, window: int = 1000):
+        """
+        Latency statistics of api calls, grouped by method and endpoint
+
+        Args:
+            window (int, optional): The number of most recent calls per endpoint used for the percentiles
+        """
+        self.window = window
+        self._stats: Dict[str, CallStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, endpoint: str, latency: float, retries: int = 0, error: bool = False):
+        key = f"{method.upper()} {endpoint}"
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = CallStats(self.window)
+            stats.record(latency, retries, error)
+
+    def summary(self) -> Dict[str, dict]:
+        with self._lock:
+            return {key: stats.as_dict() for key, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+class OandaSession:
+    def __init__(
+        self,
+        auth: str,
+        datetime_format: str,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.25,
+        timeout: Optional[float] = 30,
+    ):
+        """
+        A keep-alive, connection pooled http session with prebuilt oanda headers, retries and latency metrics
+
+        Args:
+            auth (str): The api authorization token
+            datetime_format (str): The datetime format to request
+                see AcceptDatetimeFormat in oanda_guide.txt
+            pool_size (int, optional): The number of connections kept alive for each host
+            max_retries (int, optional): The number of times a request is retried on 429 or 5xx responses
+                NOTE: 5xx responses are only retried for GET requests, so orders are never placed twice
+            backoff_factor (float, optional): Retries wait backoff_factor * 2 ** retry seconds,
+                or the time given by a Retry-After header
+            timeout (float, optional): The number of seconds to wait for a response before giving up
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.metrics = CallMetrics()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {
+                "Authorization": f"Bearer {auth}",
+                "Content-Type": "application/json",
+                "Accept-Datetime-Format": datetime_format,
+            }
+        )
+
+    def request(self, method: str, url: str, endpoint: str, timeout=None, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying it when the response or connection error allows it
+
+        Args:
+            method (str): The http method
+            url (str): The full url to request
+            endpoint (str): The endpoint template the latency of the call is recorded under, with its ids left as
+                placeholders, e.g. 'accounts/{accountID}/orders/{orderSpecifier}'
+            timeout (float, tuple, optional): Overrides the session timeout for this request
+            **kwargs: Passed along to requests.Session.request
+        """
+        retries = 0
+        start = time.perf_counter()
+        while True:
+            try:
+                response = self.session.request(
+                    method, url, timeout=timeout if timeout is not None else self.timeout, **kwargs
+                )
+            except requests.ConnectionError:
+                if method not in idempotent_methods or retries >= self.max_retries:
+                    self.metrics.record(method, endpoint, time.perf_counter() - start, retries, error=True)
+                    raise
+                self._backoff(retries)
+                retries += 1
+                continue
+            retryable = response.status_code in retry_any_method or (
+                response.status_code in retry_idempotent and method in idempotent_methods
+            )
+            if not retryable or retries >= self.max_retries:
+                break
+            self._backoff(retries, response.headers.get("Retry-After"))
+            response.close()
+            retries += 1
+        self.metrics.record(method, endpoint, time.perf_counter() - start, retries, response.status_code >= 300)
+        return response
+
+    def close(self):
+        self.session.close()
+
+    def _backoff(self, retries: int, retry_after: Optional[str] = None):
+        try:
+            delay = float(retry_after) if retry_after is not None else None
+        except ValueError:
+            delay = None
+        time.sleep(delay if delay is not None else self.backoff_factor * 2**retries)
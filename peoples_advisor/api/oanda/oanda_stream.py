@@ -0,0 +1,94 @@
+import json
+import re
+from typing import Callable, Iterable, Iterator, Optional
+
+# A tradeable price line in OANDA's layout, capturing the time, best bid, best ask and instrument, the only fields a
+# tick needs. Lines laid out any other way are parsed as JSON instead
+_PRICE_LINE = re.compile(
+    r'\{"type":"PRICE","time":"([^"]*)","bids":\[\{"price":"([^"]*)"[^]]*\],"asks":\[\{"price":"([^"]*)"[^]]*\],'
+    r'[^{]*"tradeable":true,"instrument":"([^"]*)"'
+)
+_HEARTBEAT_LINE = b'{"type":"HEARTBEAT"'
+
+_json_loads = None
+
+
+def json_loads() -> Callable[[bytes], object]:
+    """
+    Get the fastest JSON decoder installed, orjson if it is available, otherwise the standard library's
+    """
+    global _json_loads
+    if _json_loads is None:
+        try:
+            from orjson import loads as _json_loads
+        except ImportError:
+            _json_loads = json.loads
+    return _json_loads
+
+
+class PriceRecord:
+    __slots__ = ("instrument", "time", "bid", "ask")
+
+    def __init__(self, instrument: str, time: str, bid: str, ask: str):
+        """
+        The fields of a pricing stream line a tick needs, left as the strings OANDA sent
+
+        Args:
+            instrument (str): Name of the instrument
+            time (str): The time of the price, in the datetime format of the api
+            bid (str): The best bid
+            ask (str): The best ask
+        """
+        self.instrument = instrument
+        self.time = time
+        self.bid = bid
+        self.ask = ask
+
+    def __eq__(self, other):
+        if not isinstance(other, PriceRecord):
+            return NotImplemented
+        return (self.instrument, self.time, self.bid, self.ask) == (other.instrument, other.time, other.bid, other.ask)
+
+    def __repr__(self):
+        return f"PriceRecord({self.instrument!r}, {self.time!r}, {self.bid!r}, {self.ask!r})"
+
+
+class PricingStreamDecoder:
+    def __init__(self, scan: bool = True, loads: Optional[Callable[[bytes], object]] = None):
+        """
+        Turn the lines of the pricing stream into PriceRecords of tradeable prices, skipping everything else
+
+        Args:
+            scan (bool, optional): Match the fields out of lines in OANDA's layout without parsing them as JSON
+            loads (Callable[[bytes], object], optional): The JSON decoder for lines that are not scanned
+                default: json_loads()
+        """
+        self.scan = scan
+        self.loads = loads if loads is not None else json_loads()
+
+    def decode(self, line: bytes) -> Optional[PriceRecord]:
+        """
+        Returns:
+            The PriceRecord of a tradeable price line, None for heartbeats, untradeable prices and empty lines
+        """
+        if self.scan:
+            match = _PRICE_LINE.match(line.decode("utf-8"))
+            if match is not None:
+                time, bid, ask, instrument = match.groups()
+                return PriceRecord(instrument, time, bid, ask)
+            if line.startswith(_HEARTBEAT_LINE):
+                return None
+        if not line.strip():
+            return None
+        # Lines not in OANDA's usual layout (e.g. with whitespace after the colons) are parsed in full
+        price = self.loads(line)
+        if price.get("type") != "PRICE" or not price.get("tradeable") or not price.get("bids") or not price.get("asks"):
+            return None
+        return PriceRecord(price["instrument"], price["time"], price["bids"][0]["price"], price["asks"][0]["price"])
+
+    def decode_lines(self, lines: Iterable[bytes]) -> Iterator[PriceRecord]:
+        decode = self.decode
+        for line in lines:
+            record = decode(line)
+            if record is not None:
+                yield record
@@ -0,0 +1,130 @@
+import threading
+import time
+from itertools import chain
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+from peoples_advisor.api.oanda.oanda_api import OandaApi, OandaError
+from peoples_advisor.api.oanda.oanda_stream import PriceRecord
+
+# Errors responded with that may go away on their own, anything else (a bad token or instrument) will not
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SupervisedPricingStream:
+    def __init__(
+        self,
+        api: OandaApi,
+        instruments: List[str],
+        heartbeat_timeout: float = 10.0,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        max_reconnects: Optional[int] = None,
+        backfill: bool = True,
+        stop: Optional[threading.Event] = None,
+    ):
+        """
+        Iterate the PriceRecords of the pricing stream, reconnecting through stalls and disconnects
+
+        Args:
+            api (OandaApi): The api to stream from
+            instruments (List[str]): A list of instruments
+                see InstrumentName in oanda_guide.txt
+            heartbeat_timeout (float, optional): Seconds without anything arriving, heartbeats included, after which
+                the stream is considered stalled and is opened again
+            backoff (float, optional): Seconds to wait before the first attempt to reconnect, doubled every attempt
+            max_backoff (float, optional): The longest wait between attempts
+            max_reconnects (int, optional): Raise the last error after this many attempts in a row fail, default:
+                keep trying
+            backfill (bool, optional): Ask for the prices that changed while disconnected once reconnected
+            stop (threading.Event, optional): Stop iterating, or waiting to reconnect, once this is set
+        """
+        self.api = api
+        self.instruments = instruments
+        self.heartbeat_timeout = heartbeat_timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_reconnects = max_reconnects
+        self.backfill = backfill
+        self.stop = stop if stop is not None else threading.Event()
+        self.reconnects = 0
+        self.backfilled = 0
+        # Seconds spent between losing the stream and having it open again
+        self.downtime = 0.0
+        self.last_error: Optional[Exception] = None
+        # instrument -> the time of the last price yielded for it, in the api's datetime format. OANDA sends times at
+        # a fixed width in either format, so they are compared as strings rather than parsed
+        self._last_times: Dict[str, str] = {}
+
+    def __iter__(self) -> Iterator[PriceRecord]:
+        last_times = self._last_times
+        stop = self.stop
+        failures = 0
+        lost = None
+        while not stop.is_set():
+            records = None
+            error = None
+            try:
+                # OANDA sends a heartbeat every 5 seconds, so a stream silent for heartbeat_timeout has stalled
+                records = self.api.pricing_records(self.instruments, heartbeat_timeout=self.heartbeat_timeout)
+                # The connection is made by the first read, so prices are only backfilled once the stream is open
+                first = next(records, None)
+                if lost is not None:
+                    self.downtime += time.monotonic() - lost
+                    self.reconnects += 1
+                    lost = None
+                    if self.backfill and last_times:
+                        yield from self._backfill()
+                if first is not None:
+                    failures = 0
+                # Prices no newer than the last yielded for their instrument, such as the opening snapshot, are skipped
+                for record in chain((first,), records) if first is not None else records:
+                    last = last_times.get(record.instrument)
+                    if last is not None and record.time <= last:
+                        continue
+                    last_times[record.instrument] = record.time
+                    yield record
+                    if stop.is_set():
+                        return
+                # The server ended the stream, which is treated as any other disconnect
+            except (requests.RequestException, OandaError) as caught:
+                if isinstance(caught, OandaError) and caught.status not in _RETRY_STATUSES:
+                    raise
+                error = self.last_error = caught
+            finally:
+                if records is not None:
+                    records.close()
+            if lost is None:
+                lost = time.monotonic()
+            failures += 1
+            if self.max_reconnects is not None and failures > self.max_reconnects:
+                if error is not None:
+                    raise error
+                raise OandaError(f"The pricing stream ended {failures} times in a row")
+            stop.wait(min(self.backoff * 2 ** (failures - 1), self.max_backoff))
+
+    def close(self):
+        """
+        Stop iterating after the price being handled, or at once if waiting to reconnect
+        """
+        self.stop.set()
+
+    def _backfill(self) -> Iterator[PriceRecord]:
+        # The latest price of every instrument that changed since the oldest of the last prices yielded, rather than
+        # every tick missed while disconnected
+        last_times = self._last_times
+        since = min(last_times.values())
+        prices = self.api.get_instrument_pricing(self.instruments, since=since)["prices"]
+        records = [
+            PriceRecord(price["instrument"], price["time"], price["bids"][0]["price"], price["asks"][0]["price"])
+            for price in prices
+            if price.get("tradeable") and price.get("bids") and price.get("asks")
+        ]
+        records.sort(key=lambda record: record.time)
+        for record in records:
+            last = last_times.get(record.instrument)
+            if last is None or record.time > last:
+                last_times[record.instrument] = record.time
+                self.backfilled += 1
+                yield record
@@ -3,10 +3,6 @@ from pathlib import Path
 from queue import PriorityQueue
 from threading import Event
 
-from peoples_advisor.backtest.oanda.oanda_backtest import (
-    OandaBacktestingData,
-    OandaBacktestingGen,
-)
 from peoples_advisor.settings import (
     BROKER,
     API_TOKEN,
@@ -17,6 +13,8 @@ from peoples_advisor.settings import (
 
 def backtesting_gen_factory(priority_queue: PriorityQueue, run_flag: Event, data_path: Path):
     if BROKER == "OANDA":
+        from peoples_advisor.backtest.oanda.oanda_backtest import OandaBacktestingGen
+
         return OandaBacktestingGen(priority_queue, run_flag, data_path)
     else:
         return
@@ -29,6 +27,8 @@ def historical_gen_factory(
     filename: str = None,
 ):
     if BROKER == "OANDA":
+        from peoples_advisor.backtest.oanda.oanda_backtest import OandaBacktestingData
+
         return OandaBacktestingData(
             API_TOKEN,
             INSTRUMENTS,
@@ -0,0 +1,145 @@
+from decimal import Decimal
+from heapq import heapify, heappop, heappush
+from itertools import count
+from typing import Dict, List, Optional, Union
+
+from peoples_advisor.common.common import PAError
+from peoples_advisor.common.fixed_price import FixedPrice
+from peoples_advisor.event.event import PriceEvent, QuoteEvent
+from peoples_advisor.order.forex.common.common import BaseOrder, ConditionalOrder, MarketOrder
+
+# Cancelled entries are only swept out of the ladders once there are this many and more than there are live orders
+_COMPACT_AFTER = 1024
+
+
+class Fill:
+    __slots__ = ("order_id", "order", "price", "time")
+
+    def __init__(self, order_id: int, order: BaseOrder, price: Union[FixedPrice, Decimal], time):
+        """
+        The execution of an order
+
+        Args:
+            order_id (int): The id submit gave the order
+            order (BaseOrder): The order filled, in full
+            price (FixedPrice): The ask of the filling price for buys, the bid for sells
+            time (datetime, int): The time of the filling price
+        """
+        self.order_id = order_id
+        self.order = order
+        self.price = price
+        self.time = time
+
+    def __repr__(self):
+        return f"Fill({self.order_id}, {self.order.type}, {self.order.instrument}, {self.order.units}, {self.price})"
+
+
+class SimulatedBroker:
+    def __init__(self, portfolio=None):
+        """
+        Fill market and conditional orders against the prices of a backtest
+
+        Market orders fill at the next price of their instrument. Conditional orders fill at the first price that
+        crosses their trigger price, at that price, so gaps past a trigger are filled where the market is. Buys are
+        filled at the ask and sells at the bid.
+
+        Args:
+            portfolio (optional): A Portfolio given every price before orders are filled, then a position for every fill
+        """
+        self.portfolio = portfolio
+        # order id -> every pending order
+        self.orders: Dict[int, BaseOrder] = {}
+        self._ids = count(1)
+        # instrument -> four heaps of (trigger key, order id), ladders of buys triggering at or below their price
+        # (limit, take profit), buys at or above it (stop, stop loss), then the same two for sells. Below triggers are
+        # keyed by -price, so a tick only looks at the top of each ladder and pops the orders it crosses. Cancelled
+        # orders stay in their ladder and are skipped when they surface
+        self._ladders: Dict[str, List[list]] = {}
+        # instrument -> the ids of its pending market orders
+        self._market: Dict[str, List[int]] = {}
+        self._cancelled = 0
+
+    def submit(self, order: BaseOrder) -> int:
+        """
+        Add an order to the book, returning its id
+        """
+        if not order.units:
+            raise PAError(f"Cannot submit a {order.type} order for 0 units of {order.instrument}")
+        order_id = next(self._ids)
+        if isinstance(order, ConditionalOrder):
+            ladders = self._ladders.get(order.instrument)
+            if ladders is None:
+                ladders = self._ladders[order.instrument] = [[], [], [], []]
+            trigger = _decimal(order.trigger_price)
+            below = order.triggers_below
+            ladder = (0 if below else 1) + (0 if order.units > 0 else 2)
+            # Ladders of orders triggering below pop their highest trigger first, so their keys are negated
+            heappush(ladders[ladder], (-trigger if below else trigger, order_id))
+        elif isinstance(order, MarketOrder):
+            self._market.setdefault(order.instrument, []).append(order_id)
+        else:
+            raise PAError(f"Unsupported order type {order.type}")
+        self.orders[order_id] = order
+        return order_id
+
+    def cancel(self, order_id: int) -> Optional[BaseOrder]:
+        """
+        Remove a pending order, returning it, or None if it was already filled or cancelled
+        """
+        order = self.orders.pop(order_id, None)
+        if order is not None and isinstance(order, ConditionalOrder):
+            self._cancelled += 1
+            if self._cancelled > _COMPACT_AFTER and self._cancelled > len(self.orders):
+                self._compact()
+        return order
+
+    def update_price(self, price: Union[PriceEvent, QuoteEvent]) -> List[Fill]:
+        """
+        Fill every pending order of the instrument that price crosses, returning the fills in the order submitted
+        """
+        if self.portfolio is not None:
+            self.portfolio.update_price(price)
+        instrument = price.instrument
+        ladders = self._ladders.get(instrument)
+        market = self._market.pop(instrument, None)
+        if ladders is None and market is None:
+            return []
+        orders = self.orders
+        filled = []
+        if market is not None:
+            filled.extend(order_id for order_id in market if order_id in orders)
+        if ladders is not None:
+            ask, bid = _decimal(price.ask), _decimal(price.bid)
+            for ladder, limit in zip(ladders, (-ask, ask, -bid, bid)):
+                while ladder and ladder[0][0] <= limit:
+                    order_id = heappop(ladder)[1]
+                    if order_id in orders:
+                        filled.append(order_id)
+                    else:
+                        self._cancelled -= 1
+        if not filled:
+            return []
+        filled.sort()
+        fills = []
+        for order_id in filled:
+            order = orders.pop(order_id)
+            fill_price = price.ask if order.units > 0 else price.bid
+            fills.append(Fill(order_id, order, fill_price, price.time))
+            if self.portfolio is not None:
+                self.portfolio.add_position(instrument, Decimal(order.units), _decimal(fill_price))
+        return fills
+
+    def _compact(self):
+        # Sweep the cancelled entries out of every ladder
+        orders = self.orders
+        for ladders in self._ladders.values():
+            for ladder in ladders:
+                ladder[:] = [entry for entry in ladder if entry[1] in orders]
+                heapify(ladder)
+        self._cancelled = 0
+
+
+def _decimal(price: Union[FixedPrice, Decimal, int]) -> Decimal:
+    if price.__class__ is FixedPrice:
+        return price.decimal
+    return Decimal(price)
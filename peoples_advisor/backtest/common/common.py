@@ -1,13 +1,20 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
+from typing import Iterable, Iterator, List
+
+from peoples_advisor.backtest.common.history import HISTORY_EXTENSION, PRICE_CODE, HistoryReader
+from peoples_advisor.event.event import BaseEvent, EventType, OrderEvent, SignalEvent
+from peoples_advisor.price.common.common import CandleAggregator
+from peoples_advisor.signal.signal import BatchSignalStrategy, SignalStrategy, optional_numpy
+from peoples_advisor.sizing.sizing import SizingStrategy
 
 base_path = Path(__file__).parents[2] / "data" / "history"
 
 
-def standard_filename(from_time: datetime, to_time: datetime, instruments):
+def standard_filename(from_time: datetime, to_time: datetime, instruments, extension: str = HISTORY_EXTENSION):
     filename = from_time.strftime("%Y.%m.%d") + "-" + to_time.strftime("%Y.%m.%d")
-    filename += "[" + "-".join(instruments) + "]" + ".txt"
+    filename += "[" + "-".join(instruments) + "]" + extension
     return filename
 
 
@@ -42,3 +49,123 @@ class BaseBacktestingGen(ABC):
     @abstractmethod
     def gen(self):
         pass
+
+
+class BacktestDriver:
+    def __init__(
+        self, sig_strategy: SignalStrategy, size_strategy: SizingStrategy, portfolio=None, keep_orders: bool = False
+    ):
+        """
+        Run a backtest in the calling thread, passing each event straight to the strategies instead of through Control
+
+        Each price is handled completely (price -> signal -> order) before the next one is read, which is the order
+        the Control queue processes them in, since signals and orders outrank prices.
+
+        Strategies with granularities are given each candle as it closes, before the price that closed it, as they
+        are live.
+
+        A BatchSignalStrategy without granularities run over a HistoryReader without a portfolio is given arrays of
+        prices instead, when numpy is installed. Its signals are passed to the sizing strategy in the same
+        chronological order.
+
+        Args:
+            sig_strategy (SignalStrategy): The signal strategy being tested
+            size_strategy (SizingStrategy): The sizing strategy being tested
+            portfolio (optional): Anything with an update_price method, given every price and quote
+            keep_orders (bool, optional): Keep every order generated in order_events, not just count them in orders
+        """
+        self.sig_strategy = sig_strategy
+        self.size_strategy = size_strategy
+        self.portfolio = portfolio
+        self.signals = 0
+        self.orders = 0
+        self.keep_orders = keep_orders
+        self.order_events: List[OrderEvent] = []
+
+    def run(self, events: Iterable[BaseEvent]) -> Iterator[int]:
+        """
+        Process events until they run out or a STOP event, yielding the number of events processed since the last
+        yield for progress indication
+        """
+        if (
+            isinstance(events, HistoryReader)
+            and isinstance(self.sig_strategy, BatchSignalStrategy)
+            and self.portfolio is None
+            and not self.sig_strategy.granularities
+            and optional_numpy() is not None
+        ):
+            return self._run_batches(events)
+        return self._run_events(events)
+
+    def _run_events(self, events: Iterable[BaseEvent]) -> Iterator[int]:
+        gen_signal = self.sig_strategy.gen_signal
+        gen_bar_signal = self.sig_strategy.gen_bar_signal
+        update_price = self.portfolio.update_price if self.portfolio is not None else None
+        granularities = self.sig_strategy.granularities
+        aggregator = CandleAggregator(granularities) if granularities else None
+        for event in events:
+            code = event.code
+            if code == EventType.PRICE:
+                if update_price is not None:
+                    update_price(event)
+                if aggregator is not None:
+                    for bar in aggregator.update(event):
+                        self._handle_signal(gen_bar_signal(bar))
+                self._handle_signal(gen_signal(event))
+            elif code == EventType.QUOTE:
+                if update_price is not None:
+                    update_price(event)
+            elif code == EventType.STOP or code == EventType.EXIT:
+                break
+            yield 1
+
+    def _handle_signal(self, signal_event: SignalEvent):
+        if signal_event is not None:
+            self.signals += 1
+            order_event = self.size_strategy.gen_order(signal_event)
+            if order_event is not None:
+                self.orders += 1
+                if self.keep_orders:
+                    self.order_events.append(order_event)
+
+    def _run_batches(self, reader: HistoryReader) -> Iterator[int]:
+        numpy = optional_numpy()
+        timestamps = numpy.frombuffer(reader.timestamps, dtype=numpy.int64)
+        bids = numpy.frombuffer(reader.bids, dtype=numpy.int64)
+        asks = numpy.frombuffer(reader.asks, dtype=numpy.int64)
+        instrument_ids = numpy.frombuffer(reader.instrument_ids, dtype=numpy.uint16)
+        types = numpy.frombuffer(reader.types, dtype=numpy.uint8)
+        sides = {BatchSignalStrategy.BUY: "BUY", BatchSignalStrategy.SELL: "SELL"}
+        chunk_size = self.sig_strategy.chunk_size or max(reader.count, 1)
+        for start in range(0, reader.count, chunk_size):
+            end = min(start + chunk_size, reader.count)
+            chunk_ids = instrument_ids[start:end]
+            is_price = types[start:end] == PRICE_CODE
+            signal_rows, signal_ids, signal_sides = [], [], []
+            for instrument_id in numpy.unique(chunk_ids[is_price]):
+                rows = numpy.flatnonzero(is_price & (chunk_ids == instrument_id)) + start
+                scale = 10.0 ** reader.precisions[instrument_id]
+                signals = numpy.asarray(
+                    self.sig_strategy.gen_signals(
+                        reader.instruments[instrument_id], timestamps[rows], bids[rows] / scale, asks[rows] / scale
+                    )
+                )
+                hits = numpy.flatnonzero(signals)
+                signal_rows.append(rows[hits])
+                signal_ids.append(numpy.full(len(hits), instrument_id))
+                signal_sides.append(signals[hits])
+            if signal_rows:
+                # Signals of every instrument are handed to the sizing strategy in the order of their prices
+                rows = numpy.concatenate(signal_rows)
+                order = numpy.argsort(rows, kind="stable")
+                for row, instrument_id, side in zip(
+                    rows[order].tolist(),
+                    numpy.concatenate(signal_ids)[order].tolist(),
+                    numpy.concatenate(signal_sides)[order].tolist(),
+                ):
+                    if side not in sides:
+                        continue
+                    self._handle_signal(
+                        SignalEvent(reader.instruments[instrument_id], int(timestamps[row]), sides[side])
+                    )
+            yield end - start
@@ -0,0 +1,327 @@
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+from peoples_advisor.common.common import PAError
+from peoples_advisor.common.fixed_price import FixedPrice, price_places, scaled_value
+from peoples_advisor.common.timestamps import datetime_to_ns, ns_to_datetime
+from peoples_advisor.event.event import PriceEvent, QuoteEvent, events_from_reprs
+
+HISTORY_EXTENSION = ".hist"
+TEXT_EXTENSION = ".txt"
+
+PRICE_CODE = 0
+QUOTE_CODE = 1
+
+# A history file is, little-endian: the header, then each instrument's name length (B), name (ascii) and places (B),
+# zero padding to a multiple of 8, then the columns of timestamps (epoch nanoseconds), bids and asks (the values of
+# their FixedPrices), instruments and types. The 8 byte columns come first so each can be viewed in a memory map
+_MAGIC = b"PAHIST"
+_VERSION = 1
+_HEADER = struct.Struct("<6sHQI4x")
+_COLUMN_TYPECODES = ("q", "q", "q", "H", "B")
+_EVENT_CODES = {"PRICE": PRICE_CODE, "QUOTE": QUOTE_CODE}
+_EVENT_CLASSES = {PRICE_CODE: PriceEvent, QUOTE_CODE: QuoteEvent}
+_SWAP_BYTES = sys.byteorder != "little"
+_TEXT_BLOCK_SIZE = 1 << 20
+
+
+def decimal_places(price: Union[FixedPrice, Decimal]) -> int:
+    return price_places(price)
+
+
+def to_scaled(price: Union[FixedPrice, Decimal], places: int) -> int:
+    try:
+        return scaled_value(price, places)
+    except ValueError as error:
+        raise PAError(str(error))
+
+
+class HistoryWriter:
+    def __init__(
+        self,
+        filepath: Union[str, Path],
+        precisions: Optional[Dict[str, int]] = None,
+        chunk_size: int = 65536,
+    ):
+        """
+        Write price and quote events to a binary history file.
+
+        Rows are buffered per column and spilled to temporary files every chunk_size rows. The final file is
+        assembled when the writer is closed, since every column must know the final row count.
+
+        Args:
+            filepath (str, Path): The history file to create
+            precisions (Dict[str, int], optional): The number of decimal places to store for each instrument
+                Instruments not given are inferred from the first price written for them
+            chunk_size (int, optional): The number of rows to buffer in memory before spilling to disk
+        """
+        self.filepath = Path(filepath)
+        self.precisions = dict(precisions) if precisions else {}
+        self.chunk_size = chunk_size
+        self.instruments: List[str] = []
+        self.count = 0
+        self._instrument_ids: Dict[str, int] = {}
+        self._columns = [array(typecode) for typecode in _COLUMN_TYPECODES]
+        self._spills = [tempfile.TemporaryFile() for _ in _COLUMN_TYPECODES]
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+    def instrument_id(self, instrument: str, places: Optional[int] = None) -> int:
+        instrument_id = self._instrument_ids.get(instrument)
+        if instrument_id is None:
+            if instrument not in self.precisions:
+                if places is None:
+                    raise PAError(f"Unknown decimal places for {instrument}")
+                self.precisions[instrument] = places
+            instrument_id = len(self.instruments)
+            self._instrument_ids[instrument] = instrument_id
+            self.instruments.append(instrument)
+        return instrument_id
+
+    def write(self, event: Union[PriceEvent, QuoteEvent]):
+        code = _EVENT_CODES.get(event.type)
+        if code is None:
+            raise PAError(f"Only PRICE and QUOTE events can be saved as history, not {event.type}")
+        instrument_id = self._instrument_ids.get(event.instrument)
+        if instrument_id is None:
+            # The places of an instrument not seen before are the widest of its first price, as convert_text_history
+            # infers them
+            instrument_id = self.instrument_id(
+                event.instrument, max(decimal_places(event.bid), decimal_places(event.ask))
+            )
+        places = self.precisions[event.instrument]
+        self.write_row(
+            instrument_id,
+            code,
+            event.timestamp,
+            to_scaled(event.bid, places),
+            to_scaled(event.ask, places),
+        )
+
+    def write_row(self, instrument_id: int, code: int, timestamp: int, bid: int, ask: int):
+        timestamps, bids, asks, instruments, types = self._columns
+        timestamps.append(timestamp)
+        bids.append(bid)
+        asks.append(ask)
+        instruments.append(instrument_id)
+        types.append(code)
+        self.count += 1
+        if len(timestamps) >= self.chunk_size:
+            self._spill()
+
+    def close(self):
+        if self._closed:
+            return
+        self._spill()
+        dictionary = bytearray()
+        for instrument in self.instruments:
+            name = instrument.encode("ascii")
+            dictionary += struct.pack("<B", len(name)) + name + struct.pack("<B", self.precisions[instrument])
+        header = _HEADER.pack(_MAGIC, _VERSION, self.count, len(self.instruments))
+        padding = -(len(header) + len(dictionary)) % 8
+        with open(self.filepath, "wb") as f:
+            f.write(header)
+            f.write(dictionary)
+            f.write(b"\x00" * padding)
+            for spill in self._spills:
+                spill.seek(0)
+                shutil.copyfileobj(spill, f)
+        self._discard()
+
+    def _spill(self):
+        for column, spill in zip(self._columns, self._spills):
+            if _SWAP_BYTES:
+                column.byteswap()
+            column.tofile(spill)
+            del column[:]
+
+    def _discard(self):
+        for spill in self._spills:
+            spill.close()
+        self._closed = True
+
+
+class TextHistoryWriter:
+    def __init__(self, filepath: Union[str, Path]):
+        """
+        Write price and quote events to a legacy text history file, one repr(event) per line.
+
+        Args:
+            filepath (str, Path): The history file to create
+        """
+        self.filepath = Path(filepath)
+        self.count = 0
+        self._file = open(self.filepath, "w")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, event: Union[PriceEvent, QuoteEvent]):
+        self._file.write(repr(event) + "\n")
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+
+class HistoryReader:
+    def __init__(self, filepath: Union[str, Path]):
+        """
+        Memory map a binary history file for reading.
+
+        The timestamps, bids, asks, instrument_ids and types attributes are views over the mapped file, so they can
+        be indexed, sliced or handed to array libraries without reading the whole file into memory.
+
+        Args:
+            filepath (str, Path): The history file to open
+        """
+        self.filepath = Path(filepath)
+        self._file = open(self.filepath, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, instrument_count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise PAError(f"{self.filepath.name} is not a version {_VERSION} history file")
+        self.count = count
+        self.instruments: List[str] = []
+        self.precisions: List[int] = []
+        offset = _HEADER.size
+        for _ in range(instrument_count):
+            length = self._mmap[offset]
+            self.instruments.append(self._mmap[offset + 1 : offset + 1 + length].decode("ascii"))
+            self.precisions.append(self._mmap[offset + 1 + length])
+            offset += length + 2
+        offset += -offset % 8
+        self._views = []
+        columns = []
+        for typecode in _COLUMN_TYPECODES:
+            size = array(typecode).itemsize * count
+            columns.append(self._column(offset, size, typecode))
+            offset += size
+        self.timestamps, self.bids, self.asks, self.instrument_ids, self.types = columns
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self) -> Iterator[Union[PriceEvent, QuoteEvent]]:
+        instruments = self.instruments
+        precisions = self.precisions
+        for timestamp, bid, ask, instrument_id, code in zip(
+            self.timestamps, self.bids, self.asks, self.instrument_ids, self.types
+        ):
+            places = precisions[instrument_id]
+            yield _EVENT_CLASSES[code](
+                instruments[instrument_id],
+                timestamp,
+                FixedPrice(bid, places),
+                FixedPrice(ask, places),
+            )
+
+    def close(self):
+        try:
+            for view in getattr(self, "_views", []):
+                view.release()
+            if not self._mmap.closed:
+                self._mmap.close()
+        except BufferError:
+            # Arrays made from the columns, such as numpy.frombuffer's, are still alive, e.g. in the traceback of an
+            # error being raised through a with block. The map is closed once they are collected instead
+            pass
+        self._views = []
+        self._file.close()
+
+    def _column(self, offset: int, size: int, typecode: str):
+        if _SWAP_BYTES:
+            column = array(typecode, self._mmap[offset : offset + size])
+            column.byteswap()
+            return column
+        raw = memoryview(self._mmap)[offset : offset + size]
+        view = raw.cast(typecode)
+        self._views.extend((view, raw))
+        return view
+
+
+def is_binary_history(filepath: Union[str, Path]) -> bool:
+    return Path(filepath).suffix == HISTORY_EXTENSION
+
+
+def history_writer(
+    filepath: Union[str, Path], precisions: Optional[Dict[str, int]] = None
+) -> Union[HistoryWriter, TextHistoryWriter]:
+    """
+    Open a writer for a history file, choosing the format from the file extension
+    """
+    if is_binary_history(filepath):
+        return HistoryWriter(filepath, precisions)
+    return TextHistoryWriter(filepath)
+
+
+def history_events(filepath: Union[str, Path]) -> Iterator[Union[PriceEvent, QuoteEvent]]:
+    """
+    Iterate over the events of a history file, in either the binary or the legacy text format
+    """
+    if is_binary_history(filepath):
+        with HistoryReader(filepath) as reader:
+            yield from reader
+    else:
+        with open(filepath) as f:
+            while True:
+                lines = f.readlines(_TEXT_BLOCK_SIZE)
+                if not lines:
+                    break
+                yield from events_from_reprs(lines)
+
+
+def history_length(filepath: Union[str, Path]) -> int:
+    if is_binary_history(filepath):
+        with open(filepath, "rb") as f:
+            return _HEADER.unpack(f.read(_HEADER.size))[2]
+    with open(filepath) as f:
+        return sum(1 for _ in f)
+
+
+def convert_text_history(text_path: Union[str, Path], binary_path: Union[str, Path] = None) -> Path:
+    """
+    Convert a legacy text history file (one repr(event) per line) into the binary history format
+
+    Args:
+        text_path (str, Path): The text history file to convert
+        binary_path (str, Path, optional): Where to write the binary history file
+            default: text_path with its suffix replaced by HISTORY_EXTENSION
+    """
+    text_path = Path(text_path)
+    binary_path = Path(binary_path) if binary_path else text_path.with_suffix(HISTORY_EXTENSION)
+    # Decimal places are not guaranteed to be constant across a text file, so find the widest for each instrument
+    precisions = {}
+    for event in history_events(text_path):
+        places = max(decimal_places(event.bid), decimal_places(event.ask))
+        if places > precisions.get(event.instrument, -1):
+            precisions[event.instrument] = places
+    with HistoryWriter(binary_path, precisions) as writer:
+        for event in history_events(text_path):
+            writer.write(event)
+    return binary_path
@@ -0,0 +1,136 @@
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from decimal import getcontext, setcontext
+from pathlib import Path
+from queue import Empty
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+from peoples_advisor.backtest.common.common import BacktestDriver
+from peoples_advisor.backtest.common.history import HistoryReader, convert_text_history, is_binary_history
+from peoples_advisor.event.event import OrderEvent
+from peoples_advisor.signal.signal import SignalStrategy
+from peoples_advisor.sizing.sizing import SizingStrategy
+
+
+class BacktestResult:
+    def __init__(
+        self,
+        index: int,
+        label: str,
+        events: int,
+        signals: int,
+        orders: int,
+        order_events: Optional[List[OrderEvent]] = None,
+    ):
+        """
+        What a single strategy pair did over a backtest
+
+        Args:
+            index (int): The position of the strategy pair in the list of pairs that was backtested
+            label (str): The names of the signal and sizing strategy
+            events (int): The number of history events processed
+            signals (int): The number of signals generated
+            orders (int): The number of orders generated
+            order_events (List[OrderEvent], optional): Every order generated, when they were asked to be kept
+        """
+        self.index = index
+        self.label = label
+        self.events = events
+        self.signals = signals
+        self.orders = orders
+        self.order_events = order_events
+
+
+def strategy_label(strategy_pair: Tuple[SignalStrategy, SizingStrategy]) -> str:
+    return f"{type(strategy_pair[0]).__name__}, {type(strategy_pair[1]).__name__}"
+
+
+def run_backtests(
+    strategy_pairs: Sequence[Tuple[SignalStrategy, SizingStrategy]],
+    data_path: Union[str, Path],
+    max_workers: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    report_every: int = 10000,
+    keep_orders: bool = False,
+) -> List[BacktestResult]:
+    """
+    Backtest several strategy pairs over the same history at once, one pair per process
+
+    Every worker maps the same binary history file, so the data is read from disk once and shared through the page
+    cache. A text history file is converted to a temporary binary file first.
+
+    Args:
+        strategy_pairs (Sequence[Tuple[SignalStrategy, SizingStrategy]]): The strategy pairs to backtest
+            NOTE: The strategies are pickled into the workers, so state they build up is not seen by the caller
+        data_path (str, Path): The history file to backtest over
+        max_workers (int, optional): The number of processes to use
+            default: the number of cpus
+        on_progress (Callable[[int, int], None], optional): Called in this process with the index of a strategy pair
+            and the number of events it has processed so far
+        report_every (int, optional): The number of events between progress reports from each worker
+        keep_orders (bool, optional): Send every order generated back in order_events, not just their number
+            NOTE: A long backtest that orders often can generate more orders than fit in memory
+    """
+    data_path = Path(data_path)
+    with tempfile.TemporaryDirectory() as directory:
+        if not is_binary_history(data_path):
+            data_path = convert_text_history(data_path, Path(directory) / data_path.name)
+        # Workers are spawned rather than forked, forking while the cli's progress bar or the live threads run can
+        # leave a child waiting on a lock held by a thread that was not copied. They are given this process's
+        # decimal context, which forked workers would have inherited
+        context = multiprocessing.get_context("spawn")
+        with context.Manager() as manager, ProcessPoolExecutor(
+            max_workers, mp_context=context, initializer=setcontext, initargs=(getcontext().copy(),)
+        ) as pool:
+            progress = manager.Queue()
+            futures = [
+                pool.submit(_backtest_worker, index, pair[0], pair[1], data_path, progress, report_every, keep_orders)
+                for index, pair in enumerate(strategy_pairs)
+            ]
+            remaining = list(futures)
+            while remaining:
+                _report_progress(progress, on_progress, timeout=0.1)
+                remaining = [future for future in remaining if not future.done()]
+            _report_progress(progress, on_progress)
+            return [future.result() for future in futures]
+
+
+def _report_progress(progress, on_progress: Optional[Callable[[int, int], None]], timeout: Optional[float] = None):
+    # Pass along every progress report waiting in the queue, waiting up to timeout for the first one
+    try:
+        report = progress.get(timeout=timeout) if timeout else progress.get_nowait()
+        while True:
+            if on_progress is not None:
+                on_progress(*report)
+            report = progress.get_nowait()
+    except Empty:
+        pass
+
+
+def _backtest_worker(
+    index: int,
+    sig_strategy: SignalStrategy,
+    size_strategy: SizingStrategy,
+    data_path: Path,
+    progress,
+    report_every: int,
+    keep_orders: bool,
+) -> BacktestResult:
+    driver = BacktestDriver(sig_strategy, size_strategy, keep_orders=keep_orders)
+    events, next_report = 0, report_every
+    with HistoryReader(data_path) as reader:
+        for processed in driver.run(reader):
+            events += processed
+            if events >= next_report:
+                progress.put((index, events))
+                next_report = events + report_every
+    progress.put((index, events))
+    return BacktestResult(
+        index,
+        strategy_label((sig_strategy, size_strategy)),
+        events,
+        driver.signals,
+        driver.orders,
+        driver.order_events if keep_orders else None,
+    )
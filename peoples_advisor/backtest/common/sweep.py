@@ -0,0 +1,77 @@
+from itertools import product
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Type, Union
+
+from peoples_advisor.backtest.common.parallel import BacktestResult, run_backtests
+from peoples_advisor.signal.signal import SignalStrategy
+from peoples_advisor.sizing.sizing import SizingStrategy
+
+
+class SweepResult:
+    def __init__(self, sig_params: dict, size_params: dict, result: BacktestResult, score: float):
+        """
+        The backtest of a single parameter combination of a sweep
+
+        Args:
+            sig_params (dict): The keyword arguments the signal strategy was built with
+            size_params (dict): The keyword arguments the sizing strategy was built with
+            result (BacktestResult): What the strategies did over the backtest
+            score (float): The score the sweep ranked the combination by
+        """
+        self.sig_params = sig_params
+        self.size_params = size_params
+        self.result = result
+        self.score = score
+
+    @property
+    def params(self) -> dict:
+        return {**self.sig_params, **self.size_params}
+
+
+def parameter_grid(grid: Optional[Dict[str, Sequence]]) -> List[dict]:
+    """
+    Expand {name: [values, ...]} into every combination of keyword arguments, in the order the values are listed
+    """
+    if not grid:
+        return [{}]
+    names = list(grid)
+    return [dict(zip(names, values)) for values in product(*(grid[name] for name in names))]
+
+
+def run_sweep(
+    sig_strategy: Type[SignalStrategy],
+    size_strategy: Type[SizingStrategy],
+    data_path: Union[str, Path],
+    score: Callable[[BacktestResult], float],
+    sig_grid: Optional[Dict[str, Sequence]] = None,
+    size_grid: Optional[Dict[str, Sequence]] = None,
+    max_workers: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> List[SweepResult]:
+    """
+    Backtest every combination of strategy parameters over one history file, ranked from best to worst score
+
+    Every combination is a strategy pair built with one set of keyword arguments from each grid. The pairs are spread
+    across processes by run_backtests, sharing one memory mapped copy of the history.
+
+    Args:
+        sig_strategy (Type[SignalStrategy]): The signal strategy class to sweep
+        size_strategy (Type[SizingStrategy]): The sizing strategy class to sweep
+        data_path (str, Path): The history file to backtest over
+        score (Callable[[BacktestResult], float]): Scores a backtest, higher is better
+        sig_grid (Dict[str, Sequence], optional): The values to try for each keyword argument of sig_strategy
+        size_grid (Dict[str, Sequence], optional): The values to try for each keyword argument of size_strategy
+        max_workers (int, optional): The number of processes to use
+            default: the number of cpus
+        on_progress (Callable[[int, int], None], optional): Called with the index of a combination, in the order of
+            the unranked grid, and the number of events it has processed so far
+    """
+    combinations = list(product(parameter_grid(sig_grid), parameter_grid(size_grid)))
+    pairs = [(sig_strategy(**sig_params), size_strategy(**size_params)) for sig_params, size_params in combinations]
+    results = run_backtests(pairs, data_path, max_workers=max_workers, on_progress=on_progress)
+    sweep = [
+        SweepResult(sig_params, size_params, result, score(result))
+        for (sig_params, size_params), result in zip(combinations, results)
+    ]
+    # sorted is stable, so combinations with equal scores stay in grid order
+    return sorted(sweep, key=lambda sweep_result: sweep_result.score, reverse=True)
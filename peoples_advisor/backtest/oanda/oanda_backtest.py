@@ -1,17 +1,23 @@
+import heapq
+from contextlib import nullcontext
 from decimal import Decimal
 from queue import PriorityQueue
 from threading import Event
-from typing import List
+from typing import List, Optional, Tuple
 
 from peoples_advisor.api.oanda.oanda_api import OandaApi
+from peoples_advisor.api.oanda.oanda_candle_cache import OandaCandleCache
+from peoples_advisor.api.oanda.oanda_prefetch import CandlePrefetcher
 from peoples_advisor.api.oanda.unofficial_oanda_api import get_historical_spreads
 from peoples_advisor.backtest.common.common import *
+from peoples_advisor.backtest.common.history import history_events, history_writer
 from peoples_advisor.common.common import extend_instrument_list
+from peoples_advisor.common.fixed_price import FixedPrice
+from peoples_advisor.common.timestamps import parse_timestamps
 from peoples_advisor.event.event import (
     PriceEvent,
     QuoteEvent,
     StopEvent,
-    event_from_repr,
 )
 
 
@@ -25,6 +31,9 @@ class OandaBacktestingData(BaseBacktestingData):
         to_time: datetime,
         granularity: str = None,
         filename: str = None,
+        max_in_flight: int = 4,
+        rate_limit: Optional[float] = 100,
+        cache: bool = True,
     ):
         super().__init__()
         self.api = OandaApi(api_token, live=False, datetime_format="UNIX")
@@ -37,95 +46,150 @@ class OandaBacktestingData(BaseBacktestingData):
             filename = standard_filename(from_time, to_time, instruments)
         self.filepath = history_filepath(filename)
         self.filename = filename
+        self.max_in_flight = max_in_flight
+        self.rate_limit = rate_limit
+        self.cache = cache
 
     def gen(self):
         start = self.from_datetime.timestamp()
         end = self.to_datetime.timestamp()
         all_instruments = extend_instrument_list(self.instruments, self.account_currency)
-        prices, spreads, pointers = {}, {}, {}
-        # Initialize the first page of prices for each instrument and initialize the pointers to walk the lists
-        for instrument in all_instruments:
-            candles = self.api.get_instrument_candles(
-                instrument, from_time=str(start), count=5000, granularity=self.gran
+        # Candles already in the local candle store are read from disk instead of downloaded again
+        source = OandaCandleCache(self.api) if self.cache else nullcontext(self.api)
+        with source as candle_source:
+            # Pages of every instrument are downloaded concurrently and buffered until the merge reaches them
+            prefetcher = CandlePrefetcher(
+                candle_source,
+                all_instruments,
+                from_time=str(start),
+                is_past_end=lambda time: float(time) >= end,
+                max_in_flight=self.max_in_flight,
+                rate_limit=self.rate_limit,
+                granularity=self.gran,
             )
-            candles = candles.get("candles")
+            with prefetcher, history_writer(self.filepath) as f:
+                yield from self._merge(prefetcher, f, end)
+
+    def _merge(self, prefetcher: CandlePrefetcher, f, end: float):
+        # Merge the pages of every instrument into a single chronological history file
+        all_instruments = prefetcher.instruments
+        cursors = []
+        # Initialize the first page of prices and the spreads for each instrument
+        for order, instrument in enumerate(all_instruments):
+            candles = prefetcher.next_page(instrument)
             if len(candles) > 0:
-                prices.update({instrument: candles})
-                spreads.update({instrument: get_historical_spreads(instrument, since=self.from_datetime)})
-                pointers.update({instrument: {"price": 0, "spread": 0}})
-
-        with open(self.filepath, "w") as f:
-            # Begin walking the lists and adding prices in chronological order
-            while len(prices.keys()) > 0:
-                earliest = []
-                rem_list = []
-                for inst in prices:
-                    if pointers[inst]["price"] < len(prices[inst]):
-                        cur_price_time = float(prices[inst][pointers[inst]["price"]]["time"])
-                        if cur_price_time < end:
-                            earliest.append((cur_price_time, inst))
-                        else:  # The times for a given instrument has exceeded the end time, remove from prices dict
-                            rem_list.append(inst)
-                    else:  # The prices dict needs to be updated with the next page of results
-                        candles = self.api.get_instrument_candles(
-                            inst,
-                            from_time=prices[inst][-1]["time"],
-                            count=5000,
-                            granularity=self.gran,
-                        )
-                        candles = candles.get("candles")
-                        if len(candles) > 1 and float(candles[0]["time"]) < end:
-                            earliest.append((float(candles[0]["time"]), inst))
-                            prices[inst] = candles
-                            pointers[inst]["price"] = 0
-                        else:  # Next page of results is not valid, remove instrument from prices dict
-                            rem_list.append(inst)
-                # Remove finished instruments from their dicts
-                for inst in rem_list:
-                    prices.pop(inst)
-                    spreads.pop(inst)
-                    pointers.pop(inst)
-                # Determine next chronological element
-                earliest.sort(key=lambda x: x[0])  # Sort by timestamps
-                if len(earliest) > 0:
-                    next_time, next_inst = earliest[0][0], earliest[0][1]
-                    # Advance the spread pointer to the appropriate spread
-                    # Due to the nature of the api, the spreads dict contains all the spreads from start to current day
-                    # Therefore, there is no need to paginate as was done with the prices
-                    while (
-                        pointers[next_inst]["spread"] + 1 < len(spreads[next_inst])
-                        and spreads[next_inst][pointers[next_inst]["spread"]][0] < next_time
-                    ):
-                        # Advance spread pointer to the appropriate spread value
-                        pointers[next_inst]["spread"] += 1
-                    # Calculate the spread in price units
-                    price_str = prices[next_inst][pointers[next_inst]["price"]]["mid"]["c"]
-                    pip_spread = Decimal(spreads[next_inst][pointers[next_inst]["spread"]][1]) / Decimal(2)
-                    place = len(price_str.split(".")[1]) - 1
-                    # Calculate the price
-                    price = Decimal(prices[next_inst][pointers[next_inst]["price"]]["mid"]["c"])
-                    spread = pip_spread * (Decimal("10") ** -place)
-                    # Write price to file
-                    # This approximates bid and ask for a given candle using its closing price and the spread
-                    if next_inst in self.instruments:
-                        price_event = PriceEvent(
-                            next_inst,
-                            datetime.fromtimestamp(next_time),
-                            (price - spread).quantize(Decimal("10") ** (-1 - place)),
-                            (price + spread).quantize(Decimal("10") ** (-1 - place)),
-                        )
-                    else:
-                        price_event = QuoteEvent(
-                            next_inst,
-                            datetime.fromtimestamp(next_time),
-                            (price - spread).quantize(Decimal("10") ** (-1 - place)),
-                            (price + spread).quantize(Decimal("10") ** (-1 - place)),
-                        )
-                    f.write(repr(price_event) + "\n")
-                    # Advance instrument price pointer
-                    pointers[next_inst]["price"] += 1
-                    # yield for progress indication in cli
-                    yield
+                spreads = get_historical_spreads(instrument, since=self.from_datetime)
+                cursors.append(_CandleCursor(instrument, order, candles, spreads))
+        # Heap of (current candle time, instrument order, cursor), equal times are emitted in instrument order
+        heap = [(cursor.time, cursor.order, cursor) for cursor in cursors if cursor.time < end]
+        heapq.heapify(heap)
+
+        # Begin popping candles off of the heap in chronological order
+        while heap:
+            next_time, _, cursor = heap[0]
+            next_inst = cursor.instrument
+            # This approximates bid and ask for a given candle using its closing price and the spread
+            bid, ask = cursor.bid_ask(next_time)
+            # Write price to file
+            if next_inst in self.instruments:
+                price_event = PriceEvent(next_inst, cursor.timestamp, bid, ask)
+            else:
+                price_event = QuoteEvent(next_inst, cursor.timestamp, bid, ask)
+            f.write(price_event)
+            # Advance the cursor, replacing it in the heap if it still has candles before the end time
+            if cursor.advance(prefetcher, end):
+                heapq.heapreplace(heap, (cursor.time, cursor.order, cursor))
+            else:
+                heapq.heappop(heap)
+            # yield for progress indication in cli
+            yield
+
+
+class _CandleCursor:
+    def __init__(self, instrument: str, order: int, candles: List[dict], spreads: List[list]):
+        """
+        Walks the pages of candles and the spreads of a single instrument during the history merge
+
+        Args:
+            instrument (str): Name of the instrument
+            order (int): Position of the instrument in the instrument list, used to break ties between equal times
+            candles (List[dict]): The first page of candles
+            spreads (List[list]): All historical [time, spread] pairs since the start of the history
+        """
+        self.instrument = instrument
+        self.order = order
+        self.candles = candles
+        self.index = 0
+        self.spreads = spreads
+        self.spread_index = 0
+        # The exact epoch nanoseconds of every candle of the page, parsed at once
+        self.timestamps = parse_timestamps([candle["time"] for candle in candles], "UNIX")
+        self.time = float(candles[0]["time"])
+        # The half spread of the current spread and price places, as an exact fraction of scaled price units
+        self._half_spread_key = None
+        self._half_spread = (0, 1)
+
+    @property
+    def candle(self) -> dict:
+        return self.candles[self.index]
+
+    @property
+    def timestamp(self) -> int:
+        return self.timestamps[self.index]
+
+    def spread_at(self, time: float):
+        # Due to the nature of the api, the spreads contain everything from start to current day
+        # Therefore, there is no need to paginate as is done with the candles
+        while self.spread_index + 1 < len(self.spreads) and self.spreads[self.spread_index][0] < time:
+            self.spread_index += 1
+        return self.spreads[self.spread_index][1]
+
+    def bid_ask(self, time: float) -> Tuple[FixedPrice, FixedPrice]:
+        """
+        The bid and ask of the current candle, its closing mid price -/+ half the spread at time
+
+        Both are rounded half to even to the places of the closing price. Spreads change far less often than candles,
+        so the half spread is only recomputed when the spread changes and everything else is integer math.
+        """
+        price = FixedPrice.from_str(self.candle["mid"]["c"])
+        key = (self.spread_at(time), price.places)
+        if key != self._half_spread_key:
+            # Spreads are in pips, taken as the place before the last of the candle's price as the backtest always
+            # has, so a pip is 10 ** (1 - places) in price units and 10 FixedPrice values
+            pip_spread = Decimal(key[0]) / Decimal(2)
+            self._half_spread = pip_spread.scaleb(1).as_integer_ratio()
+            self._half_spread_key = key
+        numerator, denominator = self._half_spread
+        scaled = price.value * denominator
+        return (
+            FixedPrice(_round_half_even(scaled - numerator, denominator), price.places),
+            FixedPrice(_round_half_even(scaled + numerator, denominator), price.places),
+        )
+
+    def advance(self, prefetcher: CandlePrefetcher, end: float) -> bool:
+        """
+        Move to the next candle, fetching the next page when this one is exhausted
+
+        Returns False once the instrument has no candles left before the end time
+        """
+        self.index += 1
+        if self.index >= len(self.candles):
+            candles = prefetcher.next_page(self.instrument)
+            # The next page starts at the last candle of this one, so a single candle means there is nothing new
+            if len(candles) <= 1:
+                return False
+            self.candles = candles
+            self.timestamps = parse_timestamps([candle["time"] for candle in candles], "UNIX")
+            self.index = 0
+        self.time = float(self.candles[self.index]["time"])
+        return self.time < end
+
+
+def _round_half_even(numerator: int, denominator: int) -> int:
+    quotient, remainder = divmod(numerator, denominator)
+    if 2 * remainder > denominator or (2 * remainder == denominator and quotient % 2):
+        quotient += 1
+    return quotient
 
 
 class OandaBacktestingGen(BaseBacktestingGen):
@@ -136,11 +200,9 @@ class OandaBacktestingGen(BaseBacktestingGen):
         self.run_flag = run_flag
 
     def gen(self):
-        with open(self.data_path) as f:
-            for price in f:
-                if not self.run_flag.is_set():
-                    break
-                price_event = event_from_repr(price)
-                self.queue.put(price_event)
-                yield
-            self.queue.put(StopEvent())
+        for price_event in history_events(self.data_path):
+            if not self.run_flag.is_set():
+                break
+            self.queue.put(price_event)
+            yield
+        self.queue.put(StopEvent())
@@ -19,10 +19,21 @@ from prompt_toolkit.shortcuts import ProgressBar
 from prompt_toolkit.shortcuts.progress_bar import formatters
 from prompt_toolkit.styles import Style
 
-from peoples_advisor.backtest.backtest import historical_gen_factory, backtesting_gen_factory
+from peoples_advisor.backtest.backtest import historical_gen_factory
 from peoples_advisor.backtest.common.common import filesize
+from peoples_advisor.backtest.common.history import (
+    HISTORY_EXTENSION,
+    TEXT_EXTENSION,
+    convert_text_history,
+    history_length,
+    is_binary_history,
+)
+from peoples_advisor.backtest.common.parallel import run_backtests, strategy_label
+from peoples_advisor.backtest.common.sweep import parameter_grid, run_sweep
+from peoples_advisor.common.common import PAError, validate_instruments
 from peoples_advisor.control.control import Control
 from peoples_advisor.event.event import StartEvent, StopEvent, ExitEvent
+from peoples_advisor import settings
 from peoples_advisor.settings import (
     LIVE,
     LIVE_STRATEGIES,
@@ -110,7 +121,7 @@ class HistoryCompleter(Completer):
 
 class NestedCLiCompleter(Completer):
     def __init__(self):
-        self.options = {"backtest": HistoryCompleter()}
+        self.options = {"backtest": HistoryCompleter(), "sweep": HistoryCompleter(), "convert": HistoryCompleter()}
 
     def get_completions(self, document, complete_event):
         text = document.text_before_cursor.lstrip()
@@ -141,6 +152,8 @@ class NestedCLiCompleter(Completer):
                 "exit",
                 "history",
                 "backtest",
+                "sweep",
+                "convert",
                 "deploy",
                 "help",
             ]:
@@ -171,6 +184,8 @@ class CliLexer(Lexer):
                     "exit",
                     "history",
                     "backtest",
+                    "sweep",
+                    "convert",
                     "deploy",
                     "help",
                 ]:
@@ -219,15 +234,32 @@ class CLI:
         history.add_argument("-a", dest="alias", action="store", type=self.cli_filename)
         backtesting = subparsers.add_parser("backtest", usage="backtest_usage")
         backtesting.add_argument("data_file", type=self.backtest_filename)
+        sweep = subparsers.add_parser("sweep", usage="sweep_usage")
+        sweep.add_argument("data_file", type=self.backtest_filename)
+        sweep.add_argument("-n", dest="rows", action="store", default=10, type=int)
+        convert = subparsers.add_parser("convert", usage="convert_usage")
+        convert.add_argument("data_file", type=self.text_history_filename)
         subparsers.add_parser("help", add_help=False)
 
         self.session = PromptSession()
         self.exit_flag = False
 
-        self.control = Control(LIVE_STRATEGIES[0], LIVE_STRATEGIES[1])
-        self.control_thread = Thread(target=self.control.run, daemon=True)
-        self.run_flag = self.control.run_flag
-        self.events = self.control.events
+        # The live control loop and its pricing stream are only built by the first start, see control
+        self._control = None
+        self.control_thread = None
+
+    @property
+    def control(self) -> Control:
+        if self._control is None:
+            validate_instruments()
+            self._control = Control(LIVE_STRATEGIES[0], LIVE_STRATEGIES[1])
+            self.control_thread = Thread(target=self._control.run, daemon=True)
+            self.control_thread.start()
+        return self._control
+
+    @property
+    def running(self) -> bool:
+        return self._control is not None and self._control.run_flag.is_set()
 
     @staticmethod
     def cli_datetime(datetime_string):
@@ -270,6 +302,14 @@ class CLI:
         else:
             return data_path
 
+    @staticmethod
+    def text_history_filename(filename_string):
+        data_path = CLI.backtest_filename(filename_string)
+        if data_path.suffix != TEXT_EXTENSION:
+            raise argparse.ArgumentTypeError(f"{filename_string} is not a {TEXT_EXTENSION} history file")
+        else:
+            return data_path
+
     @staticmethod
     def peoples_advisor_usage():
         if TERMINAL_COLORS:
@@ -290,6 +330,10 @@ class CLI:
                     ("", ", "),
                     ("class:command", "backtest"),
                     ("", ", "),
+                    ("class:command", "sweep"),
+                    ("", ", "),
+                    ("class:command", "convert"),
+                    ("", ", "),
                     ("class:command", "deploy"),
                     ("", ", "),
                     ("class:command", "help"),
@@ -312,6 +356,10 @@ class CLI:
                     ("", "\tGather historical data for backtesting"),
                     ("class:command", "\n      backtest"),
                     ("", "\tBacktest the algorithms provided in settings.py"),
+                    ("class:command", "\n      sweep"),
+                    ("", "\tBacktest every parameter combination of the sweep provided in settings.py"),
+                    ("class:command", "\n      convert"),
+                    ("", "\tConvert a text history file to the binary history format"),
                     ("class:command", "\n      deploy"),
                     (
                         "",
@@ -323,7 +371,8 @@ class CLI:
             )
             print(color_start_usage, style=style, color_depth=TRUE_COLOR)
         else:
-            peoples_usage = "\n    Usage: peoples_advisor> {start, stop, exit, history, backtest, deploy, help} ..."
+            peoples_usage = "\n    Usage: peoples_advisor> "
+            peoples_usage += "{start, stop, exit, history, backtest, sweep, convert, deploy, help} ..."
             peoples_usage += "\n      These commands allow you directly control People's Advisor"
             peoples_usage += "\n\n    Available Commands:"
             peoples_usage += "\n      start\tStart People's Advisor using the settings provided in settings.py"
@@ -331,6 +380,8 @@ class CLI:
             peoples_usage += "\n      exit\tExit People's Advisor"
             peoples_usage += "\n      history\tGather historical data for backtesting"
             peoples_usage += "\n      backtest\tBacktest the algorithms provided in settings.py"
+            peoples_usage += "\n      sweep\tBacktest every parameter combination of the sweep provided in settings.py"
+            peoples_usage += "\n      convert\tConvert a text history file to the binary history format"
             peoples_usage += "\n      deploy\tDeploy the algorithms provided in settings.py on a paper or live account"
             peoples_usage += "\n      help\tDisplay this help message\n"
             print(peoples_usage)
@@ -550,7 +601,7 @@ class CLI:
                     ("", "\n         ex. "),
                     (
                         "class:variable",
-                        "2021.04.01-2021.05.01[EUR_USD-GBP_USD-EUR_JPY].txt",
+                        "2021.04.01-2021.05.01[EUR_USD-GBP_USD-EUR_JPY].hist",
                     ),
                     ("", "\n\n    Optional Arguments:"),
                     ("", "\n      "),
@@ -566,11 +617,117 @@ class CLI:
             backtest_usage += "\n      Backtest all algorithm pairs provided in settings.py"
             backtest_usage += "\n\n    Required Arguments:"
             backtest_usage += "\n      HISTORY_FILE   The historical data file to backtest your algorithms against"
-            backtest_usage += "\n        ex. 2021.04.01-2021.05.01[EUR_USD-GBP_USD-EUR_JPY].txt"
+            backtest_usage += "\n        ex. 2021.04.01-2021.05.01[EUR_USD-GBP_USD-EUR_JPY].hist"
             backtest_usage += "\n\n    Optional Arguments:"
             backtest_usage += "\n      -h, --help  Display this help message\n"
             print(backtest_usage)
 
+    @staticmethod
+    def sweep_usage():
+        if TERMINAL_COLORS:
+            color_sweep_usage = FormattedText(
+                [
+                    ("", "\n    "),
+                    ("class:info", "Usage"),
+                    ("", ": "),
+                    ("class:command", "sweep"),
+                    ("class:variable", " HISTORY_FILE"),
+                    ("", " ["),
+                    ("class:flag", "-n"),
+                    ("class:variable", " ROWS"),
+                    ("", "] ["),
+                    ("class:flag", "-h"),
+                    ("", "]"),
+                    (
+                        "",
+                        "\n      Backtest every parameter combination of the sweep provided in settings.py,"
+                        " ranked by its SWEEP_SCORE",
+                    ),
+                    ("", "\n\n    Required Arguments:"),
+                    ("", "\n      "),
+                    ("class:variable", "HISTORY_FILE"),
+                    (
+                        "",
+                        "   The historical data file to backtest the combinations against",
+                    ),
+                    ("", "\n         ex. "),
+                    (
+                        "class:variable",
+                        "2021.04.01-2021.05.01[EUR_USD-GBP_USD-EUR_JPY].hist",
+                    ),
+                    ("", "\n\n    Optional Arguments:"),
+                    ("", "\n      "),
+                    ("class:flag", "-n"),
+                    ("class:variable", " ROWS"),
+                    ("", "     The number of best combinations to display (default: 10)"),
+                    ("", "\n      "),
+                    ("class:flag", "-h"),
+                    ("", ", "),
+                    ("class:flag", "--help"),
+                    ("", "  Display this help message\n"),
+                ]
+            )
+            print(color_sweep_usage, style=style, color_depth=TRUE_COLOR)
+        else:
+            sweep_usage = "\n    Usage: sweep HISTORY_FILE [-n ROWS] [-h]"
+            sweep_usage += "\n      Backtest every parameter combination of the sweep provided in settings.py,"
+            sweep_usage += " ranked by its SWEEP_SCORE"
+            sweep_usage += "\n\n    Required Arguments:"
+            sweep_usage += "\n      HISTORY_FILE   The historical data file to backtest the combinations against"
+            sweep_usage += "\n        ex. 2021.04.01-2021.05.01[EUR_USD-GBP_USD-EUR_JPY].hist"
+            sweep_usage += "\n\n    Optional Arguments:"
+            sweep_usage += "\n      -n ROWS     The number of best combinations to display (default: 10)"
+            sweep_usage += "\n      -h, --help  Display this help message\n"
+            print(sweep_usage)
+
+    @staticmethod
+    def convert_usage():
+        if TERMINAL_COLORS:
+            color_convert_usage = FormattedText(
+                [
+                    ("", "\n    "),
+                    ("class:info", "Usage"),
+                    ("", ": "),
+                    ("class:command", "convert"),
+                    ("class:variable", " HISTORY_FILE"),
+                    ("", " ["),
+                    ("class:flag", "-h"),
+                    ("", "]"),
+                    (
+                        "",
+                        "\n      Convert a text history file to the binary history format",
+                    ),
+                    ("", "\n\n    Required Arguments:"),
+                    ("", "\n      "),
+                    ("class:variable", "HISTORY_FILE"),
+                    (
+                        "",
+                        "   The text history file to convert",
+                    ),
+                    ("", "\n         ex. "),
+                    (
+                        "class:variable",
+                        "2021.04.01-2021.05.01[EUR_USD-GBP_USD-EUR_JPY].txt",
+                    ),
+                    ("", "\n\n    Optional Arguments:"),
+                    ("", "\n      "),
+                    ("class:flag", "-h"),
+                    ("", ", "),
+                    ("class:flag", "--help"),
+                    ("", "  Display this help message\n"),
+                ]
+            )
+            print(color_convert_usage, style=style, color_depth=TRUE_COLOR)
+        else:
+            convert_usage = "\n    Usage: convert HISTORY_FILE [-h]"
+            convert_usage += "\n      Convert a text history file to the binary history format"
+            convert_usage += "\n\n    Required Arguments:"
+            convert_usage += "\n      HISTORY_FILE   The text history file to convert"
+            convert_usage += "\n        ex. 2021.04.01-2021.05.01[EUR_USD-GBP_USD-EUR_JPY].txt"
+            convert_usage += "\n\n    Optional Arguments:"
+            convert_usage += "\n      -h, --help  Display this help message\n"
+            print(convert_usage)
+
     @staticmethod
     def error(error_message):
         replace_snippets = [
@@ -606,6 +763,10 @@ class CLI:
                         ("", "', '"),
                         ("class:command", "backtest"),
                         ("", "', '"),
+                        ("class:command", "sweep"),
+                        ("", "', '"),
+                        ("class:command", "convert"),
+                        ("", "', '"),
                         ("class:command", "deploy"),
                         ("", "', '"),
                         ("class:command", "help"),
@@ -671,7 +832,7 @@ class CLI:
             print(error_message)
 
     def start(self, yes):
-        if self.run_flag.is_set():
+        if self.running:
             if TERMINAL_COLORS:
                 start_message = FormattedText(
                     [
@@ -683,6 +844,7 @@ class CLI:
             else:
                 print("Info: People's Advisor is already running")
         else:
+            control = self.control
             if not LIVE:
                 if TERMINAL_COLORS:
                     start_message = FormattedText(
@@ -700,7 +862,7 @@ class CLI:
                 else:
                     strategies = f"{type(LIVE_STRATEGIES[0]).__name__}, {type(LIVE_STRATEGIES[1]).__name__}"
                     print(f"Info: Starting People's Advisor on PAPER account with {strategies}")
-                self.control.queue_event(StartEvent())
+                control.queue_event(StartEvent())
             else:
                 if not yes:
                     if TERMINAL_COLORS:
@@ -752,10 +914,10 @@ class CLI:
                 else:
                     strategies = f"{type(LIVE_STRATEGIES[0]).__name__}, {type(LIVE_STRATEGIES[1]).__name__}"
                     print(f"Info: Starting People's Advisor on LIVE account with {strategies}")
-                self.control.queue_event(StartEvent())
+                control.queue_event(StartEvent())
 
     def stop(self):
-        if self.run_flag.is_set():
+        if self.running:
             if TERMINAL_COLORS:
                 stop_message = FormattedText(
                     [
@@ -780,7 +942,7 @@ class CLI:
                 print("Info: People's Advisor is already stopped")
 
     def exit(self):
-        if self.run_flag.is_set():
+        if self.running:
             if TERMINAL_COLORS:
                 exit_message = FormattedText(
                     [
@@ -835,14 +997,16 @@ class CLI:
                 print(exit_message, style=style, color_depth=TRUE_COLOR)
             else:
                 print("Info: Exiting People's Advisor")
-            self.control.queue_event(ExitEvent())
-            self.control_thread.join()
+            if self._control is not None:
+                self._control.queue_event(ExitEvent())
+                self.control_thread.join()
             self.exit_flag = True
 
     @staticmethod
     def history(from_datetime, to_datetime, granularity, filename=None):
+        validate_instruments()
         if filename:
-            filename += ".txt"
+            filename += HISTORY_EXTENSION
         historical_data = historical_gen_factory(from_datetime, to_datetime, granularity, filename)
         filename = filename if filename else historical_data.filename
         if TERMINAL_COLORS:
@@ -902,12 +1066,16 @@ class CLI:
                 formatters.Text(" data-points/second"),
                 formatters.Text("  "),
             ]
-            with ProgressBar(style=style, formatters=color_formatters, color_depth=TRUE_COLOR) as pb:
-                try:
-                    for _ in pb(filesize(data_path)):
-                        line_count += 1
-                except ZeroDivisionError:
-                    pass
+            if is_binary_history(data_path):
+                # Binary history files store their row count in the header
+                line_count = history_length(data_path)
+            else:
+                with ProgressBar(style=style, formatters=color_formatters, color_depth=TRUE_COLOR) as pb:
+                    try:
+                        for _ in pb(filesize(data_path)):
+                            line_count += 1
+                    except ZeroDivisionError:
+                        pass
             backtest_message = FormattedText(
                 [
                     ("class:info", "Info"),
@@ -927,33 +1095,18 @@ class CLI:
                 formatters.TimeLeft(),
                 formatters.Text("  "),
             ]
-            for strategy_pair in BACKTEST_STRATEGIES:
-                control = Control(strategy_pair[0], strategy_pair[1], backtesting=True)
-                control_thread = Thread(target=control.run, daemon=True)
-                control_thread.start()
-                control.queue_event(StartEvent())
-                label = FormattedText(
+            labels = [
+                FormattedText(
                     [
-                        (
-                            "class:variable",
-                            str(type(strategy_pair[0])).split(".")[-1][:-2],
-                        ),
+                        ("class:variable", type(strategy_pair[0]).__name__),
                         ("", ", "),
-                        (
-                            "class:variable",
-                            str(type(strategy_pair[1])).split(".")[-1][:-2],
-                        ),
+                        ("class:variable", type(strategy_pair[1]).__name__),
                     ]
                 )
-                with ProgressBar(formatters=color_formatters, style=style, color_depth=TRUE_COLOR) as pb:
-                    historical_gen = backtesting_gen_factory(
-                        control.events,
-                        control.run_flag,
-                        data_path,
-                    )
-                    for _ in pb(historical_gen.gen(), label=label, total=line_count):
-                        pass
-                control_thread.join()
+                for strategy_pair in BACKTEST_STRATEGIES
+            ]
+            with ProgressBar(formatters=color_formatters, style=style, color_depth=TRUE_COLOR) as pb:
+                results = CLI.parallel_backtest(pb, labels, data_path, line_count)
             backtest_message = FormattedText(
                 [
                     ("class:info", "Info"),
@@ -961,6 +1114,19 @@ class CLI:
                 ]
             )
             print(backtest_message, style=style, color_depth=TRUE_COLOR)
+            for result, label in zip(results, labels):
+                result_message = FormattedText(
+                    [
+                        ("", "    ["),
+                        *label,
+                        ("", "]: "),
+                        ("class:info", str(result.signals)),
+                        ("", " signals, "),
+                        ("class:info", str(result.orders)),
+                        ("", " orders"),
+                    ]
+                )
+                print(result_message, style=style, color_depth=TRUE_COLOR)
         else:
             base_formatters = [
                 formatters.Text("Info: Preparing backtest: "),
@@ -970,12 +1136,15 @@ class CLI:
                 formatters.Text(" data-points/second"),
                 formatters.Text("  "),
             ]
-            with ProgressBar(formatters=base_formatters) as pb:
-                try:
-                    for _ in pb(filesize(data_path)):
-                        line_count += 1
-                except ZeroDivisionError:
-                    pass
+            if is_binary_history(data_path):
+                line_count = history_length(data_path)
+            else:
+                with ProgressBar(formatters=base_formatters) as pb:
+                    try:
+                        for _ in pb(filesize(data_path)):
+                            line_count += 1
+                    except ZeroDivisionError:
+                        pass
             print("Info: Done, beginning backtest")
             base_formatters = [
                 formatters.Text("Backtest: ["),
@@ -989,22 +1158,125 @@ class CLI:
                 formatters.TimeLeft(),
                 formatters.Text("  "),
             ]
-            for strategy_pair in BACKTEST_STRATEGIES:
-                control = Control(strategy_pair[0], strategy_pair[1], backtesting=True)
-                control_thread = Thread(target=control.run, daemon=True)
-                control_thread.start()
-                control.queue_event(StartEvent())
-                label = str(type(strategy_pair[0])).split(".")[-1][:-2] + ", "
-                label += str(type(strategy_pair[1])).split(".")[-1][:-2]
-                with ProgressBar(formatters=base_formatters, style=style, color_depth=TRUE_COLOR) as pb:
-                    historical_gen = backtesting_gen_factory(control.events, control.run_flag, data_path)
-                    try:
-                        for _ in pb(historical_gen.gen(), label=label, total=line_count):
-                            pass
-                    except ZeroDivisionError:
-                        pass
-                control_thread.join()
+            labels = [strategy_label(strategy_pair) for strategy_pair in BACKTEST_STRATEGIES]
+            with ProgressBar(formatters=base_formatters) as pb:
+                results = CLI.parallel_backtest(pb, labels, data_path, line_count)
             print("Info: Done, finished backtest")
+            for result in results:
+                print(f"    [{result.label}]: {result.signals} signals, {result.orders} orders")
+
+    @staticmethod
+    def parallel_backtest(pb, labels, data_path, line_count):
+        # Each strategy pair is backtested in its own process, which reports back to its own counter in pb
+        counters = [pb(label=label, total=line_count) for label in labels]
+
+        def on_progress(index, events):
+            counters[index].items_completed = events
+            pb.invalidate()
+
+        results = run_backtests(BACKTEST_STRATEGIES, data_path, on_progress=on_progress)
+        for counter in counters:
+            counter.done = True
+        return results
+
+    @staticmethod
+    def sweep(data_path, rows=10):
+        sweep_strategies = getattr(settings, "SWEEP_STRATEGIES", None)
+        if sweep_strategies is None:
+            raise PAError("SWEEP_STRATEGIES must be provided in settings.py to run a sweep")
+        if type(sweep_strategies) is not tuple or len(sweep_strategies) != 4:
+            raise PAError("SWEEP_STRATEGIES must be a tuple of (SignalStrategy, grid, SizingStrategy, grid)")
+        sig_strategy, sig_grid, size_strategy, size_grid = sweep_strategies
+        score = getattr(settings, "SWEEP_SCORE", None)
+        if score is None:
+            raise PAError("SWEEP_SCORE must be provided in settings.py to rank the combinations of a sweep")
+        if not callable(score):
+            raise PAError("SWEEP_SCORE must be a function of a BacktestResult returning a score, higher is better")
+        total = len(parameter_grid(sig_grid)) * len(parameter_grid(size_grid))
+        events = history_length(data_path) if is_binary_history(data_path) else sum(1 for _ in filesize(data_path))
+        if TERMINAL_COLORS:
+            color_formatters = [
+                formatters.Text("Sweep", style="class:info"),
+                formatters.Text(": "),
+                formatters.Bar(sym_a="=", sym_b="=", sym_c=" ", unknown="="),
+                formatters.Text(" "),
+                formatters.Progress(),
+                formatters.Text(" combinations "),
+                formatters.TimeLeft(),
+                formatters.Text("  "),
+            ]
+            progress_bar = ProgressBar(formatters=color_formatters, style=style, color_depth=TRUE_COLOR)
+        else:
+            base_formatters = [
+                formatters.Text("Sweep: "),
+                formatters.Bar(sym_a="=", sym_b="=", sym_c=" ", unknown="="),
+                formatters.Text(" "),
+                formatters.Progress(),
+                formatters.Text(" combinations "),
+                formatters.TimeLeft(),
+                formatters.Text("  "),
+            ]
+            progress_bar = ProgressBar(formatters=base_formatters)
+        with progress_bar as pb:
+            # A combination counts as done once its worker has reported processing every event
+            counter = pb(total=total)
+            finished = set()
+
+            def on_progress(index, processed):
+                if processed >= events and index not in finished:
+                    finished.add(index)
+                    counter.item_completed()
+
+            results = run_sweep(
+                sig_strategy,
+                size_strategy,
+                data_path,
+                score,
+                sig_grid,
+                size_grid,
+                on_progress=on_progress,
+            )
+            counter.done = True
+        header = f"    {'Rank':<6}{'Score':>12}{'Signals':>10}{'Orders':>10}  Parameters"
+        table = [header]
+        for rank, sweep_result in enumerate(results[:rows], 1):
+            result = sweep_result.result
+            params = ", ".join(f"{name}={value!r}" for name, value in sweep_result.params.items())
+            table.append(
+                f"    {rank:<6}{sweep_result.score:>12.6g}{result.signals:>10}{result.orders:>10}  {params}"
+            )
+        if TERMINAL_COLORS:
+            sweep_message = FormattedText(
+                [
+                    ("class:info", "Info"),
+                    ("", f": Done, swept {total} combinations of "),
+                    ("class:variable", sig_strategy.__name__),
+                    ("", ", "),
+                    ("class:variable", size_strategy.__name__),
+                    ("", "\n"),
+                    ("class:info", table[0]),
+                    ("", "\n" + "\n".join(table[1:])),
+                ]
+            )
+            print(sweep_message, style=style, color_depth=TRUE_COLOR)
+        else:
+            print(f"Info: Done, swept {total} combinations of {sig_strategy.__name__}, {size_strategy.__name__}")
+            print("\n".join(table))
+
+    @staticmethod
+    def convert(data_path):
+        binary_path = convert_text_history(data_path)
+        if TERMINAL_COLORS:
+            convert_message = FormattedText(
+                [
+                    ("class:info", "Info"),
+                    ("", ": Data saved to data/history/"),
+                    ("class:info", binary_path.name),
+                ]
+            )
+            print(convert_message, style=style, color_depth=TRUE_COLOR)
+        else:
+            print("Info: Data saved to data/history/" + binary_path.name)
 
     def run(self):
         if TERMINAL_COLORS:
@@ -1016,8 +1288,6 @@ class CLI:
         else:
             print(splash_screen)
 
-        self.control_thread.start()
-
         while not self.exit_flag:
             try:
                 with patch_stdout():
@@ -1059,20 +1329,27 @@ class CLI:
                             pass
                     continue
 
-                if args.command == "start":
-                    self.start(args.yes)
-                elif args.command == "stop":
-                    self.stop()
-                elif args.command == "exit":
-                    self.exit()
-                elif args.command == "history":
-                    self.history(args.from_time, args.to_time, args.granularity, args.alias)
-                elif args.command == "backtest":
-                    self.backtest(args.data_file)
-                elif args.command == "deploy":
-                    pass
-                elif args.command == "help":
-                    self.peoples_advisor_usage()
+                try:
+                    if args.command == "start":
+                        self.start(args.yes)
+                    elif args.command == "stop":
+                        self.stop()
+                    elif args.command == "exit":
+                        self.exit()
+                    elif args.command == "history":
+                        self.history(args.from_time, args.to_time, args.granularity, args.alias)
+                    elif args.command == "backtest":
+                        self.backtest(args.data_file)
+                    elif args.command == "sweep":
+                        self.sweep(args.data_file, args.rows)
+                    elif args.command == "convert":
+                        self.convert(args.data_file)
+                    elif args.command == "deploy":
+                        pass
+                    elif args.command == "help":
+                        self.peoples_advisor_usage()
+                except PAError as error:
+                    self.error(str(error))
             except KeyboardInterrupt:
                 try:
                     if TERMINAL_COLORS:
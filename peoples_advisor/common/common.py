@@ -1,7 +1,22 @@
+from decimal import Decimal
 from typing import List
 
-from peoples_advisor.api.api import get_api
-from peoples_advisor.settings import *
+from peoples_advisor.api.api import get_instrument_cache
+from peoples_advisor.settings import (
+    BROKER,
+    API_TOKEN,
+    LIVE,
+    ACCOUNT_INDEX,
+    DATETIME_FORMAT,
+    INSTRUMENTS,
+    INSTRUMENT_TYPE,
+    LEVERAGE,
+    LIVE_STRATEGIES,
+    BACKTEST_STRATEGIES,
+    BALANCE,
+    SAVE_LIVE_AS_HISTORICAL,
+    TERMINAL_COLORS,
+)
 from peoples_advisor.signal.signal import SignalStrategy
 from peoples_advisor.sizing.sizing import SizingStrategy
 
@@ -23,14 +38,6 @@ def validate_settings():
             raise PAError("ACCOUNT_INDEX must be a non-negative integer")
         if DATETIME_FORMAT not in ["RFC3339", "UNIX"]:
             raise PAError("DATETIME_FORMAT must be in ['RFC3339', 'UNIX']")
-    if BROKER == "OANDA":
-        api = get_api()
-        instruments = [instrument["name"] for instrument in api.get_account_instruments()["instruments"]]
-        for instrument in INSTRUMENTS:
-            if instrument not in instruments:
-                raise PAError(f"Invalid instrument ({instrument}) in INSTRUMENTS")
-    else:
-        pass
     if type(INSTRUMENT_TYPE) is not str or INSTRUMENT_TYPE not in ["FOREX"]:
         raise PAError("INSTRUMENT_TYPE must be a str and a valid option")
     if LEVERAGE > 1 or LEVERAGE <= 0:
@@ -58,10 +65,20 @@ def validate_settings():
         raise PAError("TERMINAL_COLORS must be a boolean value")
 
 
+def validate_instruments():
+    # Kept apart from validate_settings as it needs the account instruments, which may require a network call
+    if BROKER == "OANDA":
+        instruments = get_instrument_cache().instruments()
+        for instrument in INSTRUMENTS:
+            if instrument not in instruments:
+                raise PAError(f"Invalid instrument ({instrument}) in INSTRUMENTS")
+    else:
+        pass
+
+
 def extend_instrument_list(instruments: List[str], account_currency: str) -> List[str]:
     if BROKER == "OANDA":
-        api = get_api()
-        possible_instruments = [instrument["name"] for instrument in api.get_account_instruments()["instruments"]]
+        possible_instruments = get_instrument_cache().instruments()
         final_instruments = []
         for instrument in instruments:
             if account_currency in instrument:
@@ -80,14 +97,15 @@ def extend_instrument_list(instruments: List[str], account_currency: str) -> Lis
 
 def get_margins(instruments: List[str]):
     if BROKER == "OANDA":
-        api = get_api()
+        cache = get_instrument_cache()
         margins = {}
-        for instrument in api.get_account_instruments()["instruments"]:
-            if instrument["name"] in instruments:
-                margin_rate = Decimal(instrument["marginRate"])
+        for instrument in cache.instruments():
+            if instrument in instruments:
+                margin_rate = cache.margin_rate(instrument)
                 if LEVERAGE > margin_rate:
-                    margins[instrument["name"]] = LEVERAGE
+                    margins[instrument] = LEVERAGE
                 else:
-                    margins[instrument["name"]] = margin_rate
+                    margins[instrument] = margin_rate
             else:
                 continue
+        return margins
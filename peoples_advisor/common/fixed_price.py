@@ -0,0 +1,221 @@
+from decimal import Decimal
+from typing import Tuple, Union
+
+
+class FixedPrice:
+    """
+    A price stored as an integer scaled by 10 ** places, so 1.17501 with 5 places is FixedPrice(117501, 5)
+
+    Prices of the same instrument share their places, so comparing, adding and subtracting them is integer math.
+    Conversion to and from Decimal and str is exact. Mixing a FixedPrice with a Decimal gives a Decimal, so code
+    written against Decimal prices keeps working.
+    """
+
+    __slots__ = ("value", "places")
+
+    def __init__(self, value: int, places: int):
+        """
+        Args:
+            value (int): The price scaled by 10 ** places
+            places (int): The number of decimal places of the price, the display precision of its instrument
+        """
+        self.value = value
+        self.places = places
+
+    @classmethod
+    def from_str(cls, text: str) -> "FixedPrice":
+        """
+        Parse a price string such as '1.17501', keeping every decimal place it was written with
+        """
+        whole, _, fraction = text.partition(".")
+        if "_" not in text:
+            try:
+                return cls(int(whole + fraction), len(fraction))
+            except ValueError:
+                pass
+        # Anything int() does not take (exponents, a lone point) is left to Decimal
+        return cls.from_decimal(Decimal(text))
+
+    @classmethod
+    def from_decimal(cls, price: Decimal, places: int = None) -> "FixedPrice":
+        """
+        Args:
+            price (Decimal): The price to convert
+            places (int, optional): The number of decimal places to keep, it is an error to drop nonzero digits
+                default: the decimal places of price
+        """
+        if places is None:
+            places = max(-price.as_tuple().exponent, 0)
+        scaled = price.scaleb(places)
+        if scaled != scaled.to_integral_value():
+            raise ValueError(f"Price {price} has more than {places} decimal places")
+        return cls(int(scaled), places)
+
+    @property
+    def decimal(self) -> Decimal:
+        return Decimal(self.value).scaleb(-self.places)
+
+    def rescale(self, places: int) -> "FixedPrice":
+        """
+        The same price with a different number of decimal places, it is an error to drop nonzero digits
+        """
+        if places >= self.places:
+            return FixedPrice(self.value * 10 ** (places - self.places), places)
+        value, remainder = divmod(self.value, 10 ** (self.places - places))
+        if remainder:
+            raise ValueError(f"Price {self} has more than {places} decimal places")
+        return FixedPrice(value, places)
+
+    def __str__(self):
+        if self.places <= 0:
+            return str(self.value * 10**-self.places)
+        digits = str(abs(self.value)).rjust(self.places + 1, "0")
+        sign = "-" if self.value < 0 else ""
+        return f"{sign}{digits[: -self.places]}.{digits[-self.places:]}"
+
+    def __repr__(self):
+        return f"FixedPrice('{self}')"
+
+    def __float__(self):
+        return self.value / 10**self.places
+
+    def __bool__(self):
+        return self.value != 0
+
+    def __hash__(self):
+        # Equal prices must hash equally whatever their places, as must an equal Decimal or int
+        return hash(self.decimal)
+
+    # Comparisons and arithmetic between prices of the same places (the same instrument) take the first branch,
+    # which is plain integer math, everything else goes through _align or falls back to Decimal
+
+    def __eq__(self, other):
+        if other.__class__ is FixedPrice and other.places == self.places:
+            return self.value == other.value
+        aligned = _align(self, other)
+        if aligned is None:
+            return self.decimal == other if isinstance(other, (Decimal, float)) else NotImplemented
+        return aligned[0] == aligned[1]
+
+    def __lt__(self, other):
+        if other.__class__ is FixedPrice and other.places == self.places:
+            return self.value < other.value
+        aligned = _align(self, other)
+        if aligned is None:
+            return self.decimal < other if isinstance(other, (Decimal, float)) else NotImplemented
+        return aligned[0] < aligned[1]
+
+    def __le__(self, other):
+        if other.__class__ is FixedPrice and other.places == self.places:
+            return self.value <= other.value
+        aligned = _align(self, other)
+        if aligned is None:
+            return self.decimal <= other if isinstance(other, (Decimal, float)) else NotImplemented
+        return aligned[0] <= aligned[1]
+
+    def __gt__(self, other):
+        if other.__class__ is FixedPrice and other.places == self.places:
+            return self.value > other.value
+        aligned = _align(self, other)
+        if aligned is None:
+            return self.decimal > other if isinstance(other, (Decimal, float)) else NotImplemented
+        return aligned[0] > aligned[1]
+
+    def __ge__(self, other):
+        if other.__class__ is FixedPrice and other.places == self.places:
+            return self.value >= other.value
+        aligned = _align(self, other)
+        if aligned is None:
+            return self.decimal >= other if isinstance(other, (Decimal, float)) else NotImplemented
+        return aligned[0] >= aligned[1]
+
+    def __neg__(self):
+        return FixedPrice(-self.value, self.places)
+
+    def __abs__(self):
+        return FixedPrice(abs(self.value), self.places)
+
+    def __add__(self, other):
+        if other.__class__ is FixedPrice and other.places == self.places:
+            return FixedPrice(self.value + other.value, self.places)
+        aligned = _align(self, other)
+        if aligned is None:
+            return self.decimal + other if isinstance(other, Decimal) else NotImplemented
+        return FixedPrice(aligned[0] + aligned[1], aligned[2])
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if other.__class__ is FixedPrice and other.places == self.places:
+            return FixedPrice(self.value - other.value, self.places)
+        aligned = _align(self, other)
+        if aligned is None:
+            return self.decimal - other if isinstance(other, Decimal) else NotImplemented
+        return FixedPrice(aligned[0] - aligned[1], aligned[2])
+
+    def __rsub__(self, other):
+        aligned = _align(self, other)
+        if aligned is None:
+            return other - self.decimal if isinstance(other, Decimal) else NotImplemented
+        return FixedPrice(aligned[1] - aligned[0], aligned[2])
+
+    def __mul__(self, other):
+        if isinstance(other, int):
+            return FixedPrice(self.value * other, self.places)
+        if isinstance(other, Decimal):
+            return self.decimal * other
+        if isinstance(other, FixedPrice):
+            return FixedPrice(self.value * other.value, self.places + other.places)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, (int, Decimal)):
+            return self.decimal / other
+        if isinstance(other, FixedPrice):
+            return self.decimal / other.decimal
+        return NotImplemented
+
+    def __rtruediv__(self, other):
+        if isinstance(other, (int, Decimal)):
+            return other / self.decimal
+        return NotImplemented
+
+
+def _align(price: FixedPrice, other) -> Union[Tuple[int, int, int], None]:
+    # The scaled values of both operands at their widest places, or None if other is not a FixedPrice or an integer
+    if isinstance(other, FixedPrice):
+        if other.places == price.places:
+            return price.value, other.value, price.places
+        if other.places > price.places:
+            return price.value * 10 ** (other.places - price.places), other.value, other.places
+        return price.value, other.value * 10 ** (price.places - other.places), price.places
+    if isinstance(other, int):
+        return price.value, other * 10**price.places, price.places
+    return None
+
+
+def mid_price(bid: Union[FixedPrice, Decimal], ask: Union[FixedPrice, Decimal]) -> Union[FixedPrice, Decimal]:
+    """
+    The exact midpoint of a bid and an ask, with one more decimal place than the prices when they are FixedPrices
+    """
+    if isinstance(bid, FixedPrice) and isinstance(ask, FixedPrice):
+        total = bid + ask
+        return FixedPrice(total.value * 5, total.places + 1)
+    return (bid + ask) / 2
+
+
+def scaled_value(price: Union[FixedPrice, Decimal], places: int) -> int:
+    """
+    The integer value of price scaled by 10 ** places, it is an error to drop nonzero digits
+    """
+    if isinstance(price, FixedPrice):
+        return price.value if price.places == places else price.rescale(places).value
+    return FixedPrice.from_decimal(price, places).value
+
+
+def price_places(price: Union[FixedPrice, Decimal]) -> int:
+    if isinstance(price, FixedPrice):
+        return price.places
+    return max(-price.as_tuple().exponent, 0)
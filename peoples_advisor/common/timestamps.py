@@ -0,0 +1,91 @@
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable
+
+# Prices carry their time as int epoch nanoseconds, as the api sends and history files store it, and only build a
+# datetime when asked for one, see ns_to_datetime
+NS_PER_SECOND = 1_000_000_000
+
+# The multiplier of a fraction of a second with n digits, to make it nanoseconds
+_FRACTION_SCALE = tuple(10 ** (9 - digits) for digits in range(10))
+# Epoch nanoseconds of the start of each 'YYYY-MM-DDTHH:MM' minute seen, RFC3339 times only differ within a minute in
+# their seconds, and prices arrive in time order, so the cache is emptied instead of tracking what is least recent
+_minutes: Dict[str, int] = {}
+_MINUTES_CACHED = 4096
+
+
+def datetime_to_ns(time: datetime) -> int:
+    return int(time.timestamp()) * NS_PER_SECOND + time.microsecond * 1_000
+
+
+def ns_to_datetime(timestamp: int) -> datetime:
+    """
+    The naive local datetime of a timestamp, as datetime.fromtimestamp would give, to the microsecond
+    """
+    seconds, nanoseconds = divmod(timestamp, NS_PER_SECOND)
+    return datetime.fromtimestamp(seconds).replace(microsecond=nanoseconds // 1_000)
+
+
+def unix_to_ns(time_str: str) -> int:
+    """
+    Parse a UNIX time string such as '1617278400.123456789' exactly, without going through a float
+    """
+    seconds, _, fraction = time_str.partition(".")
+    if not fraction:
+        return int(seconds) * NS_PER_SECOND
+    fraction = fraction[:9]
+    return int(seconds) * NS_PER_SECOND + int(fraction) * _FRACTION_SCALE[len(fraction)]
+
+
+def rfc3339_to_ns(time_str: str) -> int:
+    """
+    Parse an RFC3339 time string such as '2021-04-01T12:00:00.123456789Z', as the api sends them
+    """
+    if len(time_str) < 20 or time_str[-1] != "Z" or time_str[16] != ":":
+        return _any_rfc3339_to_ns(time_str)
+    minute = _minutes.get(time_str[:16])
+    if minute is None:
+        if len(_minutes) >= _MINUTES_CACHED:
+            _minutes.clear()
+        time = datetime.fromisoformat(time_str[:16]).replace(tzinfo=timezone.utc)
+        minute = _minutes[time_str[:16]] = int(time.timestamp()) * NS_PER_SECOND
+    if len(time_str) == 30:
+        # The api's own layout, nine digits of fraction, the seconds and fraction are nanoseconds once joined
+        return minute + int(time_str[17:19] + time_str[20:29])
+    fraction = time_str[20:29] if len(time_str) > 30 else time_str[20:-1]
+    nanoseconds = int(time_str[17:19]) * NS_PER_SECOND
+    return minute + nanoseconds + int(fraction) * _FRACTION_SCALE[len(fraction)] if fraction else minute + nanoseconds
+
+
+def _any_rfc3339_to_ns(time_str: str) -> int:
+    # Times with a utc offset instead of Z, or otherwise off the usual layout
+    body, _, fraction = time_str.partition(".")
+    offset = ""
+    for sign in ("Z", "+", "-"):
+        if sign in fraction:
+            fraction, _, rest = fraction.partition(sign)
+            offset = sign + rest
+            break
+    time = datetime.fromisoformat(body + (offset.replace("Z", "+00:00") if offset else ""))
+    if time.tzinfo is None:
+        time = time.replace(tzinfo=timezone.utc)
+    return int(time.timestamp()) * NS_PER_SECOND + (int(fraction[:9].ljust(9, "0")) if fraction else 0)
+
+
+def time_to_ns(time_str: str, datetime_format: str) -> int:
+    """
+    Parse an api time string in either datetime format, 'RFC3339' or 'UNIX'
+    """
+    if datetime_format == "UNIX":
+        return unix_to_ns(time_str)
+    return rfc3339_to_ns(time_str)
+
+
+def parse_timestamps(time_strs: Iterable[str], datetime_format: str) -> array:
+    """
+    Parse many api time strings at once into an array of int64 epoch nanoseconds
+
+    The array supports the buffer protocol, so numpy.frombuffer(timestamps, dtype=numpy.int64) views it without a copy.
+    """
+    parse = unix_to_ns if datetime_format == "UNIX" else rfc3339_to_ns
+    return array("q", map(parse, time_strs))
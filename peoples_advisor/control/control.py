@@ -1,7 +1,6 @@
-from queue import PriorityQueue
 from threading import Thread, Event
 
-from peoples_advisor.event.event import ExitEvent, BaseEvent
+from peoples_advisor.event.event import BaseEvent, EventQueue, EventType
 from peoples_advisor.price.price import pricing_gen_factory
 #from peoples_advisor.portfolio.portfolio import Portfolio
 from peoples_advisor.signal.signal import SignalStrategy
@@ -17,40 +16,46 @@ class Control:
     ):
         self.run_flag = Event()
         self.exit_flag = Event()
-        self.events = PriorityQueue()
+        self.events = EventQueue()
         self.backtesting = backtesting
-        self.pricing_stream = Thread(
-            target=pricing_gen_factory(self.events, self.exit_flag).gen,
-            daemon=True,
-        )
+        self.pricing_stream = None
         #self.portfolio = Portfolio()
         self.sig_strategy = sig_strategy
         self.size_strategy = size_strategy
         if not self.backtesting:
+            # Backtests are fed from history, so the pricing stream (and its api connection) is only built when live
+            self.pricing_stream = Thread(
+                target=pricing_gen_factory(self.events, self.exit_flag, sig_strategy.granularities).gen,
+                daemon=True,
+            )
             self.pricing_stream.start()
 
     def run(self):
         while not self.exit_flag.is_set():
             event = self.events.get(block=True)
+            code = event.code
             # Event if else chain is ordered by the priority of their associated events
-            if event.type == "EXIT":  # Exit the control program
+            if code == EventType.EXIT:  # Exit the control program
                 self.exit_flag.set()
-            elif event.type == "START":  # Start threads
+            elif code == EventType.START:  # Start threads
                 self.run_flag.set()
-            elif event.type == "STOP":
+            elif code == EventType.STOP:
                 self.run_flag.clear()
             elif self.run_flag.is_set():
-                if event.type == "ORDER":  # Pass order events to portfolio monitor maybe
+                if code == EventType.ORDER:  # Pass order events to portfolio monitor maybe
                     pass
-                elif event.type == "SIGNAL":  # Pass signal events to order gen
+                elif code == EventType.SIGNAL:  # Pass signal events to order gen
                     order_event = self.size_strategy.gen_order(event)
                     self.queue_event(order_event)
-                elif event.type == "PRICE":  # Pass price events to signal gen
+                elif code == EventType.PRICE:  # Pass price events to signal gen
                     print(event)
                     #self.portfolio.update_price(event)
                     signal_event = self.sig_strategy.gen_signal(event)
                     self.queue_event(signal_event)
-                elif event.type == "QUOTE":
+                elif code == EventType.BAR:  # Pass closed candles to signal gen
+                    signal_event = self.sig_strategy.gen_bar_signal(event)
+                    self.queue_event(signal_event)
+                elif code == EventType.QUOTE:
                     #self.portfolio.update_price(event)
                     pass
             else:
@@ -1,21 +1,46 @@
+import sys
 from abc import ABC, abstractmethod
+from ast import literal_eval
+from heapq import heappop, heappush
+from itertools import count
+from queue import PriorityQueue
 from decimal import Decimal
-from typing import Optional
+from typing import TYPE_CHECKING, Iterable, List, Optional, Union
 from datetime import datetime
 
-from peoples_advisor.api.oanda.oanda_api import OrderRequest
+from peoples_advisor.common.fixed_price import FixedPrice
+from peoples_advisor.common.timestamps import NS_PER_SECOND, datetime_to_ns, ns_to_datetime
+
+if TYPE_CHECKING:
+    from peoples_advisor.api.oanda.oanda_api import OrderRequest
+
+
+class EventType:
+    # Integer codes of the event types, cheaper to compare than the type strings
+    EXIT = 0
+    START = 1
+    ORDER = 2
+    SIGNAL = 3
+    PRICE = 4
+    QUOTE = 5
+    STOP = 6
+    BAR = 7
 
 
 class BaseEvent(ABC):
+    # Events are allocated once per tick, so they are slotted and keep their priority, type and code on the class
+    __slots__ = ()
+    priority: int
+    type: str
+    code: int
+
     def __init__(self, priority: int, event_type: str):
+        # Only needed by subclasses without __slots__, the built in events set these as class attributes
         self.priority = priority
         self.type = event_type
 
     def __lt__(self, other):
-        return self.priority <= other.priority
-
-    def __eq__(self, other):
-        return self.priority == other.priority
+        return self.priority < other.priority
 
     @abstractmethod
     def __str__(self):
@@ -31,20 +56,59 @@ class BaseEvent(ABC):
         pass
 
 
-class PriceEvent(BaseEvent):
-    def __init__(self, instrument: str, time: datetime, bid: Decimal, ask: Decimal):
+class TimedEvent(BaseEvent):
+    """
+    An event with a time, given either as a datetime or as int epoch nanoseconds
+
+    Whichever form the event was created with is kept, and the other is only computed, once, when it is asked for.
+    Prices are read and streamed as epoch nanoseconds, so their datetime is never built unless a strategy uses .time
+    """
+
+    __slots__ = ("_time", "_timestamp")
+
+    @property
+    def time(self) -> datetime:
+        if self._time is None:
+            self._time = ns_to_datetime(self._timestamp)
+        return self._time
+
+    @time.setter
+    def time(self, time: Union[datetime, int]):
+        if isinstance(time, datetime):
+            self._time, self._timestamp = time, None
+        else:
+            self._time, self._timestamp = None, time
+
+    @property
+    def timestamp(self) -> int:
+        # The time of the event as int epoch nanoseconds
+        if self._timestamp is None:
+            self._timestamp = datetime_to_ns(self._time)
+        return self._timestamp
+
+
+class PriceEvent(TimedEvent):
+    __slots__ = ("instrument", "bid", "ask")
+    priority = 4
+    type = "PRICE"
+    code = EventType.PRICE
+
+    def __init__(self, instrument: str, time: Union[datetime, int], bid: FixedPrice, ask: FixedPrice):
         """
         Creates a price event to be passed along to the signal generator.
 
         Args:
             instrument (str): Name of the instrument
-            time (datetime): Datetime object representing the time of the price signal
-            bid (Decimal): Decimal object representing the bid price in appropriate units
-            ask (Decimal): Decimal object representing the ask price in appropriate units
+            time (datetime, int): Datetime object or int epoch nanoseconds representing the time of the price signal
+            bid (FixedPrice): The bid price, a Decimal is also accepted
+            ask (FixedPrice): The ask price, a Decimal is also accepted
         """
-        super().__init__(4, "PRICE")
-        self.instrument = instrument
-        self.time = time
+        self.instrument = _cached_instrument(instrument)
+        # The time setter, inlined as a price event is created for every tick
+        if isinstance(time, datetime):
+            self._time, self._timestamp = time, None
+        else:
+            self._time, self._timestamp = None, time
         self.bid = bid
         self.ask = ask
 
@@ -52,33 +116,41 @@ class PriceEvent(BaseEvent):
         return f'PRICE : Inst: {self.instrument} Time: {self.time.isoformat("T")} Bid: {self.bid} Ask: {self.ask}'
 
     def __repr__(self):
-        return f"PRICE,{self.instrument},{int(self.time.timestamp())},{self.bid},{self.ask}"
+        return f"PRICE,{self.instrument},{self.timestamp // NS_PER_SECOND},{self.bid},{self.ask}"
 
     @staticmethod
     def from_repr(representation):
-        args = representation.split(",")
+        _, instrument, timestamp, bid, ask = representation.split(",")
         return PriceEvent(
-            args[1],
-            datetime.fromtimestamp(int(args[2])),
-            Decimal(args[3]),
-            Decimal(args[4]),
+            instrument,
+            int(timestamp) * NS_PER_SECOND,
+            FixedPrice.from_str(bid),
+            FixedPrice.from_str(ask),
         )
 
 
-class QuoteEvent(BaseEvent):
-    def __init__(self, instrument: str, time: datetime, bid: Decimal, ask: Decimal):
+class QuoteEvent(TimedEvent):
+    __slots__ = ("instrument", "bid", "ask")
+    priority = 4
+    type = "QUOTE"
+    code = EventType.QUOTE
+
+    def __init__(self, instrument: str, time: Union[datetime, int], bid: FixedPrice, ask: FixedPrice):
         """
         Identical to PriceEvents, but not consumed by SignalStrategy, just used to convert currency
 
         Args:
             instrument (str): Name of the instrument
-            time (datetime): Datetime object representing the time of the price signal
-            bid (Decimal): Decimal object representing the bid price in appropriate units
-            ask (Decimal): Decimal object representing the ask price in appropriate units
+            time (datetime, int): Datetime object or int epoch nanoseconds representing the time of the price signal
+            bid (FixedPrice): The bid price, a Decimal is also accepted
+            ask (FixedPrice): The ask price, a Decimal is also accepted
         """
-        super().__init__(4, "QUOTE")
-        self.instrument = instrument
-        self.time = time
+        self.instrument = _cached_instrument(instrument)
+        # The time setter, inlined as a price event is created for every tick
+        if isinstance(time, datetime):
+            self._time, self._timestamp = time, None
+        else:
+            self._time, self._timestamp = None, time
         self.bid = bid
         self.ask = ask
 
@@ -86,32 +158,92 @@ class QuoteEvent(BaseEvent):
         return f'QUOTE  : Inst: {self.instrument} Time: {self.time.isoformat("T")} Bid: {self.bid} Ask: {self.ask}'
 
     def __repr__(self):
-        return f"QUOTE,{self.instrument},{int(self.time.timestamp())},{self.bid},{self.ask}"
+        return f"QUOTE,{self.instrument},{self.timestamp // NS_PER_SECOND},{self.bid},{self.ask}"
 
     @staticmethod
     def from_repr(representation):
-        args = representation.split(",")
+        _, instrument, timestamp, bid, ask = representation.split(",")
         return QuoteEvent(
-            args[1],
-            datetime.fromtimestamp(int(args[2])),
-            Decimal(args[3]),
-            Decimal(args[4]),
+            instrument,
+            int(timestamp) * NS_PER_SECOND,
+            FixedPrice.from_str(bid),
+            FixedPrice.from_str(ask),
         )
 
 
-class SignalEvent(BaseEvent):
-    def __init__(self, instrument: str, time: datetime, side: str, info: Optional[dict] = None):
+class BarEvent(TimedEvent):
+    __slots__ = ("instrument", "granularity", "open", "high", "low", "close", "ticks")
+    priority = 4
+    type = "BAR"
+    code = EventType.BAR
+
+    def __init__(
+        self,
+        instrument: str,
+        granularity: str,
+        time: Union[datetime, int],
+        open: FixedPrice,
+        high: FixedPrice,
+        low: FixedPrice,
+        close: FixedPrice,
+        ticks: int,
+    ):
+        """
+        Creates a bar event for a candle of mid prices that has just closed, passed along to the signal generator.
+
+        Args:
+            instrument (str): Name of the instrument
+            granularity (str): The granularity of the candle, see CandlestickGranularity in oanda_guide.txt
+            time (datetime, int): Datetime object or int epoch nanoseconds representing the time the candle opened
+            open (FixedPrice): The first mid price of the candle
+            high (FixedPrice): The highest mid price of the candle
+            low (FixedPrice): The lowest mid price of the candle
+            close (FixedPrice): The last mid price of the candle
+            ticks (int): The number of prices in the candle
+        """
+        self.instrument = _cached_instrument(instrument)
+        self.granularity = granularity
+        self.time = time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.ticks = ticks
+
+    def __str__(self):
+        return (
+            f'BAR   : Inst: {self.instrument} Gran: {self.granularity} Time: {self.time.isoformat("T")} '
+            f"O: {self.open} H: {self.high} L: {self.low} C: {self.close} Ticks: {self.ticks}"
+        )
+
+    def __repr__(self):
+        return (
+            f"BAR,{self.instrument},{self.timestamp // NS_PER_SECOND},{self.granularity},"
+            f"{self.open},{self.high},{self.low},{self.close},{self.ticks}"
+        )
+
+    @staticmethod
+    def from_repr(representation):
+        return _bar_fields(representation.split(",", 4), None)
+
+
+class SignalEvent(TimedEvent):
+    __slots__ = ("instrument", "side", "info")
+    priority = 3
+    type = "SIGNAL"
+    code = EventType.SIGNAL
+
+    def __init__(self, instrument: str, time: Union[datetime, int], side: str, info: Optional[dict] = None):
         """
         Creates a signal event to be passed along to the order generator.
 
         Args:
             instrument (str): Name of the instrument
-            time (datetime): Datetime object representing the time of the price signal
+            time (datetime, int): Datetime object or int epoch nanoseconds representing the time of the price signal
             side (str) ['BUY', 'SELL']: What type of signal it is, choose either 'BUY', 'SELL'
             info (dict, optional): Whatever info you want to pass on
         """
-        super().__init__(3, "SIGNAL")
-        self.instrument = instrument
+        self.instrument = _cached_instrument(instrument)
         self.time = time
         self.side = side
         self.info = info
@@ -120,19 +252,29 @@ class SignalEvent(BaseEvent):
         return f'SIGNAL: Inst: {self.instrument} Time: {self.time.isoformat("T")} Side: {self.side}'
 
     def __repr__(self):
-        return f"SIGNAL,{self.instrument},{int(self.time.timestamp())},{self.side},{self.info}"
+        return f"SIGNAL,{self.instrument},{self.timestamp // NS_PER_SECOND},{self.side},{self.info}"
 
     @staticmethod
     def from_repr(representation):
-        args = representation.split(",")
-        return SignalEvent(args[1], datetime.fromtimestamp(int(args[2])), args[3], eval(args[4]))
+        # The info dict may itself contain commas, so only split off the leading fields
+        _, instrument, timestamp, side, info = representation.split(",", 4)
+        return SignalEvent(
+            instrument,
+            int(timestamp) * NS_PER_SECOND,
+            side,
+            literal_eval(info),
+        )
 
 
 class OrderEvent(BaseEvent):
+    __slots__ = ("instrument", "time", "units", "order")
+    priority = 2
+    type = "ORDER"
+    code = EventType.ORDER
+
     def __init__(
-        self, instrument: str, time: datetime, units: Decimal, order: OrderRequest
+        self, instrument: str, time: datetime, units: Decimal, order: "OrderRequest"
     ):  # TODO Abstracted OrderRequest?
-        super().__init__(2, "ORDER")
         self.instrument = instrument
         self.time = time
         self.units = units
@@ -150,8 +292,13 @@ class OrderEvent(BaseEvent):
 
 
 class StartEvent(BaseEvent):
+    __slots__ = ()
+    priority = 1
+    type = "START"
+    code = EventType.START
+
     def __init__(self):
-        super().__init__(1, "START")
+        pass
 
     def __str__(self):
         return "START :"
@@ -165,8 +312,13 @@ class StartEvent(BaseEvent):
 
 
 class StopEvent(BaseEvent):
+    __slots__ = ()
+    priority = 5
+    type = "STOP"
+    code = EventType.STOP
+
     def __init__(self):
-        super().__init__(5, "STOP")
+        pass
 
     def __str__(self):
         return "STOP  :"
@@ -180,8 +332,13 @@ class StopEvent(BaseEvent):
 
 
 class ExitEvent(BaseEvent):
+    __slots__ = ()
+    priority = 0
+    type = "EXIT"
+    code = EventType.EXIT
+
     def __init__(self):
-        super().__init__(0, "EXIT")
+        pass
 
     def __str__(self):
         return "EXIT  :"
@@ -194,7 +351,89 @@ class ExitEvent(BaseEvent):
         return ExitEvent()
 
 
-def event_from_repr(repr_string):
-    repr_string = repr_string.replace("\n", "")
-    event_type = repr_string.split(",")[0].title() + "Event"
-    return eval(f"{event_type}.from_repr('{repr_string}')")
+class EventQueue(PriorityQueue):
+    """
+    A priority queue of events that hands out events of equal priority in the order they were put
+
+    Entries are stored as (priority, sequence, event) so every heap comparison is settled by the two ints, without
+    calling back into the events.
+    """
+
+    def _init(self, maxsize):
+        super()._init(maxsize)
+        self._sequence = count()
+
+    def _put(self, event):
+        heappush(self.queue, (event.priority, next(self._sequence), event))
+
+    def _get(self):
+        return heappop(self.queue)[2]
+
+
+_instruments = {}
+
+
+def _cached_instrument(instrument: str) -> str:
+    # Share one string object per instrument name instead of allocating a new one for every line
+    cached = _instruments.get(instrument)
+    if cached is None:
+        cached = _instruments[instrument] = sys.intern(instrument)
+    return cached
+
+
+def _price_fields(fields, time):
+    return PriceEvent(fields[1], time, FixedPrice.from_str(fields[3]), FixedPrice.from_str(fields[4]))
+
+
+def _quote_fields(fields, time):
+    return QuoteEvent(fields[1], time, FixedPrice.from_str(fields[3]), FixedPrice.from_str(fields[4]))
+
+
+def _bar_fields(fields, time):
+    *prices, ticks = fields[4].split(",")
+    if time is None:
+        time = int(fields[2]) * NS_PER_SECOND
+    return BarEvent(fields[1], fields[3], time, *map(FixedPrice.from_str, prices), int(ticks))
+
+
+def _signal_fields(fields, time):
+    return SignalEvent(fields[1], time, fields[3], literal_eval(fields[4]))
+
+
+# Each parser takes the fields of a single repr_string.split(",", 4) and the already parsed event time, as epoch ns
+_event_parsers = {
+    "PRICE": _price_fields,
+    "QUOTE": _quote_fields,
+    "BAR": _bar_fields,
+    "SIGNAL": _signal_fields,
+    "START": lambda fields, time: StartEvent(),
+    "STOP": lambda fields, time: StopEvent(),
+    "EXIT": lambda fields, time: ExitEvent(),
+}
+
+
+def event_from_repr(repr_string: str) -> BaseEvent:
+    fields = repr_string.rstrip("\n").split(",", 4)
+    parser = _event_parsers.get(fields[0])
+    if parser is None:
+        raise ValueError(f"Unknown event type ({fields[0]}) in {repr_string!r}")
+    time = int(fields[2]) * NS_PER_SECOND if len(fields) > 2 else None
+    return parser(fields, time)
+
+
+def events_from_reprs(repr_strings: Iterable[str]) -> List[BaseEvent]:
+    """
+    Decode a block of repr lines at once
+
+    Event times are kept as epoch nanoseconds, so no datetime is built for a line unless its .time is used.
+    """
+    events = []
+    append = events.append
+    parsers = _event_parsers
+    for repr_string in repr_strings:
+        fields = repr_string.rstrip("\n").split(",", 4)
+        parser = parsers.get(fields[0])
+        if parser is None:
+            raise ValueError(f"Unknown event type ({fields[0]}) in {repr_string!r}")
+        append(parser(fields, int(fields[2]) * NS_PER_SECOND if len(fields) > 2 else None))
+    return events
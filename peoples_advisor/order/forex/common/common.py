@@ -15,16 +15,25 @@ class MarketOrder(BaseOrder):
 
 
 class ConditionalOrder(BaseOrder):
+    # Whether a buy (positive units) triggers at or below its trigger price, a sell triggers on the other side
+    buy_triggers_below: bool
+
     def __init__(self, order_type: str, instrument: str, units: int, trigger_price: Decimal):
         super().__init__(order_type, instrument, units)
         self.trigger_price = trigger_price
 
+    @property
+    def triggers_below(self) -> bool:
+        return self.buy_triggers_below if self.units > 0 else not self.buy_triggers_below
+
     @abstractmethod
     def trigger(self, price: Decimal) -> bool:
         pass
 
 
 class LimitOrder(ConditionalOrder):
+    buy_triggers_below = True
+
     def __init__(self, instrument: str, units: int, trigger_price: Decimal):
         super().__init__("LIMIT", instrument, units, trigger_price)
 
@@ -36,6 +45,8 @@ class LimitOrder(ConditionalOrder):
 
 
 class StopOrder(ConditionalOrder):
+    buy_triggers_below = False
+
     def __init__(self, instrument: str, units: int, trigger_price: Decimal):
         super().__init__("STOP", instrument, units, trigger_price)
 
@@ -47,6 +58,8 @@ class StopOrder(ConditionalOrder):
 
 
 class TakeProfitOrder(ConditionalOrder):
+    buy_triggers_below = True
+
     def __init__(self, instrument: str, units: int, trigger_price: Decimal):
         super().__init__("TAKE_PROFIT", instrument, units, trigger_price)
 
@@ -58,6 +71,8 @@ class TakeProfitOrder(ConditionalOrder):
 
 
 class StopLossOrder(ConditionalOrder):
+    buy_triggers_below = False
+
     def __init__(self, instrument: str, units: int, trigger_price: Decimal):
         super().__init__("STOP_LOSS", instrument, units, trigger_price)
 
@@ -69,6 +84,8 @@ class StopLossOrder(ConditionalOrder):
 
 
 class MarketIfTouchedOrder(ConditionalOrder):
+    buy_triggers_below = True
+
     def __init__(self, instrument: str, units: int, trigger_price: Decimal):
         super().__init__("MARKET_IF_TOUCHED", instrument, units, trigger_price)
 
@@ -80,6 +97,8 @@ class MarketIfTouchedOrder(ConditionalOrder):
 
 
 class TrailingStopOrder(ConditionalOrder):
+    buy_triggers_below = False
+
     def __init__(self, instrument: str, units: int, trigger_price: Decimal):
         super().__init__("TRAILING_STOP", instrument, units, trigger_price)
 
@@ -1,38 +1,163 @@
-from typing import Union
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 from decimal import Decimal
 
-from peoples_advisor.common.common import PAError, get_margins
+from peoples_advisor.common.common import PAError, extend_instrument_list, get_margins
+from peoples_advisor.common.fixed_price import FixedPrice
 from peoples_advisor.event.event import PriceEvent, QuoteEvent
 from peoples_advisor.settings import BALANCE, ACCOUNT_CURRENCY, INSTRUMENTS
 
 
+class ConversionTable:
+    def __init__(self, instruments: Iterable[str]):
+        """
+        The rate to convert between each pair of currencies an instrument quotes, kept up to date as prices arrive
+
+        Built once, so converting is a single dict lookup and a multiply instead of building and probing instrument
+        names. Converting from the quote to the base currency of an instrument divides by its price, the other way
+        multiplies by it. Positive amounts are converted at the rate that favours the broker, negative amounts at the
+        other side.
+
+        Args:
+            instruments (Iterable[str]): Every instrument that may be used to convert, usually the result of
+                extend_instrument_list
+        """
+        # (from currency, to currency) -> (instrument, inverted), inverted when converting divides by the price
+        self.routes: Dict[Tuple[str, str], Tuple[str, bool]] = {}
+        # (from currency, to currency) -> [rate for positive amounts, rate for negative amounts], None until priced
+        self._rates: Dict[Tuple[str, str], list] = {}
+        # instrument -> the (rates, inverted) its price sets
+        self._updates: Dict[str, List[Tuple[list, bool]]] = {}
+        for instrument in instruments:
+            base, quote = split_instrument(instrument)
+            self._add((quote, base), instrument, True)
+            self._add((base, quote), instrument, False)
+
+    def update(self, instrument: str, bid: Union[FixedPrice, Decimal], ask: Union[FixedPrice, Decimal]):
+        updates = self._updates.get(instrument)
+        if updates is None:
+            return
+        if bid.__class__ is FixedPrice:
+            bid, ask = bid.decimal, ask.decimal
+        for rates, inverted in updates:
+            if inverted:
+                rates[0], rates[1] = 1 / ask, 1 / bid
+            else:
+                rates[0], rates[1] = bid, ask
+
+    def convert(self, from_currency: str, to_currency: str, units: Decimal):
+        if units == 0:
+            return Decimal(0)
+        if from_currency == to_currency:
+            return units
+        rates = self._rates.get((from_currency, to_currency))
+        if rates is None:
+            raise PAError(f"Impossible currency pair for {from_currency} and {to_currency}")
+        rate = rates[0] if units > 0 else rates[1]
+        if rate is None:
+            instrument = self.routes[(from_currency, to_currency)][0]
+            raise PAError(f"No price of {instrument} yet to convert {from_currency} to {to_currency}")
+        return units * rate
+
+    def _add(self, key: Tuple[str, str], instrument: str, inverted: bool):
+        if key in self.routes:
+            return
+        rates = [None, None]
+        self.routes[key] = (instrument, inverted)
+        self._rates[key] = rates
+        self._updates.setdefault(instrument, []).append((rates, inverted))
+
+
 class Portfolio:
-    def __init__(self):
-        self.balance = BALANCE
-        self.home_cur = ACCOUNT_CURRENCY
-        self.margin_rates = get_margins(INSTRUMENTS)
+    def __init__(
+        self,
+        balance: Optional[Decimal] = None,
+        home_currency: Optional[str] = None,
+        margin_rates: Optional[Dict[str, Decimal]] = None,
+        instruments: Optional[Iterable[str]] = None,
+    ):
+        """
+        Tracks the prices, positions, profit and margin of an account
+
+        The unrealized profit and used margin of every instrument are kept up to date as prices arrive, so reading
+        them, or the equity, free margin and margin level built from them, does not depend on the number of positions.
+        Positions must be opened and closed through add_position and remove_position for this to hold.
+
+        Args:
+            balance (Decimal, optional): The starting balance, default: BALANCE
+            home_currency (str, optional): The currency of the account, default: ACCOUNT_CURRENCY
+            margin_rates (Dict[str, Decimal], optional): The margin rate of each instrument, default: the margin rates
+                of INSTRUMENTS
+            instruments (Iterable[str], optional): The instruments that will be priced, which the currency conversions
+                are built from, default: INSTRUMENTS extended with the instruments to convert them to the home currency
+        """
+        self.balance = BALANCE if balance is None else balance
+        self.home_cur = ACCOUNT_CURRENCY if home_currency is None else home_currency
+        self.margin_rates = get_margins(INSTRUMENTS) if margin_rates is None else margin_rates
+        if instruments is None:
+            instruments = extend_instrument_list(INSTRUMENTS, self.home_cur)
+        self.conversions = ConversionTable(instruments)
         # In the form of {instrument_pair: {'bid': bid, 'ask': ask}}
         self.prices = {}
         self.orders = {}
         # In the form of {instrument_pair: [(units: Decimal, price bought/sold at: Decimal),]}
         self.positions = {}
+        # In the form of {instrument_pair: [long units, long cost, short units, short cost]}, the cost being the sum of
+        # units * price of the lots, enough to give the profit of every lot of the instrument at once
+        self._totals: Dict[str, list] = {}
+        # The unrealized profit and used margin of each instrument with positions, in the home currency
+        self._contributions: Dict[str, Tuple[Decimal, Decimal]] = {}
+        self._unrealized = Decimal(0)
+        self._margin = Decimal(0)
+        # instrument_pair -> the instruments with positions whose profit or margin its price converts
+        self._dependents: Dict[str, Set[str]] = {}
+        # Instruments whose contribution could not be computed yet, as a price they need has not arrived
+        self._stale: Set[str] = set()
 
     def update_price(self, price: Union[PriceEvent, QuoteEvent]):
         self.prices[price.instrument] = {"bid": price.bid, "ask": price.ask}
+        self.conversions.update(price.instrument, price.bid, price.ask)
+        dependents = self._dependents.get(price.instrument)
+        if dependents:
+            for instrument in dependents:
+                self._refresh(instrument)
         # TODO check orders and prices for things
 
+    def add_position(self, instrument: str, units: Decimal, price: Decimal):
+        """
+        Open a lot of units (negative for a short) of an instrument at price
+        """
+        if units == 0:
+            return
+        totals = self._totals.get(instrument)
+        if totals is None:
+            totals = self._totals[instrument] = [Decimal(0)] * 4
+            self._watch(instrument)
+        self.positions.setdefault(instrument, []).append((units, price))
+        side = 0 if units > 0 else 2
+        totals[side] += units
+        totals[side + 1] += units * price
+        self._refresh(instrument)
+
+    def remove_position(self, instrument: str, index: int = -1) -> Tuple[Decimal, Decimal]:
+        """
+        Close a lot of an instrument, the most recently opened by default, returning its (units, price)
+        """
+        positions = self.positions[instrument]
+        units, price = positions.pop(index)
+        totals = self._totals[instrument]
+        side = 0 if units > 0 else 2
+        totals[side] -= units
+        totals[side + 1] -= units * price
+        if not positions:
+            del self.positions[instrument]
+        self._refresh(instrument)
+        return units, price
+
     @property
     def unrealized_pl(self):
-        unrealized = Decimal(0)
-        for instrument, positions in self.positions.items():
-            for position in positions:
-                if position[0] < 0:
-                    position_profit = position[0] * (position[1] - self.prices[instrument]["ask"])
-                    unrealized += self._convert(ACCOUNT_CURRENCY, self.quote_currency(instrument), position_profit)
-                elif position[0] > 0:
-                    position_profit = position[0] * (position[1] - self.prices[instrument]["bid"])
-                    unrealized += self._convert(ACCOUNT_CURRENCY, self.quote_currency(instrument), position_profit)
-        return unrealized
+        if self._stale:
+            self._refresh_stale()
+        return self._unrealized
 
     @property
     def equity(self):
@@ -41,19 +166,18 @@ class Portfolio:
     def required_margin(self, instrument: str, units: Decimal):
         if units < 0:
             margin = units * -1 * self.margin_rates[instrument]
-            return self._convert(ACCOUNT_CURRENCY, self.base_currency(instrument), margin)
+            return self._convert(self.home_cur, self.base_currency(instrument), margin)
         elif units > 0:
             margin = units * self.margin_rates[instrument]
-            return self._convert(ACCOUNT_CURRENCY, self.base_currency(instrument), margin)
+            return self._convert(self.home_cur, self.base_currency(instrument), margin)
         else:
             return Decimal(0)
 
     @property
     def used_margin(self):
-        margin = Decimal(0)
-        for instrument, position in self.positions.items():
-            margin += self.required_margin(position[0], instrument)
-        return margin
+        if self._stale:
+            self._refresh_stale()
+        return self._margin
 
     @property
     def free_margin(self):
@@ -61,30 +185,73 @@ class Portfolio:
 
     @property
     def margin_level(self):
-        if self.used_margin == 0:
+        used_margin = self.used_margin
+        if used_margin == 0:
             return Decimal(0)
         else:
-            return (self.equity / self.used_margin) * 100
+            return (self.equity / used_margin) * 100
+
+    def _watch(self, instrument: str):
+        # Refresh the instrument whenever its own price or a price that converts its quote or base currency changes
+        self._dependents.setdefault(instrument, set()).add(instrument)
+        for currency in split_instrument(instrument):
+            route = self.conversions.routes.get((currency, self.home_cur))
+            if route is not None:
+                self._dependents.setdefault(route[0], set()).add(instrument)
+
+    def _refresh(self, instrument: str):
+        # Recompute the contribution of a single instrument and apply the difference to the totals
+        old_unrealized, old_margin = self._contributions.pop(instrument, (0, 0))
+        self._unrealized -= old_unrealized
+        self._margin -= old_margin
+        if not self._contributions:
+            # Start again from exact zeros rather than whatever rounding the differences left behind
+            self._unrealized, self._margin = Decimal(0), Decimal(0)
+        self._stale.discard(instrument)
+        if instrument not in self.positions:
+            return
+        long_units, long_cost, short_units, short_cost = self._totals[instrument]
+        try:
+            price = self.prices[instrument]
+            # The profit of every lot at once, units * (closing price - opening price) summed over the lots
+            profit = long_units * price["bid"] - long_cost + short_units * price["ask"] - short_cost
+            unrealized = self._convert(self.home_cur, self.quote_currency(instrument), profit)
+            margin = self.required_margin(instrument, long_units - short_units)
+        except (KeyError, PAError):
+            self._stale.add(instrument)
+            return
+        self._contributions[instrument] = (unrealized, margin)
+        self._unrealized += unrealized
+        self._margin += margin
+
+    def _refresh_stale(self):
+        for instrument in list(self._stale):
+            self._refresh(instrument)
+        if self._stale:
+            instrument = next(iter(self._stale))
+            raise PAError(f"Missing prices to value the positions of {instrument} in {self.home_cur}")
 
     def _convert(self, to_currency: str, from_currency: str, units: Decimal):
-        if units == 0:
-            return Decimal(0)
-        elif units > 0 and f"{to_currency}_{from_currency}" in self.prices.keys():
-            conversion = Decimal(1 / self.prices[f"{to_currency}_{from_currency}"]["ask"])
-        elif units > 0 and f"{from_currency}_{to_currency}" in self.prices.keys():
-            conversion = Decimal(self.prices[f"{from_currency}_{to_currency}"]["bid"])
-        elif units < 0 and f"{to_currency}_{from_currency}" in self.prices.keys():
-            conversion = Decimal(1 / self.prices[f"{to_currency}_{from_currency}"]["bid"])
-        elif units < 0 and f"{from_currency}_{to_currency}" in self.prices.keys():
-            conversion = Decimal(self.prices[f"{from_currency}_{to_currency}"]["ask"])
-        else:
-            raise PAError(f"Impossible currency pair for {from_currency} and {to_currency}")
-        return units * conversion
+        return self.conversions.convert(from_currency, to_currency, units)
 
     @staticmethod
     def base_currency(instrument):
-        return instrument.split("_")[0]
+        return split_instrument(instrument)[0]
 
     @staticmethod
     def quote_currency(instrument):
-        return instrument.split("_")[1]
+        return split_instrument(instrument)[1]
+
+
+_currencies: Dict[str, Tuple[str, str]] = {}
+
+
+def split_instrument(instrument: str) -> Tuple[str, str]:
+    """
+    The (base currency, quote currency) of an instrument such as 'EUR_USD', split once and remembered
+    """
+    currencies = _currencies.get(instrument)
+    if currencies is None:
+        base, _, quote = instrument.partition("_")
+        currencies = _currencies[instrument] = (base, quote)
+    return currencies
@@ -1,5 +1,34 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
+from decimal import Decimal
+from math import inf
+from typing import Dict, Iterable, List
+
+from peoples_advisor.common.fixed_price import FixedPrice, mid_price
+from peoples_advisor.common.timestamps import NS_PER_SECOND
+from peoples_advisor.event.event import BarEvent, PriceEvent
+
+# The length in seconds of every candle granularity that is a whole number of seconds since the epoch apart
+GRANULARITY_SECONDS = {
+    "S5": 5,
+    "S10": 10,
+    "S15": 15,
+    "S30": 30,
+    "M1": 60,
+    "M2": 120,
+    "M4": 240,
+    "M5": 300,
+    "M10": 600,
+    "M15": 900,
+    "M30": 1800,
+    "H1": 3600,
+    "H2": 7200,
+    "H3": 10800,
+    "H4": 14400,
+    "H6": 21600,
+    "H8": 28800,
+    "H12": 43200,
+}
 
 
 class BasePricingGen(ABC):
@@ -11,6 +40,111 @@ class BasePricingGen(ABC):
         pass
 
 
+class CandleAggregator:
+    def __init__(self, granularities: Iterable[str]):
+        """
+        Build candles of mid prices from ticks for every instrument, at several granularities at once
+
+        Candles start on multiples of their length since the epoch, as OANDA's do. A candle is closed by the first
+        price at or after its end, of any instrument, so quiet instruments still close their candles on time.
+
+        Args:
+            granularities (Iterable[str]): The granularities to build, see GRANULARITY_SECONDS
+        """
+        granularities = list(dict.fromkeys(granularities))
+        unsupported = [granularity for granularity in granularities if granularity not in GRANULARITY_SECONDS]
+        if unsupported:
+            raise ValueError(f"Unsupported candle granularities {unsupported}, choose from {list(GRANULARITY_SECONDS)}")
+        # (granularity, candle length in epoch nanoseconds)
+        self.granularities = [
+            (granularity, GRANULARITY_SECONDS[granularity] * NS_PER_SECOND) for granularity in granularities
+        ]
+        # instrument -> one open candle per granularity, [end, start, places, open, high, low, close, ticks] or None.
+        # end and start are epoch nanoseconds, the prices are FixedPrice values with places decimal places, or
+        # Decimals when places is None. A tick of other places rescales the candle, see _match_places
+        self._candles: Dict[str, list] = {}
+        self._next_close = inf
+
+    def update(self, price: PriceEvent) -> List[BarEvent]:
+        """
+        Add a price to the open candles of its instrument, returning the candles it closed, oldest first
+        """
+        timestamp = price.timestamp
+        closed = self.close_due(timestamp) if timestamp >= self._next_close else []
+        bid, ask = price.bid, price.ask
+        if bid.__class__ is FixedPrice and ask.__class__ is FixedPrice:
+            # (bid + ask) / 2 with one more decimal place, kept as an int until the candle closes
+            if bid.places == ask.places:
+                mid, places = (bid.value + ask.value) * 5, bid.places + 1
+            else:
+                total = bid + ask
+                mid, places = total.value * 5, total.places + 1
+        else:
+            mid, places = mid_price(bid, ask), None
+        candles = self._candles.get(price.instrument)
+        if candles is None:
+            candles = self._candles[price.instrument] = [None] * len(self.granularities)
+        for index, (_, length) in enumerate(self.granularities):
+            candle = candles[index]
+            if candle is None:
+                start = timestamp - timestamp % length
+                end = start + length
+                candles[index] = [end, start, places, mid, mid, mid, mid, 1]
+                if end < self._next_close:
+                    self._next_close = end
+            else:
+                candle_mid = mid if places == candle[2] else _match_places(candle, mid, places)
+                if candle_mid > candle[4]:
+                    candle[4] = candle_mid
+                elif candle_mid < candle[5]:
+                    candle[5] = candle_mid
+                candle[6] = candle_mid
+                candle[7] += 1
+        return closed
+
+    def close_due(self, timestamp: int) -> List[BarEvent]:
+        """
+        Close every candle that ends at or before timestamp (epoch nanoseconds), returning them oldest first
+        """
+        closed = []
+        next_close = inf
+        for instrument, candles in self._candles.items():
+            for index, (granularity, _) in enumerate(self.granularities):
+                candle = candles[index]
+                if candle is None:
+                    continue
+                end = candle[0]
+                if end <= timestamp:
+                    _, start, places, *prices, ticks = candle
+                    if places is not None:
+                        prices = [FixedPrice(value, places) for value in prices]
+                    closed.append((end, BarEvent(instrument, granularity, start, *prices, ticks)))
+                    candles[index] = None
+                elif end < next_close:
+                    next_close = end
+        self._next_close = next_close
+        # sorted is stable, so candles that end together keep instrument then granularity order
+        return [bar for _, bar in sorted(closed, key=lambda item: item[0])]
+
+
+def _match_places(candle: list, mid, places):
+    # Put an open candle and a mid of different places on one scale, returning the mid on it. Int candles are widened
+    # to the larger places, and become Decimals once either side is a Decimal
+    candle_places = candle[2]
+    if candle_places is not None and places is not None:
+        if places < candle_places:
+            return mid * 10 ** (candle_places - places)
+        factor = 10 ** (places - candle_places)
+        candle[3:7] = [value * factor for value in candle[3:7]]
+        candle[2] = places
+        return mid
+    if places is not None:
+        return Decimal(mid).scaleb(-places)
+    candle[3:7] = [Decimal(value).scaleb(-candle_places) for value in candle[3:7]]
+    candle[2] = None
+    return mid
+
+
 def standard_filename(from_time: datetime, to_time: datetime):
     filename = from_time.strftime("%Y.%m.%dT%H.%M.%S") + "-" + to_time.strftime("%Y.%m.%dT%H.%M.%S")
     filename = "LIVE-[" + filename + "]"
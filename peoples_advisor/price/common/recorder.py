@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional, Union
+
+from peoples_advisor.backtest.common.history import TEXT_EXTENSION
+from peoples_advisor.event.event import PriceEvent, QuoteEvent
+from peoples_advisor.price.common.common import standard_filename
+
+COLLECTING_FILENAME = "currently_collecting" + TEXT_EXTENSION
+
+
+class TickRecorder:
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        flush_interval: float = 1.0,
+        max_bytes: Optional[int] = 64 * 1024 * 1024,
+        max_seconds: Optional[float] = 24 * 60 * 60,
+        buffer_size: int = 1_000_000,
+        sync: bool = False,
+    ):
+        """
+        Record price and quote events to rotating text history files from a background thread
+
+        Args:
+            directory (str, Path): The directory to write the history files to, created if missing
+            flush_interval (float, optional): Seconds between writes of the buffered events
+            max_bytes (int, optional): Rotate to a new file once the current one reaches this size, None to never
+            max_seconds (float, optional): Rotate to a new file once the current one is this old, None to never
+            buffer_size (int, optional): The most events to hold between writes, events past it are dropped and
+                counted in dropped rather than blocking the pricing thread
+            sync (bool, optional): fsync the file after every write, not just flush it to the os
+        """
+        self.directory = Path(directory)
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.buffer_size = buffer_size
+        self.sync = sync
+        self.count = 0
+        self.dropped = 0
+        self.files = []
+        self.error: Optional[BaseException] = None
+        # deque.append and popleft are atomic, so the two threads share the buffer without a lock
+        self._buffer = deque()
+        self._file = None
+        self._size = 0
+        self._opened = 0.0
+        self._first = None
+        self._last = None
+        self._stop = threading.Event()
+        self._closed = False
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="TickRecorder", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def record(self, event: Union[PriceEvent, QuoteEvent]):
+        """
+        Buffer an event to be written, without ever blocking
+        """
+        if len(self._buffer) >= self.buffer_size:
+            self.dropped += 1
+        else:
+            self._buffer.append(event)
+
+    def close(self):
+        """
+        Write everything still buffered, then give the last file its final name
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        self._thread.join()
+        if self.error is None:
+            self._write()
+        self._rotate()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        # Everything buffered since the last wake is written with a single write and flush, so the pricing thread
+        # never waits on the disk
+        try:
+            while not self._stop.wait(self.flush_interval):
+                self._write()
+        except BaseException as error:
+            # Kept to be raised by close, the pricing thread carries on and events are no longer written
+            self.error = error
+
+    def _write(self):
+        buffer = self._buffer
+        count = len(buffer)
+        if not count:
+            return
+        popleft = buffer.popleft
+        events = [popleft() for _ in range(count)]
+        if self._file is None:
+            self._file = open(self.directory / COLLECTING_FILENAME, "w")
+            self._size = 0
+            self._opened = time.monotonic()
+            self._first = events[0]
+        text = "".join([repr(event) + "\n" for event in events])
+        self._file.write(text)
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+        self._size += len(text)
+        self._last = events[-1]
+        self.count += count
+        if (self.max_bytes is not None and self._size >= self.max_bytes) or (
+            self.max_seconds is not None and time.monotonic() - self._opened >= self.max_seconds
+        ):
+            self._rotate()
+
+    def _rotate(self):
+        # Close the file being written and rename it after the times of its first and last price
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        filename = standard_filename(self._first.time, self._last.time)
+        filepath = self.directory / (filename + TEXT_EXTENSION)
+        duplicate = 0
+        while filepath.exists():
+            # Files rotated within the same second would otherwise share a name
+            duplicate += 1
+            filepath = self.directory / f"{filename}-{duplicate}{TEXT_EXTENSION}"
+        (self.directory / COLLECTING_FILENAME).rename(filepath)
+        self.files.append(filepath)
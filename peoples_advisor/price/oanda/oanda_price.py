@@ -1,15 +1,15 @@
-import os
-from decimal import Decimal
-from datetime import datetime
 from queue import PriorityQueue
 from threading import Event
-from typing import List
+from typing import List, Sequence
 
 from peoples_advisor.api.oanda.oanda_api import OandaApi
-from peoples_advisor.backtest.common.common import history_filepath
+from peoples_advisor.api.oanda.oanda_supervisor import SupervisedPricingStream
+from peoples_advisor.backtest.common.common import base_path
 from peoples_advisor.common.common import extend_instrument_list
+from peoples_advisor.common.fixed_price import FixedPrice
 from peoples_advisor.event.event import PriceEvent, QuoteEvent
-from peoples_advisor.price.common.common import BasePricingGen, standard_filename
+from peoples_advisor.price.common.common import BasePricingGen, CandleAggregator
+from peoples_advisor.price.common.recorder import TickRecorder
 
 
 class OandaPricingGen(BasePricingGen):
@@ -24,6 +24,7 @@ class OandaPricingGen(BasePricingGen):
         priority_queue: PriorityQueue,
         exit_flag: Event,
         save_to_file: bool = None,
+        granularities: Sequence[str] = (),
     ):
         super().__init__()
         self.instruments = instruments
@@ -32,43 +33,46 @@ class OandaPricingGen(BasePricingGen):
         self.queue = priority_queue
         self.exit_flag = exit_flag
         self.save_to_file = save_to_file
+        # Candles are only built when a strategy asks for them, so tick only strategies pay nothing extra
+        self.aggregator = CandleAggregator(granularities) if granularities else None
 
     def gen(self):
+        recorder = None
         try:
             if self.save_to_file:
-                save_file = open(history_filepath("currently_collecting.txt"), "w")
-                start_time = datetime.now()
+                # Ticks are written by the recorder's own thread, so saving them adds no disk io to this one
+                recorder = TickRecorder(base_path)
             all_instruments = extend_instrument_list(self.instruments, self.account_currency)
-            pricing_stream = self.api.pricing_stream(all_instruments)
+            # Stalls and disconnects are reconnected through, only errors that retrying cannot fix end pricing
+            pricing_stream = SupervisedPricingStream(self.api, all_instruments, stop=self.exit_flag)
             for price in pricing_stream:
                 if self.exit_flag.is_set():
                     break
-                if price["instrument"] in self.instruments:
+                if price.instrument in self.instruments:
                     event = PriceEvent(
-                        price["instrument"],
-                        self.api.oanda_time_to_datetime(price["time"]),
-                        Decimal(price["bids"][0]["price"]),
-                        Decimal(price["asks"][0]["price"]),
+                        price.instrument,
+                        self.api.oanda_time_to_ns(price.time),
+                        FixedPrice.from_str(price.bid),
+                        FixedPrice.from_str(price.ask),
                     )
+                    if self.aggregator is not None:
+                        for bar in self.aggregator.update(event):
+                            self.queue.put(bar)
                 else:
                     event = QuoteEvent(
-                        price["instrument"],
-                        self.api.oanda_time_to_datetime(price["time"]),
-                        Decimal(price["bids"][0]["price"]),
-                        Decimal(price["asks"][0]["price"]),
+                        price.instrument,
+                        self.api.oanda_time_to_ns(price.time),
+                        FixedPrice.from_str(price.bid),
+                        FixedPrice.from_str(price.ask),
                     )
                 self.queue.put(event)
-                if self.save_to_file:
-                    save_file.write(repr(event) + "\n")
-                    save_file.flush()
-            if self.save_to_file:
-                save_file.close()
-                end_time = datetime.now()
-                cur_file_name = history_filepath("currently_collecting.txt", delete=False)
-                save_file_name = history_filepath(standard_filename(start_time, end_time))
-                cur_file_name.rename(save_file_name)
+                if recorder is not None:
+                    recorder.record(event)
         except FileNotFoundError:
             pass
         except Exception:
             self.exit_flag.set()
             raise
+        finally:
+            if recorder is not None:
+                recorder.close()
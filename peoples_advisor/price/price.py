@@ -1,7 +1,7 @@
 from queue import PriorityQueue
 from threading import Event
+from typing import Sequence
 
-from peoples_advisor.price.oanda.oanda_price import OandaPricingGen
 from peoples_advisor.settings import (
     BROKER,
     API_TOKEN,
@@ -14,8 +14,10 @@ from peoples_advisor.settings import (
 )
 
 
-def pricing_gen_factory(priority_queue: PriorityQueue, exit_flag: Event):
+def pricing_gen_factory(priority_queue: PriorityQueue, exit_flag: Event, granularities: Sequence[str] = ()):
     if BROKER == "OANDA":
+        from peoples_advisor.price.oanda.oanda_price import OandaPricingGen
+
         return OandaPricingGen(
             API_TOKEN,
             LIVE,
@@ -26,6 +28,7 @@ def pricing_gen_factory(priority_queue: PriorityQueue, exit_flag: Event):
             priority_queue,
             exit_flag,
             SAVE_LIVE_AS_HISTORICAL,
+            granularities,
         )
     else:
         return
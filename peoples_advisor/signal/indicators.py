@@ -0,0 +1,319 @@
+from abc import ABC, abstractmethod
+from math import fsum, log, sqrt
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from peoples_advisor.signal.signal import optional_numpy
+
+
+class RingBuffer:
+    def __init__(self, size: int):
+        """
+        A fixed size window of the most recent values, oldest first
+
+        Args:
+            size (int): The number of values kept
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.size = size
+        self._values: List[float] = [0.0] * size
+        self._index = 0
+        self._count = 0
+
+    def push(self, value: float) -> Optional[float]:
+        """
+        Append a value, returning the value it pushed out of the window, or None if the window was not yet full
+        """
+        evicted = self._values[self._index] if self._count == self.size else None
+        self._values[self._index] = value
+        self._index = (self._index + 1) % self.size
+        if self._count < self.size:
+            self._count += 1
+        return evicted
+
+    @property
+    def full(self) -> bool:
+        return self._count == self.size
+
+    @property
+    def wrapped(self) -> bool:
+        # True right after the window has been entirely replaced, used to resum and undo floating point drift
+        return self._index == 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[float]:
+        if self._count < self.size:
+            return iter(self._values[: self._count])
+        return iter(self._values[self._index :] + self._values[: self._index])
+
+    def __getitem__(self, index: int) -> float:
+        if not -self._count <= index < self._count:
+            raise IndexError("ring buffer index out of range")
+        return self._values[(self._index - self._count + index) % self.size]
+
+
+class Indicator(ABC):
+    """
+    The base class of the streaming indicators, each update is O(1)
+
+    update() returns the new value of the indicator, or None until enough values have been seen for it to be defined,
+    which is the point the vectorized version of the indicator stops returning NaN.
+    """
+
+    value = None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    @abstractmethod
+    def update(self, *args):
+        pass
+
+
+class SMA(Indicator):
+    def __init__(self, period: int):
+        """
+        Simple moving average of the last period values
+
+        Args:
+            period (int): The number of values averaged
+        """
+        self.period = period
+        self.window = RingBuffer(period)
+        self._sum = 0.0
+
+    def update(self, value) -> Optional[float]:
+        value = float(value)
+        evicted = self.window.push(value)
+        self._sum += value if evicted is None else value - evicted
+        if self.window.wrapped:
+            self._sum = fsum(self.window)
+        if self.window.full:
+            self.value = self._sum / self.period
+        return self.value
+
+
+class EMA(Indicator):
+    def __init__(self, period: int, alpha: Optional[float] = None):
+        """
+        Exponential moving average, seeded with the simple average of the first period values
+
+        Args:
+            period (int): The number of values averaged to seed the EMA
+            alpha (float, optional): The weight of each new value
+                default: 2 / (period + 1)
+        """
+        self.period = period
+        self.alpha = 2 / (period + 1) if alpha is None else alpha
+        self._seed = 0.0
+        self._count = 0
+
+    def update(self, value) -> Optional[float]:
+        value = float(value)
+        if self.value is not None:
+            self.value += self.alpha * (value - self.value)
+        else:
+            self._seed += value
+            self._count += 1
+            if self._count == self.period:
+                self.value = self._seed / self.period
+        return self.value
+
+
+class RollingStd(Indicator):
+    def __init__(self, period: int, ddof: int = 0):
+        """
+        Standard deviation of the last period values
+
+        The mean and sum of squared deviations are updated as values enter and leave the window (Welford), which
+        stays accurate for prices, unlike a running sum of squares.
+
+        Args:
+            period (int): The number of values in the window
+            ddof (int, optional): Delta degrees of freedom, 1 for the sample standard deviation
+        """
+        if period <= ddof:
+            raise ValueError("period must be greater than ddof")
+        self.period = period
+        self.ddof = ddof
+        self.window = RingBuffer(period)
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value) -> Optional[float]:
+        value = float(value)
+        evicted = self.window.push(value)
+        if evicted is None:
+            delta = value - self.mean
+            self.mean += delta / len(self.window)
+            self._m2 += delta * (value - self.mean)
+        else:
+            mean = self.mean
+            self.mean += (value - evicted) / self.period
+            self._m2 += (value - evicted) * (value - self.mean + evicted - mean)
+        if self.window.wrapped:
+            self.mean = fsum(self.window) / self.period
+            self._m2 = fsum((x - self.mean) ** 2 for x in self.window)
+        if self.window.full:
+            self.value = sqrt(max(self._m2, 0.0) / (self.period - self.ddof))
+        return self.value
+
+
+class BollingerBands(Indicator):
+    def __init__(self, period: int = 20, width: float = 2.0):
+        """
+        The moving average of the last period values, with bands width standard deviations above and below it
+
+        Args:
+            period (int, optional): The number of values in the window
+            width (float, optional): The number of standard deviations between the average and each band
+        """
+        self.width = width
+        self.std = RollingStd(period)
+
+    def update(self, value) -> Optional[Tuple[float, float, float]]:
+        """
+        Returns:
+            (lower, middle, upper) once period values have been seen
+        """
+        std = self.std.update(value)
+        if std is not None:
+            middle = self.std.mean
+            self.value = (middle - self.width * std, middle, middle + self.width * std)
+        return self.value
+
+
+class ATR(Indicator):
+    def __init__(self, period: int = 14):
+        """
+        Average true range of candles, with Wilder's smoothing
+
+        Tick strategies can feed it the candles of a bar aggregator, or the same price as high, low and close.
+
+        Args:
+            period (int, optional): The number of true ranges averaged to seed the ATR
+        """
+        self.period = period
+        self._average = EMA(period, alpha=1 / period)
+        self._close: Optional[float] = None
+
+    def update(self, high, low, close) -> Optional[float]:
+        high, low, close = float(high), float(low), float(close)
+        true_range = high - low
+        if self._close is not None:
+            true_range = max(true_range, abs(high - self._close), abs(low - self._close))
+        self._close = close
+        self.value = self._average.update(true_range)
+        return self.value
+
+
+class InstrumentIndicators(Dict[str, Indicator]):
+    def __init__(self, factory: Callable[[], Indicator]):
+        """
+        A separate indicator per instrument, created on first use
+
+        Example:
+            self.averages = InstrumentIndicators(lambda: SMA(20))
+            average = self.averages[price.instrument].update(price.bid)
+
+        Args:
+            factory (Callable[[], Indicator]): Builds the indicator of a new instrument
+        """
+        super().__init__()
+        self.factory = factory
+
+    def __missing__(self, instrument: str) -> Indicator:
+        indicator = self[instrument] = self.factory()
+        return indicator
+
+
+def _numpy():
+    numpy = optional_numpy()
+    if numpy is None:
+        raise ImportError("numpy is required for the vectorized indicators")
+    return numpy
+
+
+def _undefined(numpy, length: int):
+    return numpy.full(length, numpy.nan)
+
+
+def sma(values, period: int):
+    """
+    Vectorized SMA, NaN for the first period - 1 values
+    """
+    numpy = _numpy()
+    values = numpy.asarray(values, dtype=numpy.float64)
+    result = _undefined(numpy, len(values))
+    if len(values) >= period:
+        result[period - 1 :] = numpy.lib.stride_tricks.sliding_window_view(values, period).mean(axis=1)
+    return result
+
+
+def ema(values, period: int, alpha: Optional[float] = None):
+    """
+    Vectorized EMA, NaN for the first period - 1 values
+    """
+    numpy = _numpy()
+    values = numpy.asarray(values, dtype=numpy.float64)
+    alpha = 2 / (period + 1) if alpha is None else alpha
+    result = _undefined(numpy, len(values))
+    if len(values) < period:
+        return result
+    result[period - 1] = values[:period].mean()
+    decay = 1 - alpha
+    # Each output is decay ** k * seed + alpha * sum(decay ** (k - i) * x_i), computed over blocks short enough that
+    # decay ** -k stays small, so the closed form loses no more than a few digits
+    block = max(1, int(log(1e-3) / log(decay))) if 0 < decay < 1 else len(values)
+    seed = result[period - 1]
+    for start in range(period, len(values), block):
+        chunk = values[start : start + block]
+        k = numpy.arange(1, len(chunk) + 1)
+        powers = decay**k
+        if decay:
+            result[start : start + len(chunk)] = powers * (seed + alpha * numpy.cumsum(chunk / powers))
+        else:
+            result[start : start + len(chunk)] = chunk
+        seed = result[start + len(chunk) - 1]
+    return result
+
+
+def rolling_std(values, period: int, ddof: int = 0):
+    """
+    Vectorized RollingStd, NaN for the first period - 1 values
+    """
+    numpy = _numpy()
+    values = numpy.asarray(values, dtype=numpy.float64)
+    result = _undefined(numpy, len(values))
+    if len(values) >= period:
+        result[period - 1 :] = numpy.lib.stride_tricks.sliding_window_view(values, period).std(axis=1, ddof=ddof)
+    return result
+
+
+def bollinger_bands(values, period: int = 20, width: float = 2.0):
+    """
+    Vectorized BollingerBands, returns (lower, middle, upper) arrays that are NaN for the first period - 1 values
+    """
+    middle = sma(values, period)
+    offset = width * rolling_std(values, period)
+    return middle - offset, middle, middle + offset
+
+
+def atr(highs, lows, closes, period: int = 14):
+    """
+    Vectorized ATR, NaN for the first period - 1 candles
+    """
+    numpy = _numpy()
+    highs = numpy.asarray(highs, dtype=numpy.float64)
+    lows = numpy.asarray(lows, dtype=numpy.float64)
+    closes = numpy.asarray(closes, dtype=numpy.float64)
+    true_range = highs - lows
+    if len(true_range) > 1:
+        previous = closes[:-1]
+        true_range[1:] = numpy.maximum.reduce(
+            [true_range[1:], numpy.abs(highs[1:] - previous), numpy.abs(lows[1:] - previous)]
+        )
+    return ema(true_range, period, alpha=1 / period)
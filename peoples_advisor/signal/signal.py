@@ -1,7 +1,24 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, Tuple
 
-from peoples_advisor.event.event import PriceEvent, SignalEvent
+from peoples_advisor.event.event import BarEvent, PriceEvent, SignalEvent
+
+_numpy = False
+
+
+def optional_numpy():
+    """
+    Get the numpy module, or None if it is not installed
+
+    numpy is optional and slow to import, so it is only imported once a batch strategy first needs it
+    """
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy as _numpy
+        except ImportError:
+            _numpy = None
+    return _numpy
 
 
 class SignalStrategy(ABC):
@@ -9,8 +26,13 @@ class SignalStrategy(ABC):
     The base SignalStrategy class that all user defined signal strategies must inherit.
 
     See peoples_advisor/strategy for an example implementation
+
+    Strategies that work on candles list the granularities they want (e.g. ("M1", "M5")) in granularities, and
+    gen_bar_signal() will be called with every candle as it closes. Their gen_signal() can simply return None.
     """
 
+    granularities: Tuple[str, ...] = ()
+
     def __init__(self):
         """
         Initialize your signal strategy.
@@ -28,3 +50,57 @@ class SignalStrategy(ABC):
         if you wish to act on the price, or None if you do not intend to act on it.
         """
         pass
+
+    def gen_bar_signal(self, bar: BarEvent) -> Optional[SignalEvent]:
+        """
+        gen_bar_signal will be called for every closed candle of the granularities the strategy lists, before the
+        price that closed it, to give you the opportunity to return a SignalEvent.
+        """
+        return
+
+
+class BatchSignalStrategy(SignalStrategy):
+    """
+    A SignalStrategy that works on arrays of prices instead of one PriceEvent at a time.
+
+    When numpy is installed, backtests over binary history files pass every price of an instrument to gen_signals in
+    chunks of chunk_size rows (or all at once if chunk_size is None), in chronological order. Everywhere else, such
+    as live trading, gen_signal calls gen_signals with a single price.
+    """
+
+    BUY = 1
+    SELL = -1
+    chunk_size: Optional[int] = 65536
+
+    @abstractmethod
+    def gen_signals(self, instrument: str, timestamps, bids, asks):
+        """
+        gen_signals will be called with consecutive prices of a single instrument, and must return an array of the
+        same length holding BUY (1), SELL (-1) or 0 for each price.
+
+        Args:
+            instrument (str): Name of the instrument
+            timestamps: int64 epoch nanoseconds of each price
+            bids: float64 bid of each price
+            asks: float64 ask of each price
+        """
+        pass
+
+    def gen_signal(self, price: PriceEvent) -> Optional[SignalEvent]:
+        timestamp = price.timestamp
+        numpy = optional_numpy()
+        if numpy is not None:
+            arrays = (
+                numpy.array([timestamp], dtype=numpy.int64),
+                numpy.array([float(price.bid)]),
+                numpy.array([float(price.ask)]),
+            )
+        else:
+            arrays = ([timestamp], [float(price.bid)], [float(price.ask)])
+        side = self.gen_signals(price.instrument, *arrays)[0]
+        if side == self.BUY:
+            return SignalEvent(price.instrument, timestamp, "BUY")
+        elif side == self.SELL:
+            return SignalEvent(price.instrument, timestamp, "SELL")
+        else:
+            return
@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from peoples_advisor.api.instrument_cache import InstrumentCache
+
+INSTRUMENTS = [
+    {
+        "name": "EUR_USD",
+        "type": "CURRENCY",
+        "displayName": "EUR/USD",
+        "pipLocation": -4,
+        "displayPrecision": 5,
+        "marginRate": "0.02",
+        "tradeUnitsPrecision": 0,
+    },
+    {
+        "name": "USD_JPY",
+        "type": "CURRENCY",
+        "displayName": "USD/JPY",
+        "pipLocation": -2,
+        "displayPrecision": 3,
+        "marginRate": "0.04",
+        "tradeUnitsPrecision": 0,
+    },
+]
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return INSTRUMENTS
+
+
+class TestInstrumentCache:
+    def setup_method(self):
+        self.loader = CountingLoader()
+
+    def test_metadata(self):
+        cache = InstrumentCache(self.loader)
+        assert cache.names() == ["EUR_USD", "USD_JPY"]
+        assert cache.margin_rate("USD_JPY") == Decimal("0.04")
+        assert cache.pip_location("EUR_USD") == -4
+        assert cache.display_precision("USD_JPY") == 3
+        assert "tradeUnitsPrecision" not in cache.instruments()["EUR_USD"]
+        assert self.loader.calls == 1
+
+    def test_ttl(self):
+        cache = InstrumentCache(self.loader, ttl=0)
+        cache.names()
+        cache.names()
+        assert self.loader.calls == 2
+        cache = InstrumentCache(self.loader, ttl=None)
+        cache.names()
+        cache.invalidate()
+        cache.names()
+        assert self.loader.calls == 4
+
+    def test_persisted(self, tmp_path):
+        path = tmp_path / "instruments.json"
+        InstrumentCache(self.loader, path=path, key="account").names()
+        assert InstrumentCache(self.loader, path=path, key="account").names() == ["EUR_USD", "USD_JPY"]
+        assert self.loader.calls == 1
+        InstrumentCache(self.loader, path=path, key="other account").names()
+        assert self.loader.calls == 2
@@ -0,0 +1,65 @@
+from peoples_advisor.api.oanda.oanda_candle_cache import OandaCandleCache
+
+START = 1617235200
+CANDLES = [
+    {"time": f"{START + 5 * i}.000000000", "mid": {"c": f"{1 + i / 100000:.5f}"}, "complete": True} for i in range(40)
+]
+
+
+class FakeApi:
+    datetime_format = "UNIX"
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.calls = []
+
+    def get_instrument_candles(
+        self, instrument, price=None, granularity=None, count=None, from_time=None, to_time=None
+    ):
+        self.calls.append(from_time)
+        candles = [candle for candle in self.candles if float(candle["time"]) >= float(from_time)]
+        return {"instrument": instrument, "granularity": granularity, "candles": candles[:count]}
+
+
+def expected(from_index, count):
+    return CANDLES[from_index : from_index + count]
+
+
+class TestOandaCandleCache:
+    def setup_method(self):
+        self.api = FakeApi(CANDLES)
+
+    def test_repeated_request_is_served_from_disk(self, tmp_path):
+        with OandaCandleCache(self.api, tmp_path / "candles.sqlite3") as cache:
+            assert cache.get_instrument_candles("EUR_USD", count=10, from_time=str(START))["candles"] == expected(0, 10)
+            candles = cache.get_instrument_candles("EUR_USD", count=5, from_time=str(START + 10))["candles"]
+            assert candles == expected(2, 5)
+        assert len(self.api.calls) == 1
+        # The cache outlives the process that filled it
+        with OandaCandleCache(self.api, tmp_path / "candles.sqlite3") as cache:
+            assert cache.get_instrument_candles("EUR_USD", count=9, from_time=str(START))["candles"] == expected(0, 9)
+        assert len(self.api.calls) == 1
+
+    def test_only_missing_candles_are_fetched(self, tmp_path):
+        with OandaCandleCache(self.api, tmp_path / "candles.sqlite3") as cache:
+            cache.get_instrument_candles("EUR_USD", count=10, from_time=str(START))
+            assert cache.get_instrument_candles("EUR_USD", count=20, from_time=str(START))["candles"] == expected(0, 20)
+            # The last candle of a fetch is stored but not covered, so fetching resumes from it
+            assert self.api.calls[-1] == CANDLES[8]["time"]
+            assert cache.coverage("EUR_USD") == [(START, START + 5 * 27)]
+
+    def test_incomplete_candles_are_not_stored(self, tmp_path):
+        self.api.candles = CANDLES[:5] + [dict(CANDLES[5], complete=False)]
+        with OandaCandleCache(self.api, tmp_path / "candles.sqlite3") as cache:
+            candles = cache.get_instrument_candles("EUR_USD", count=10, from_time=str(START))["candles"]
+            assert candles[-1]["complete"] is False
+            self.api.candles = CANDLES
+            assert cache.get_instrument_candles("EUR_USD", count=10, from_time=str(START))["candles"] == expected(0, 10)
+        assert len(self.api.calls) == 2
+
+    def test_components_are_cached_separately(self, tmp_path):
+        with OandaCandleCache(self.api, tmp_path / "candles.sqlite3") as cache:
+            cache.get_instrument_candles("EUR_USD", count=10, from_time=str(START))
+            cache.get_instrument_candles("EUR_USD", price="BA", count=10, from_time=str(START))
+            cache.get_instrument_candles("GBP_USD", count=10, from_time=str(START))
+        assert len(self.api.calls) == 3
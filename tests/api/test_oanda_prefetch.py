@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from peoples_advisor.api.oanda.oanda_api import OandaApi
+from peoples_advisor.api.oanda.oanda_prefetch import CandlePrefetcher
+
+ACCOUNT_ID = "101-001-0000000-001"
+START = 1617235200
+CANDLES = {
+    instrument: [
+        {"time": f"{START + 5 * i}.000000000", "mid": {"c": f"{1 + offset + i / 100000:.5f}"}, "complete": True}
+        for i in range(23)
+    ]
+    for offset, instrument in enumerate(["EUR_USD", "GBP_USD", "USD_JPY"])
+}
+
+
+class FakeOandaHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: value[0] for key, value in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.requests.append(time.monotonic())
+        try:
+            time.sleep(server.latency)
+            if parts == ["v3", "accounts"]:
+                self.respond({"accounts": [{"id": ACCOUNT_ID}]})
+            elif len(parts) == 6 and parts[4] in CANDLES and parts[5] == "candles":
+                from_time = float(params.get("from", START))
+                count = int(params.get("count", 500))
+                candles = [candle for candle in CANDLES[parts[4]] if float(candle["time"]) >= from_time]
+                self.respond({"instrument": parts[4], "granularity": "S5", "candles": candles[:count]})
+            else:
+                self.respond({"errorMessage": f"Unknown endpoint {url.path}"}, 404)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def respond(self, body, status=200):
+        body = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def expected_pages(instrument, count):
+    # Each page after the first starts with the last candle of the previous page
+    candles = CANDLES[instrument]
+    pages, index = [], 0
+    while True:
+        page = candles[index : index + count]
+        pages.append(page)
+        if len(page) < count:
+            return pages
+        index += count - 1
+
+
+class TestCandlePrefetcher:
+    @classmethod
+    def setup_class(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOandaHandler)
+        cls.server.lock = threading.Lock()
+        cls.server.latency = 0.05
+        cls.server.in_flight = 0
+        cls.server.max_in_flight = 0
+        cls.server.requests = []
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{cls.server.server_port}"
+        cls.api = OandaApi("token", datetime_format="UNIX", url=url, stream_url=url)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setup_method(self):
+        self.server.max_in_flight = 0
+        self.server.requests = []
+
+    def test_pages_match_sequential_paging(self):
+        with CandlePrefetcher(self.api, list(CANDLES), str(START), count=5, max_in_flight=3) as prefetcher:
+            for instrument in CANDLES:
+                assert list(prefetcher.pages(instrument)) == expected_pages(instrument, 5)
+        assert 1 < self.server.max_in_flight <= 3
+
+    def test_past_end_stops_paging(self):
+        end = START + 5 * 7
+        prefetcher = CandlePrefetcher(self.api, ["EUR_USD"], str(START), is_past_end=lambda t: float(t) >= end, count=5)
+        with prefetcher:
+            assert list(prefetcher.pages("EUR_USD")) == expected_pages("EUR_USD", 5)[:2]
+
+    def test_rate_limit(self):
+        with CandlePrefetcher(self.api, list(CANDLES), str(START), count=5, rate_limit=20) as prefetcher:
+            for instrument in CANDLES:
+                list(prefetcher.pages(instrument))
+        requests = self.server.requests
+        assert requests[-1] - requests[0] >= 0.9 * (len(requests) - 1) / 20
+
+    def test_candles_in_range(self):
+        from_time, to_time = f"{START + 5}.000000000", f"{START + 5 * 20}.000000000"
+        candles = list(self.api.get_instrument_candles_in_range("GBP_USD", from_time, to_time, granularity="S5"))
+        assert candles == [c for c in CANDLES["GBP_USD"] if START + 5 <= float(c["time"]) < START + 100]
@@ -0,0 +1,154 @@
+import itertools
+import time
+
+import pytest
+from peoples_advisor.api.oanda.oanda_api import LimitOrderRequest, MarketOrderRequest, OandaApi, OandaError
+from peoples_advisor.api.oanda.oanda_server import ACCOUNT_ID, format_time
+from peoples_advisor.common.timestamps import NS_PER_SECOND
+
+START = 1617235200
+
+
+class TestOandaStandInServer:
+    def test_accounts_and_instruments(self, oanda_api):
+        assert oanda_api.account_id == ACCOUNT_ID
+        assert oanda_api.get_account_summary()["account"]["currency"] == "USD"
+        instruments = oanda_api.get_account_instruments(["EUR_USD", "USD_JPY"])["instruments"]
+        assert [(i["name"], i["pipLocation"], i["displayPrecision"]) for i in instruments] == [
+            ("EUR_USD", -4, 5),
+            ("USD_JPY", -2, 3),
+        ]
+
+    def test_unauthorized(self, oanda_server):
+        with pytest.raises(OandaError, match="401"):
+            OandaApi("wrong", url=oanda_server.url, stream_url=oanda_server.url)
+
+    def test_candles_are_aligned_and_repeatable(self, oanda_api):
+        candles = oanda_api.get_instrument_candles("EUR_USD", "BA", "M1", count=3, from_time=f"{START + 30}")
+        assert [candle["time"] for candle in candles["candles"]] == [f"{START + 60 * i}.000000000" for i in range(3)]
+        assert all(candle["complete"] and candle["bid"]["c"] < candle["ask"]["c"] for candle in candles["candles"])
+        assert oanda_api.get_instrument_candles("EUR_USD", "BA", "M1", count=3, from_time=f"{START + 30}") == candles
+
+    def test_candles_in_range_pages(self, oanda_api, oanda_server):
+        candles = list(
+            oanda_api.get_instrument_candles_in_range("GBP_USD", f"{START}", f"{START + 86400}", granularity="S5")
+        )
+        # 500 candles a page, each page after the first starting with the last candle of the one before
+        times = [float(candle["time"]) for candle in candles]
+        assert sorted(set(times)) == [START + 5 * i for i in range(86400 // 5)]
+        pages = sum(path.endswith("/candles") for _, path in oanda_server.requests)
+        assert len(times) == 86400 // 5 + pages - 1
+
+    def test_candles_rfc3339(self, oanda_server):
+        api = oanda_server.api()
+        candles = api.get_instrument_candles("USD_JPY", granularity="H1", from_time="2021-04-01T00:00:00.000000000Z")
+        assert candles["candles"][0]["time"] == "2021-04-01T00:00:00.000000000Z"
+        assert format_time(START * NS_PER_SECOND + 5, "RFC3339") == "2021-04-01T00:00:00.000000005Z"
+
+    def test_candle_errors(self, oanda_api):
+        with pytest.raises(OandaError, match="400"):
+            oanda_api.get_instrument_candles("EUR_XYZ")
+        with pytest.raises(OandaError, match="count"):
+            oanda_api.get_instrument_candles("EUR_USD", count=5001)
+
+    def test_pricing_agrees_with_stream(self, oanda_api, oanda_server):
+        oanda_server.ticks_per_second = 1000
+        records = list(itertools.islice(oanda_api.pricing_records(["EUR_USD", "USD_JPY"]), 10))
+        assert [record.instrument for record in records] == ["EUR_USD", "USD_JPY"] * 5
+        for record in records:
+            expected = oanda_server.price(record.instrument, oanda_api.oanda_time_to_ns(record.time), "UNIX")
+            assert (record.bid, record.ask) == (expected["bids"][0]["price"], expected["asks"][0]["price"])
+        prices = oanda_api.get_instrument_pricing(["EUR_USD"], since=records[-1].time)["prices"]
+        assert prices[0]["instrument"] == "EUR_USD"
+
+    def test_stream_rate_and_heartbeats(self, oanda_api, oanda_server):
+        oanda_server.ticks_per_second = 50
+        stream = oanda_api.session.request(
+            "get",
+            f"{oanda_server.url}/v3/accounts/{ACCOUNT_ID}/pricing/stream",
+            "pricing/stream",
+            params={"instruments": "EUR_USD"},
+            stream=True,
+        )
+        start = time.monotonic()
+        lines = list(itertools.islice(stream.iter_lines(), 30))
+        elapsed = time.monotonic() - start
+        stream.close()
+        assert sum(line.startswith(b'{"type":"HEARTBEAT"') for line in lines) >= 2
+        prices = sum(line.startswith(b'{"type":"PRICE"') for line in lines)
+        assert prices / elapsed < 50 * 1.5
+
+    def test_stream_disconnect(self, oanda_api, oanda_server):
+        oanda_server.stream_disconnect_after = 5
+        received = []
+        with pytest.raises(Exception):
+            for record in oanda_api.pricing_records(["EUR_USD"]):
+                received.append(record)
+        assert len(received) == 5
+
+    def test_orders_and_transactions(self, oanda_api, oanda_server):
+        filled = oanda_api.create_order(MarketOrderRequest("EUR_USD", 100))
+        assert filled["orderFillTransaction"]["tradeOpened"]["units"] == "100"
+        assert oanda_api.get_open_trades()["trades"][0]["instrument"] == "EUR_USD"
+        created = oanda_api.create_order(LimitOrderRequest("EUR_USD", -100, 1.5))
+        order_id = created["orderCreateTransaction"]["id"]
+        assert oanda_api.get_order_details(order_id)["order"]["state"] == "PENDING"
+        assert [order["id"] for order in oanda_api.get_pending_orders()["orders"]] == [order_id]
+        oanda_api.cancel_order(order_id)
+        assert oanda_api.get_pending_orders()["orders"] == []
+        with pytest.raises(OandaError, match="404"):
+            oanda_api.cancel_order(order_id)
+        types = [t["type"] for t in oanda_api.get_transactions_in_range(1, 100)["transactions"]]
+        assert types == ["CREATE", "MARKET_ORDER", "ORDER_FILL", "LIMIT_ORDER", "ORDER_CANCEL"]
+        assert oanda_api.get_transactions(page_size=2)["count"] == 5
+        assert len(oanda_api.get_transactions_since_id(3, ["ORDER_CANCEL"])["transactions"]) == 1
+        assert oanda_api.get_transaction_details(2)["transaction"]["type"] == "MARKET_ORDER"
+
+    def test_metrics_are_kept_per_endpoint(self, oanda_api, oanda_server):
+        order_ids = [
+            oanda_api.create_order(LimitOrderRequest("EUR_USD", -100, 1.5 + i / 10))["orderCreateTransaction"]["id"]
+            for i in range(3)
+        ]
+        for order_id in order_ids:
+            oanda_api.cancel_order(order_id)
+        summary = oanda_api.metrics.summary()
+        assert summary["PUT accounts/{accountID}/orders/{orderSpecifier}/cancel"]["count"] == 3
+        assert not any(order_id in key or ACCOUNT_ID in key for key in summary for order_id in order_ids)
+        assert [path for _, path in oanda_server.requests if path.endswith("/cancel")] == [
+            f"/v3/accounts/{ACCOUNT_ID}/orders/{order_id}/cancel" for order_id in order_ids
+        ]
+
+    def test_replace_order(self, oanda_api):
+        order_id = oanda_api.create_order(LimitOrderRequest("EUR_USD", -100, 1.5))["orderCreateTransaction"]["id"]
+        # An invalid replacement is rejected and the original order stays pending
+        with pytest.raises(OandaError, match="400"):
+            oanda_api.replace_order(order_id, LimitOrderRequest("EUR_USD", 0, 1.6))
+        assert oanda_api.get_order_details(order_id)["order"]["state"] == "PENDING"
+        replaced = oanda_api.replace_order(order_id, LimitOrderRequest("EUR_USD", -100, 1.6))
+        assert replaced["orderCancelTransaction"]["orderID"] == order_id
+        new_id = replaced["orderCreateTransaction"]["id"]
+        assert [order["id"] for order in oanda_api.get_pending_orders()["orders"]] == [new_id]
+        assert oanda_api.get_order_details(order_id)["order"]["state"] == "CANCELLED"
+
+    def test_rejected_order(self, oanda_api):
+        with pytest.raises(OandaError, match="400"):
+            oanda_api.create_order(MarketOrderRequest("EUR_USD", 0))
+
+    def test_injected_errors_are_retried(self, oanda_api, oanda_server):
+        oanda_server.fail_next(503, times=2)
+        assert oanda_api.get_account_summary()["account"]["id"] == ACCOUNT_ID
+        assert oanda_api.metrics.summary()["GET accounts/{accountID}/summary"]["retries"] == 2
+        oanda_server.fail_next(400, message="Bad")
+        with pytest.raises(OandaError, match="Bad"):
+            oanda_api.get_account_summary()
+
+    def test_error_rate(self, oanda_api, oanda_server):
+        oanda_server.error_rate = 1
+        with pytest.raises(OandaError, match="503"):
+            oanda_api.get_account_summary()
+
+    def test_latency(self, oanda_api, oanda_server):
+        oanda_server.latency = 0.05
+        start = time.perf_counter()
+        oanda_api.get_account_summary()
+        assert time.perf_counter() - start >= 0.05
@@ -0,0 +1,79 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from peoples_advisor.api.oanda.oanda_session import OandaSession
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.respond()
+
+    def do_POST(self):
+        self.respond()
+
+    def respond(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        with server.lock:
+            server.headers.append(dict(self.headers))
+            server.ports.add(self.client_address[1])
+            status = server.statuses.pop(0) if server.statuses else 200
+        body = json.dumps({"status": status}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestOandaSession:
+    @classmethod
+    def setup_class(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedHandler)
+        cls.server.lock = threading.Lock()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/v3/accounts"
+
+    @classmethod
+    def teardown_class(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setup_method(self):
+        self.server.statuses = []
+        self.server.headers = []
+        self.server.ports = set()
+        self.session = OandaSession("token", "UNIX", backoff_factor=0.001)
+
+    def teardown_method(self):
+        self.session.close()
+
+    def test_keep_alive_and_headers(self):
+        for _ in range(5):
+            assert self.session.request("get", self.url, "accounts").status_code == 200
+        assert len(self.server.ports) == 1
+        assert self.server.headers[0]["Authorization"] == "Bearer token"
+        assert self.server.headers[0]["Accept-Datetime-Format"] == "UNIX"
+
+    def test_retries_get_on_server_error(self):
+        self.server.statuses = [503, 429]
+        assert self.session.request("get", self.url, "accounts").status_code == 200
+        stats = self.session.metrics.summary()["GET accounts"]
+        assert stats["count"] == 1 and stats["retries"] == 2 and stats["errors"] == 0
+
+    @pytest.mark.parametrize("status, expected", [(503, 503), (429, 200)])
+    def test_post_only_retries_rate_limits(self, status, expected):
+        self.server.statuses = [status]
+        assert self.session.request("post", self.url, "orders", json={}).status_code == expected
+
+    def test_gives_up_after_max_retries(self):
+        self.server.statuses = [500] * 10
+        assert self.session.request("get", self.url, "accounts").status_code == 500
+        assert self.session.metrics.summary()["GET accounts"]["retries"] == self.session.max_retries
@@ -0,0 +1,47 @@
+import json
+
+from peoples_advisor.api.oanda.oanda_stream import PriceRecord, PricingStreamDecoder
+
+PRICE = {
+    "type": "PRICE",
+    "time": "2021-04-01T12:00:00.123456789Z",
+    "bids": [{"price": "1.17501", "liquidity": 1000000}, {"price": "1.17500", "liquidity": 5000000}],
+    "asks": [{"price": "1.17512", "liquidity": 1000000}, {"price": "1.17513", "liquidity": 5000000}],
+    "closeoutBid": "1.17496",
+    "closeoutAsk": "1.17517",
+    "status": "tradeable",
+    "tradeable": True,
+    "instrument": "EUR_USD",
+}
+RECORD = PriceRecord("EUR_USD", "2021-04-01T12:00:00.123456789Z", "1.17501", "1.17512")
+
+
+def line(message, **kwargs):
+    return json.dumps(message, separators=(",", ":"), **kwargs).encode()
+
+
+class TestPricingStreamDecoder:
+    def test_oanda_layout(self):
+        for decoder in (
+            PricingStreamDecoder(),
+            PricingStreamDecoder(scan=False),
+            PricingStreamDecoder(loads=json.loads),
+        ):
+            assert decoder.decode(line(PRICE)) == RECORD
+
+    def test_skipped_lines(self):
+        decoder = PricingStreamDecoder()
+        assert decoder.decode(line({"type": "HEARTBEAT", "time": "2021-04-01T12:00:05.000000000Z"})) is None
+        assert decoder.decode(line({**PRICE, "status": "non-tradeable", "tradeable": False})) is None
+        assert decoder.decode(b"") is None
+
+    def test_other_layouts_are_parsed(self):
+        decoder = PricingStreamDecoder()
+        reordered = {"instrument": "EUR_USD", **{key: value for key, value in PRICE.items() if key != "instrument"}}
+        assert decoder.decode(line(reordered)) == RECORD
+        assert decoder.decode(json.dumps(PRICE).encode()) == RECORD
+
+    def test_decode_lines(self):
+        lines = [line(PRICE), line({"type": "HEARTBEAT", "time": "x"}), line({**PRICE, "instrument": "GBP_USD"})]
+        records = list(PricingStreamDecoder().decode_lines(lines))
+        assert [record.instrument for record in records] == ["EUR_USD", "GBP_USD"]
@@ -0,0 +1,69 @@
+import itertools
+import threading
+import time
+
+import pytest
+from peoples_advisor.api.oanda.oanda_api import OandaError
+from peoples_advisor.api.oanda.oanda_supervisor import SupervisedPricingStream
+
+INSTRUMENTS = ["EUR_USD", "USD_JPY"]
+
+
+def assert_in_time_order(records):
+    for instrument in INSTRUMENTS:
+        times = [record.time for record in records if record.instrument == instrument]
+        assert times == sorted(set(times))
+
+
+class TestSupervisedPricingStream:
+    def test_steady_stream(self, oanda_api):
+        stream = SupervisedPricingStream(oanda_api, INSTRUMENTS)
+        records = list(itertools.islice(stream, 20))
+        assert [record.instrument for record in records] == INSTRUMENTS * 10
+        assert (stream.reconnects, stream.backfilled) == (0, 0)
+
+    def test_reconnects_and_backfills_after_disconnect(self, oanda_api, oanda_server):
+        oanda_server.stream_disconnect_after = 5
+        stream = SupervisedPricingStream(oanda_api, INSTRUMENTS, backoff=0.01)
+        records = list(itertools.islice(stream, 20))
+        assert stream.reconnects >= 3
+        assert stream.backfilled >= 3
+        assert oanda_server.connections == stream.reconnects + 1
+        assert stream.last_error is not None
+        assert_in_time_order(records)
+
+    def test_watchdog_reconnects_stalled_stream(self, oanda_api, oanda_server):
+        oanda_server.stream_stall_after = 4
+        stream = SupervisedPricingStream(oanda_api, INSTRUMENTS, heartbeat_timeout=0.2, backoff=0.01)
+        start = time.monotonic()
+        records = list(itertools.islice(stream, 10))
+        assert stream.reconnects >= 2
+        assert time.monotonic() - start < 5
+        assert_in_time_order(records)
+
+    def test_heartbeats_keep_a_quiet_stream_open(self, oanda_api, oanda_server):
+        oanda_server.ticks_per_second = 4
+        oanda_server.heartbeat_interval = 0.05
+        stream = SupervisedPricingStream(oanda_api, INSTRUMENTS, heartbeat_timeout=0.2)
+        list(itertools.islice(stream, 4))
+        assert stream.reconnects == 0
+
+    def test_unretryable_error_raises(self, oanda_api, oanda_server):
+        oanda_server.fail_next(400, message="Invalid instrument")
+        with pytest.raises(OandaError, match="Invalid instrument"):
+            next(iter(SupervisedPricingStream(oanda_api, INSTRUMENTS)))
+
+    def test_gives_up_after_max_reconnects(self, oanda_api, oanda_server):
+        oanda_server.error_rate = 1
+        stream = SupervisedPricingStream(oanda_api, INSTRUMENTS, backoff=0.01, max_reconnects=2)
+        with pytest.raises(OandaError) as error:
+            next(iter(stream))
+        assert error.value.status == 503
+
+    def test_stop_while_waiting_to_reconnect(self, oanda_api, oanda_server):
+        oanda_server.error_rate = 1
+        stream = SupervisedPricingStream(oanda_api, INSTRUMENTS, backoff=30)
+        threading.Timer(0.2, stream.close).start()
+        start = time.monotonic()
+        assert list(stream) == []
+        assert time.monotonic() - start < 5
@@ -0,0 +1,105 @@
+import random
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from peoples_advisor.backtest.common.broker import SimulatedBroker
+from peoples_advisor.common.common import PAError
+from peoples_advisor.common.fixed_price import FixedPrice
+from peoples_advisor.event.event import PriceEvent
+from peoples_advisor.order.forex.common.common import (
+    LimitOrder,
+    MarketIfTouchedOrder,
+    MarketOrder,
+    StopLossOrder,
+    StopOrder,
+    TakeProfitOrder,
+)
+
+TIME = datetime(2021, 4, 1, 12)
+ORDER_CLASSES = [LimitOrder, StopOrder, TakeProfitOrder, StopLossOrder, MarketIfTouchedOrder]
+
+
+def tick(bid, ask, instrument="EUR_USD"):
+    return PriceEvent(instrument, TIME, FixedPrice(bid, 5), FixedPrice(ask, 5))
+
+
+class RecordingPortfolio:
+    def __init__(self):
+        self.prices, self.positions = [], []
+
+    def update_price(self, price):
+        self.prices.append(price)
+
+    def add_position(self, instrument, units, price):
+        self.positions.append((instrument, units, price))
+
+
+class TestSimulatedBroker:
+    def test_limit_and_stop(self):
+        broker = SimulatedBroker()
+        buy_limit = broker.submit(LimitOrder("EUR_USD", 100, Decimal("1.17400")))
+        sell_stop = broker.submit(StopOrder("EUR_USD", -100, Decimal("1.17300")))
+        buy_stop = broker.submit(StopOrder("EUR_USD", 50, Decimal("1.17600")))
+        assert broker.update_price(tick(117450, 117460)) == []
+        (fill,) = broker.update_price(tick(117390, 117400))
+        assert (fill.order_id, fill.price, fill.time) == (buy_limit, FixedPrice(117400, 5), TIME)
+        # A gap through both triggers fills at the market, not at the trigger price
+        fills = broker.update_price(tick(117200, 117700))
+        assert [(fill.order_id, fill.price) for fill in fills] == [
+            (sell_stop, FixedPrice(117200, 5)),
+            (buy_stop, FixedPrice(117700, 5)),
+        ]
+        assert broker.orders == {}
+
+    def test_market_orders_and_portfolio(self):
+        portfolio = RecordingPortfolio()
+        broker = SimulatedBroker(portfolio)
+        broker.submit(MarketOrder("EUR_USD", -25))
+        assert broker.update_price(tick(110000, 110010, "USD_JPY")) == []
+        (fill,) = broker.update_price(tick(117450, 117460))
+        assert fill.price == FixedPrice(117450, 5)
+        assert portfolio.positions == [("EUR_USD", Decimal(-25), Decimal("1.17450"))]
+        assert len(portfolio.prices) == 2
+        with pytest.raises(PAError):
+            broker.submit(MarketOrder("EUR_USD", 0))
+
+    def test_lazy_cancel(self):
+        broker = SimulatedBroker()
+        ids = [broker.submit(LimitOrder("EUR_USD", 10, Decimal("1.17") + Decimal(i) / 100000)) for i in range(3000)]
+        kept = ids[::3]
+        for order_id in set(ids) - set(kept):
+            assert broker.cancel(order_id) is not None
+        assert broker.cancel(ids[1]) is None
+        # Once most of the ladder is cancelled it is swept
+        assert sum(len(ladder) for ladder in broker._ladders["EUR_USD"]) < 3000
+        fills = broker.update_price(tick(117000, 117100))
+        assert [fill.order_id for fill in fills] == [
+            order_id for i, order_id in zip(range(0, 3000, 3), kept) if i >= 100
+        ]
+
+    def test_matches_trigger(self):
+        rng = random.Random(17)
+        broker = SimulatedBroker()
+        pending = {}
+        mid = 117500
+        for step in range(3000):
+            for _ in range(rng.randrange(3)):
+                units = rng.choice([-1, 1]) * rng.randrange(1, 1000)
+                order_class = rng.choice(ORDER_CLASSES)
+                order = order_class("EUR_USD", units, Decimal(mid + rng.randrange(-300, 300)) / 100000)
+                pending[broker.submit(order)] = order
+            if pending and rng.random() < 0.2:
+                order_id = rng.choice(list(pending))
+                assert broker.cancel(order_id) is pending.pop(order_id)
+            mid += rng.randrange(-40, 41)
+            price = tick(mid, mid + rng.randrange(5, 20))
+            expected = sorted(
+                order_id
+                for order_id, order in pending.items()
+                if order.trigger((price.ask if order.units > 0 else price.bid).decimal)
+            )
+            assert [fill.order_id for fill in broker.update_price(price)] == expected
+            for order_id in expected:
+                del pending[order_id]
+        assert broker.orders == pending
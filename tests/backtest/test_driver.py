@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from peoples_advisor.backtest.common.common import BacktestDriver
+from peoples_advisor.backtest.common.history import HistoryReader, HistoryWriter
+from peoples_advisor.event.event import OrderEvent, PriceEvent, QuoteEvent, SignalEvent, StopEvent
+from peoples_advisor.signal.signal import BatchSignalStrategy, SignalStrategy, optional_numpy
+from peoples_advisor.sizing.sizing import SizingStrategy
+
+
+class EverySecondPrice(SignalStrategy):
+    def __init__(self):
+        super().__init__()
+        self.prices = []
+
+    def gen_signal(self, price):
+        self.prices.append(price)
+        if len(self.prices) % 2 == 0:
+            return SignalEvent(price.instrument, price.time, "BUY")
+
+
+class OneUnit(SizingStrategy):
+    def gen_order(self, signal):
+        return OrderEvent(signal.instrument, signal.time, Decimal(1), None)
+
+
+class RecordingSizing(SizingStrategy):
+    def __init__(self):
+        super().__init__()
+        self.signals = []
+
+    def gen_order(self, signal):
+        self.signals.append((signal.instrument, signal.time, signal.side))
+
+
+class Threshold(BatchSignalStrategy):
+    chunk_size = 7
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def gen_signals(self, instrument, timestamps, bids, asks):
+        self.calls += 1
+        return [self.BUY if bid > 1.1003 else self.SELL if ask < 1.1002 else 0 for bid, ask in zip(bids, asks)]
+
+
+class Failing(BatchSignalStrategy):
+    def gen_signals(self, instrument, timestamps, bids, asks):
+        raise RuntimeError("gen_signals failed")
+
+
+class EveryBar(SignalStrategy):
+    granularities = ("M1",)
+
+    def gen_signal(self, price):
+        return
+
+    def gen_bar_signal(self, bar):
+        return SignalEvent(bar.instrument, bar.time, "BUY" if bar.close > bar.open else "SELL")
+
+
+class RecordingPortfolio:
+    def __init__(self):
+        self.prices = []
+
+    def update_price(self, price):
+        self.prices.append(price)
+
+
+class TestBacktestDriver:
+    def test_run(self):
+        time = datetime(2021, 4, 1, 12)
+        prices = [PriceEvent("EUR_USD", time, Decimal("1.1"), Decimal("1.2")) for _ in range(5)]
+        quote = QuoteEvent("USD_JPY", time, Decimal("110.1"), Decimal("110.2"))
+        events = prices[:3] + [quote] + prices[3:] + [StopEvent(), prices[0]]
+        sig_strategy, portfolio = EverySecondPrice(), RecordingPortfolio()
+        driver = BacktestDriver(sig_strategy, OneUnit(), portfolio)
+        assert sum(driver.run(events)) == 6
+        assert sig_strategy.prices == prices
+        assert portfolio.prices == prices[:3] + [quote] + prices[3:]
+        assert driver.signals == 2 and driver.orders == 2
+        assert driver.order_events == []
+        driver = BacktestDriver(EverySecondPrice(), OneUnit(), keep_orders=True)
+        assert sum(driver.run(events)) == 6
+        assert driver.orders == 2 and [order.time for order in driver.order_events] == [time, time]
+
+    def test_batch_strategy(self, tmp_path):
+        start = datetime(2021, 4, 1, 12)
+        with HistoryWriter(tmp_path / "sample.hist") as writer:
+            for i in range(40):
+                time = start + timedelta(seconds=5 * (i // 2))
+                bid = Decimal(110000 + i % 7).scaleb(-5)
+                writer.write(PriceEvent("EUR_USD" if i % 2 else "GBP_USD", time, bid, bid + Decimal("0.00005")))
+                writer.write(QuoteEvent("USD_JPY", time, Decimal("110.101"), Decimal("110.112")))
+        with HistoryReader(tmp_path / "sample.hist") as reader:
+            per_event = RecordingSizing()
+            assert sum(BacktestDriver(Threshold(), per_event).run(list(reader))) == 80
+            batched, strategy = RecordingSizing(), Threshold()
+            assert sum(BacktestDriver(strategy, batched).run(reader)) == 80
+        assert per_event.signals == batched.signals
+        assert len(batched.signals) > 0
+        if optional_numpy() is None:
+            pytest.skip("numpy is not installed, so the batch path fell back to gen_signal")
+        # 12 chunks of 7 rows, each with prices of both instruments except the last, which has one EUR_USD price
+        assert strategy.calls == 2 * 11 + 1
+
+    def test_strategy_errors_propagate(self, tmp_path):
+        with HistoryWriter(tmp_path / "sample.hist") as writer:
+            for i in range(10):
+                writer.write(
+                    PriceEvent("EUR_USD", datetime(2021, 4, 1, 12, 0, i), Decimal("1.10001"), Decimal("1.10006"))
+                )
+        # The error is raised as is, not replaced by closing the history while the batch arrays still map it
+        with pytest.raises(RuntimeError, match="gen_signals failed") as raised:
+            with HistoryReader(tmp_path / "sample.hist") as reader:
+                sum(BacktestDriver(Failing(), RecordingSizing()).run(reader))
+        assert raised.value.__context__ is None
+
+    def test_bar_strategy(self):
+        start = datetime(2021, 4, 1, 12)
+        events = [
+            PriceEvent("EUR_USD", start + timedelta(seconds=20 * i), Decimal(i % 4), Decimal(i % 4)) for i in range(10)
+        ]
+        sizing = RecordingSizing()
+        driver = BacktestDriver(EveryBar(), sizing)
+        assert sum(driver.run(events)) == 10
+        # Three prices per candle, the last price closes the third candle and its own is still open at the end
+        assert sizing.signals == [
+            ("EUR_USD", start, "BUY"),
+            ("EUR_USD", start + timedelta(minutes=1), "SELL"),
+            ("EUR_USD", start + timedelta(minutes=2), "SELL"),
+        ]
@@ -0,0 +1,65 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from peoples_advisor.common.common import PAError
+from peoples_advisor.backtest.common.history import (
+    HistoryReader,
+    HistoryWriter,
+    convert_text_history,
+    history_events,
+    history_length,
+)
+from peoples_advisor.event.event import PriceEvent, QuoteEvent
+
+
+def sample_events():
+    return [
+        PriceEvent("EUR_USD", datetime(2021, 4, 1, 12, 0, 0), Decimal("1.17325"), Decimal("1.17339")),
+        QuoteEvent("USD_JPY", datetime(2021, 4, 1, 12, 0, 0), Decimal("110.605"), Decimal("110.621")),
+        PriceEvent("EUR_USD", datetime(2021, 4, 1, 12, 0, 5), Decimal("1.17330"), Decimal("1.17344")),
+        PriceEvent("EUR_JPY", datetime(2021, 4, 1, 12, 0, 5), Decimal("129.774"), Decimal("129.790")),
+    ]
+
+
+class TestHistory:
+    def test_round_trip(self, tmp_path):
+        events = sample_events()
+        with HistoryWriter(tmp_path / "sample.hist", chunk_size=3) as writer:
+            for event in events:
+                writer.write(event)
+        with HistoryReader(tmp_path / "sample.hist") as reader:
+            assert len(reader) == len(events)
+            assert reader.instruments == ["EUR_USD", "USD_JPY", "EUR_JPY"]
+            assert reader.precisions == [5, 3, 3]
+            assert list(reader.bids) == [117325, 110605, 117330, 129774]
+            assert [repr(event) for event in reader] == [repr(event) for event in events]
+
+    def test_convert_text_history(self, tmp_path):
+        events = sample_events()
+        text_path = tmp_path / "sample.txt"
+        text_path.write_text("".join(repr(event) + "\n" for event in events))
+        binary_path = convert_text_history(text_path)
+        assert binary_path.suffix == ".hist"
+        assert history_length(binary_path) == history_length(text_path) == len(events)
+        assert [repr(event) for event in history_events(binary_path)] == [repr(event) for event in events]
+
+    def test_places_of_the_first_price(self, tmp_path):
+        # The first bid has fewer places than its ask, e.g. a trailing zero dropped
+        events = [
+            PriceEvent("EUR_USD", datetime(2021, 4, 1, 12, 0, 0), Decimal("1.175"), Decimal("1.17512")),
+            PriceEvent("EUR_USD", datetime(2021, 4, 1, 12, 0, 5), Decimal("1.17501"), Decimal("1.1751")),
+        ]
+        with HistoryWriter(tmp_path / "sample.hist") as writer:
+            for event in events:
+                writer.write(event)
+        with HistoryReader(tmp_path / "sample.hist") as reader:
+            assert reader.precisions == [5]
+            assert list(reader.bids) == [117500, 117501]
+            assert list(reader.asks) == [117512, 117510]
+
+    def test_excess_precision(self, tmp_path):
+        with pytest.raises(PAError):
+            with HistoryWriter(tmp_path / "sample.hist", {"EUR_USD": 4}) as writer:
+                writer.write(sample_events()[0])
+        assert not (tmp_path / "sample.hist").exists()
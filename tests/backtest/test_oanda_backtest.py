@@ -0,0 +1,152 @@
+import random
+from datetime import datetime
+from decimal import Decimal
+from functools import partial
+
+import pytest
+
+from peoples_advisor.api.oanda.oanda_prefetch import CandlePrefetcher
+from peoples_advisor.backtest.common.history import history_writer
+from peoples_advisor.backtest.oanda import oanda_backtest
+from peoples_advisor.backtest.oanda.oanda_backtest import OandaBacktestingData
+from peoples_advisor.event.event import PriceEvent, QuoteEvent
+
+START = 1617235200
+END = START + 5 * 400
+PAGE = 7
+INSTRUMENTS = ["EUR_GBP", "EUR_JPY"]
+# The instruments and the quote instruments converting them to USD, in the order they are merged
+ALL_INSTRUMENTS = ["EUR_GBP", "GBP_USD", "EUR_USD", "EUR_JPY", "USD_JPY"]
+
+
+def fake_candles(seed: int = 11):
+    rng = random.Random(seed)
+    candles = {}
+    for instrument in ALL_INSTRUMENTS:
+        places = 3 if "JPY" in instrument else 5
+        base = 130 if "JPY" in instrument else 1.2
+        # GBP_USD runs out of candles early, the others run past the end, with gaps and times shared between them
+        last = START + 5 * (150 if instrument == "GBP_USD" else 450)
+        candles[instrument] = [
+            {
+                "time": f"{time}.000000000",
+                "mid": {"c": f"{base * rng.uniform(0.98, 1.02):.{places}f}"},
+                "complete": True,
+            }
+            for time in range(START, last, 5)
+            if rng.random() < 0.7
+        ]
+    return candles
+
+
+def fake_spreads(seed: int = 5):
+    rng = random.Random(seed)
+    return {
+        instrument: [[START + 60 * i, rng.choice([0.8, 1.4, 2, 3.7, 12.5])] for i in range(0, 40, rng.randint(1, 4))]
+        for instrument in ALL_INSTRUMENTS
+    }
+
+
+class FakeApi:
+    candles = {}
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_instrument_candles(self, instrument, from_time=None, count=500, **params):
+        candles = [candle for candle in self.candles[instrument] if float(candle["time"]) >= float(from_time)]
+        return {"instrument": instrument, "candles": candles[:count]}
+
+
+def sorted_merge(api, spreads, filepath, end: float):
+    # The merge as it was before the heap of cursors, sorting every instrument's next candle for each event
+    start = START
+    prices, pointers = {}, {}
+    for instrument in ALL_INSTRUMENTS:
+        candles = api.get_instrument_candles(instrument, from_time=str(start), count=PAGE)["candles"]
+        if len(candles) > 0:
+            prices[instrument] = candles
+            pointers[instrument] = {"price": 0, "spread": 0}
+    with history_writer(filepath) as f:
+        while len(prices.keys()) > 0:
+            earliest = []
+            rem_list = []
+            for inst in prices:
+                if pointers[inst]["price"] < len(prices[inst]):
+                    cur_price_time = float(prices[inst][pointers[inst]["price"]]["time"])
+                    if cur_price_time < end:
+                        earliest.append((cur_price_time, inst))
+                    else:
+                        rem_list.append(inst)
+                else:
+                    candles = api.get_instrument_candles(inst, from_time=prices[inst][-1]["time"], count=PAGE)
+                    candles = candles["candles"]
+                    if len(candles) > 1 and float(candles[0]["time"]) < end:
+                        earliest.append((float(candles[0]["time"]), inst))
+                        prices[inst] = candles
+                        pointers[inst]["price"] = 0
+                    else:
+                        rem_list.append(inst)
+            for inst in rem_list:
+                prices.pop(inst)
+                pointers.pop(inst)
+            earliest.sort(key=lambda x: x[0])
+            if len(earliest) > 0:
+                next_time, next_inst = earliest[0]
+                while (
+                    pointers[next_inst]["spread"] + 1 < len(spreads[next_inst])
+                    and spreads[next_inst][pointers[next_inst]["spread"]][0] < next_time
+                ):
+                    pointers[next_inst]["spread"] += 1
+                price_str = prices[next_inst][pointers[next_inst]["price"]]["mid"]["c"]
+                pip_spread = Decimal(spreads[next_inst][pointers[next_inst]["spread"]][1]) / Decimal(2)
+                place = len(price_str.split(".")[1]) - 1
+                price = Decimal(price_str)
+                spread = pip_spread * (Decimal("10") ** -place)
+                event_type = PriceEvent if next_inst in INSTRUMENTS else QuoteEvent
+                f.write(
+                    event_type(
+                        next_inst,
+                        datetime.fromtimestamp(next_time),
+                        (price - spread).quantize(Decimal("10") ** (-1 - place)),
+                        (price + spread).quantize(Decimal("10") ** (-1 - place)),
+                    )
+                )
+                pointers[next_inst]["price"] += 1
+
+
+class TestOandaBacktestingData:
+    @pytest.fixture
+    def fake_oanda(self, monkeypatch):
+        candles, spreads = fake_candles(), fake_spreads()
+        monkeypatch.setattr(FakeApi, "candles", candles)
+        monkeypatch.setattr(oanda_backtest, "OandaApi", FakeApi)
+        monkeypatch.setattr(oanda_backtest, "get_historical_spreads", lambda instrument, since: spreads[instrument])
+        monkeypatch.setattr(oanda_backtest, "extend_instrument_list", lambda instruments, currency: ALL_INSTRUMENTS)
+        # Small pages, so every instrument is paged many times
+        monkeypatch.setattr(oanda_backtest, "CandlePrefetcher", partial(CandlePrefetcher, count=PAGE))
+        return spreads
+
+    def test_merge_matches_sorted_merge(self, fake_oanda, tmp_path):
+        data = OandaBacktestingData(
+            "token",
+            INSTRUMENTS,
+            "USD",
+            datetime.fromtimestamp(START),
+            datetime.fromtimestamp(END),
+            granularity="S5",
+            filename="merged.txt",
+            cache=False,
+        )
+        data.filepath = tmp_path / "merged.txt"
+        events = sum(1 for _ in data.gen())
+        sorted_merge(FakeApi(), fake_oanda, tmp_path / "sorted.txt", END)
+        merged = (tmp_path / "merged.txt").read_bytes()
+        assert merged == (tmp_path / "sorted.txt").read_bytes()
+        lines = merged.decode().splitlines()
+        assert len(lines) == events
+        # The cases the merge has to get right are all there: ties, quotes, and an instrument running out early
+        times = [line.split(",")[2] for line in lines]
+        assert len(set(times)) < len(times)
+        assert {line.split(",")[0] for line in lines} == {"PRICE", "QUOTE"}
+        assert max(int(t) for line, t in zip(lines, times) if ",GBP_USD," in line) < END - 5 * 200
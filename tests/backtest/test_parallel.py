@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal, localcontext
+
+import pytest
+
+from peoples_advisor.backtest.common.history import HistoryWriter, TextHistoryWriter
+from peoples_advisor.backtest.common.parallel import run_backtests
+from peoples_advisor.event.event import OrderEvent, PriceEvent, QuoteEvent
+from peoples_advisor.signal.signal import BatchSignalStrategy
+from peoples_advisor.sizing.sizing import SizingStrategy
+from peoples_advisor.strategy import example_strategy
+
+
+def sample_events(count):
+    start = datetime(2021, 4, 1, 12)
+    events = []
+    for i in range(count):
+        time = start + timedelta(seconds=5 * i)
+        events.append(PriceEvent("EUR_USD", time, Decimal("1.17325"), Decimal("1.17339")))
+        events.append(QuoteEvent("USD_JPY", time, Decimal("110.605"), Decimal("110.621")))
+    return events
+
+
+class Failing(BatchSignalStrategy):
+    def gen_signals(self, instrument, timestamps, bids, asks):
+        raise RuntimeError("gen_signals failed")
+
+
+class HalfUnit(SizingStrategy):
+    def gen_order(self, signal):
+        # 1 when rounding half up, as the cli does, 0 when rounding half to even, decimal's default
+        return OrderEvent(signal.instrument, signal.time, Decimal("0.5").quantize(Decimal(1)), None)
+
+
+class TestParallelBacktest:
+    def test_results_and_progress(self, tmp_path):
+        with HistoryWriter(tmp_path / "sample.hist") as writer:
+            for event in sample_events(500):
+                writer.write(event)
+        progress = {}
+        pairs = [(example_strategy.TestSignalStrategy(), example_strategy.TestSizingStrategy()) for _ in range(3)]
+        results = run_backtests(
+            pairs, tmp_path / "sample.hist", max_workers=2, on_progress=progress.__setitem__, report_every=100
+        )
+        assert [result.index for result in results] == [0, 1, 2]
+        for result in results:
+            assert result.label == "TestSignalStrategy, TestSizingStrategy"
+            assert (result.events, result.signals, result.orders, result.order_events) == (1000, 100, 20, None)
+        assert progress == {0: 1000, 1: 1000, 2: 1000}
+
+    def test_text_history(self, tmp_path):
+        with TextHistoryWriter(tmp_path / "sample.txt") as writer:
+            for event in sample_events(50):
+                writer.write(event)
+        (result,) = run_backtests(
+            [(example_strategy.TestSignalStrategy(), example_strategy.TestSizingStrategy())], tmp_path / "sample.txt"
+        )
+        assert (result.events, result.signals) == (100, 10)
+        (result,) = run_backtests(
+            [(example_strategy.TestSignalStrategy(), example_strategy.TestSizingStrategy())],
+            tmp_path / "sample.txt",
+            keep_orders=True,
+        )
+        assert len(result.order_events) == result.orders > 0
+        assert not (tmp_path / "sample.hist").exists()
+
+    def test_strategy_errors_propagate(self, tmp_path):
+        with HistoryWriter(tmp_path / "sample.hist") as writer:
+            for event in sample_events(50):
+                writer.write(event)
+        with pytest.raises(RuntimeError, match="gen_signals failed"):
+            run_backtests([(Failing(), example_strategy.TestSizingStrategy())], tmp_path / "sample.hist")
+
+    def test_workers_share_the_decimal_context(self, tmp_path):
+        with HistoryWriter(tmp_path / "sample.hist") as writer:
+            for event in sample_events(50):
+                writer.write(event)
+        with localcontext() as context:
+            context.rounding = ROUND_HALF_UP
+            (result,) = run_backtests(
+                [(example_strategy.TestSignalStrategy(), HalfUnit())], tmp_path / "sample.hist", keep_orders=True
+            )
+        assert {order.units for order in result.order_events} == {Decimal(1)}
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from peoples_advisor.backtest.common.history import HistoryWriter
+from peoples_advisor.backtest.common.sweep import parameter_grid, run_sweep
+from peoples_advisor.event.event import OrderEvent, PriceEvent, SignalEvent
+from peoples_advisor.signal.signal import SignalStrategy
+from peoples_advisor.sizing.sizing import SizingStrategy
+
+
+class EveryNthPrice(SignalStrategy):
+    def __init__(self, every=1):
+        super().__init__()
+        self.every = every
+        self.ticks = 0
+
+    def gen_signal(self, price):
+        self.ticks += 1
+        if self.ticks % self.every == 0:
+            return SignalEvent(price.instrument, price.time, "BUY")
+
+
+class FixedUnits(SizingStrategy):
+    def __init__(self, units=1, skip=False):
+        super().__init__()
+        self.units = units
+        self.skip = skip
+
+    def gen_order(self, signal):
+        if not self.skip:
+            return OrderEvent(signal.instrument, signal.time, Decimal(self.units), None)
+
+
+def orders_placed(result):
+    return result.orders
+
+
+class TestSweep:
+    def test_parameter_grid(self):
+        assert parameter_grid(None) == [{}]
+        assert parameter_grid({"a": [1, 2], "b": ["x", "y"]}) == [
+            {"a": 1, "b": "x"},
+            {"a": 1, "b": "y"},
+            {"a": 2, "b": "x"},
+            {"a": 2, "b": "y"},
+        ]
+
+    def test_ranked_results(self, tmp_path):
+        start = datetime(2021, 4, 1, 12)
+        with HistoryWriter(tmp_path / "sample.hist") as writer:
+            for i in range(120):
+                writer.write(PriceEvent("EUR_USD", start + timedelta(seconds=5 * i), Decimal("1.1"), Decimal("1.2")))
+        results = run_sweep(
+            EveryNthPrice,
+            FixedUnits,
+            tmp_path / "sample.hist",
+            orders_placed,
+            sig_grid={"every": [10, 2, 5]},
+            size_grid={"skip": [True, False]},
+            max_workers=2,
+        )
+        assert len(results) == 6
+        assert [result.params for result in results[:3]] == [
+            {"every": 2, "skip": False},
+            {"every": 5, "skip": False},
+            {"every": 10, "skip": False},
+        ]
+        assert [result.score for result in results] == [60, 24, 12, 0, 0, 0]
+        assert [result.result.signals for result in results[3:]] == [12, 60, 24]
@@ -0,0 +1,46 @@
+from decimal import Decimal
+
+import pytest
+from peoples_advisor.common.fixed_price import FixedPrice, mid_price, scaled_value
+
+
+class TestFixedPrice:
+    @pytest.mark.parametrize("text", ["1.17501", "110.101", "1.50", "-0.00012", ".5", "12", "1E-3"])
+    def test_round_trip(self, text):
+        price = FixedPrice.from_str(text)
+        assert price.decimal == Decimal(text)
+        assert str(price) == str(Decimal(text)) or "E" in text
+        assert FixedPrice.from_decimal(price.decimal) == price
+        assert hash(price) == hash(Decimal(text))
+
+    def test_places(self):
+        price = FixedPrice.from_str("1.17501")
+        assert (price.value, price.places) == (117501, 5)
+        assert FixedPrice.from_str("110.101").places == 3
+        assert FixedPrice.from_str("1.17515") - price == FixedPrice(14, 5)
+
+    def test_integer_math(self):
+        bid, ask = FixedPrice.from_str("1.17501"), FixedPrice.from_str("1.17512")
+        assert bid < ask and ask >= bid and bid != ask
+        assert bid + ask == FixedPrice(235013, 5)
+        assert FixedPrice.from_str("1.1") + FixedPrice.from_str("0.25") == FixedPrice(135, 2)
+        assert bid * 2 == 2 * bid == Decimal("2.35002")
+        assert mid_price(bid, ask) == FixedPrice(1175065, 6)
+        assert -bid == FixedPrice(-117501, 5) and abs(-bid) == bid
+
+    def test_mixed_with_decimal(self):
+        price = FixedPrice.from_str("1.25")
+        assert price == Decimal("1.250") and price < Decimal("1.3") and price == 1.25
+        assert isinstance(Decimal("2") - price, Decimal) and Decimal("2") - price == Decimal("0.75")
+        assert Decimal("100") * price == Decimal("125")
+        assert 1 / price == Decimal("0.8")
+        assert mid_price(Decimal("1.1"), Decimal("1.2")) == Decimal("1.15")
+
+    def test_exact_scaling(self):
+        assert FixedPrice.from_str("1.1").rescale(3) == FixedPrice(1100, 3)
+        assert FixedPrice(1100, 3).rescale(1).value == 11
+        assert scaled_value(Decimal("1.1"), 5) == 110000
+        with pytest.raises(ValueError):
+            FixedPrice.from_str("1.17501").rescale(3)
+        with pytest.raises(ValueError):
+            FixedPrice.from_decimal(Decimal("1.17501"), 3)
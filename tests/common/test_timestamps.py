@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+
+import pytest
+from peoples_advisor.common.timestamps import (
+    datetime_to_ns,
+    ns_to_datetime,
+    parse_timestamps,
+    rfc3339_to_ns,
+    time_to_ns,
+    unix_to_ns,
+)
+from peoples_advisor.event.event import PriceEvent, event_from_repr
+
+NOON = int(datetime(2021, 4, 1, 12, tzinfo=timezone.utc).timestamp()) * 1_000_000_000
+
+
+class TestTimestamps:
+    @pytest.mark.parametrize(
+        "text, nanoseconds",
+        [
+            ("2021-04-01T12:00:00.123456789Z", 123456789),
+            ("2021-04-01T12:00:00.5Z", 500000000),
+            ("2021-04-01T12:00:00Z", 0),
+            ("2021-04-01T12:00:00.1234567891Z", 123456789),
+            ("2021-04-01T14:00:00.25+02:00", 250000000),
+            ("2021-04-01T06:30:00.000000001-05:30", 1),
+        ],
+    )
+    def test_rfc3339(self, text, nanoseconds):
+        assert rfc3339_to_ns(text) == NOON + nanoseconds
+        assert time_to_ns(text, "RFC3339") == NOON + nanoseconds
+
+    def test_unix(self):
+        seconds = NOON // 1_000_000_000
+        assert unix_to_ns(f"{seconds}.123456789") == NOON + 123456789
+        assert unix_to_ns(f"{seconds}.5") == time_to_ns(f"{seconds}.500000000", "UNIX") == NOON + 500000000
+        assert unix_to_ns(str(seconds)) == NOON
+
+    def test_batch(self):
+        times = [f"2021-04-01T12:{minute:02}:30.000000001Z" for minute in range(0, 60, 7)]
+        timestamps = parse_timestamps(times, "RFC3339")
+        assert (timestamps.typecode, list(timestamps)) == ("q", [rfc3339_to_ns(time) for time in times])
+        numpy = pytest.importorskip("numpy")
+        assert numpy.frombuffer(timestamps, dtype=numpy.int64)[-1] == NOON + 56 * 60_000_000_000 + 30_000_000_001
+
+    def test_datetime_round_trip(self):
+        time = datetime(2021, 4, 1, 12, 30, 15, 250000)
+        assert ns_to_datetime(datetime_to_ns(time)) == time
+        assert ns_to_datetime(datetime_to_ns(time) + 999) == time
+
+
+class TestLazyTime:
+    def test_time_from_timestamp(self):
+        event = PriceEvent("EUR_USD", NOON + 1500, None, None)
+        assert event._time is None
+        assert event.time == ns_to_datetime(NOON + 1500) and event.time is event.time
+        assert event.timestamp == NOON + 1500
+
+    def test_timestamp_from_time(self):
+        time = datetime(2021, 4, 1, 12, 0, 0, 250000)
+        event = PriceEvent("EUR_USD", time, None, None)
+        assert (event.time, event.timestamp) == (time, datetime_to_ns(time))
+        event.time = NOON
+        assert (event.time, event.timestamp) == (ns_to_datetime(NOON), NOON)
+
+    def test_parsed_events_are_lazy(self):
+        event = event_from_repr(f"PRICE,EUR_USD,{NOON // 1_000_000_000},1.17501,1.17512")
+        assert (event._time, event.timestamp) == (None, NOON)
+        assert event.time == datetime.fromtimestamp(NOON // 1_000_000_000)
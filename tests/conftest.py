@@ -0,0 +1,23 @@
+import pytest
+
+from peoples_advisor.api.oanda.oanda_server import OandaStandInServer
+
+
+@pytest.fixture
+def oanda_server():
+    """
+    A local stand-in for the OANDA v3 api, see OandaStandInServer, reconfigure it through its attributes
+    """
+    with OandaStandInServer(heartbeat_interval=0.2) as server:
+        yield server
+
+
+@pytest.fixture
+def oanda_api(oanda_server):
+    """
+    An OandaApi pointed at oanda_server, retrying quickly
+    """
+    api = oanda_server.api(datetime_format="UNIX")
+    api.session.backoff_factor = 0.01
+    yield api
+    api.session.close()
@@ -0,0 +1,128 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from peoples_advisor.common.fixed_price import FixedPrice
+from peoples_advisor.event.event import (
+    BarEvent,
+    EventQueue,
+    EventType,
+    ExitEvent,
+    PriceEvent,
+    QuoteEvent,
+    SignalEvent,
+    StartEvent,
+    StopEvent,
+    event_from_repr,
+    events_from_reprs,
+)
+
+
+class TestEvents:
+    def test_attributes(self):
+        time = datetime(2021, 4, 1, 12)
+        event = PriceEvent("EUR_USD", time, Decimal("1.17501"), Decimal("1.17512"))
+        assert (event.instrument, event.time, event.bid, event.ask) == (
+            "EUR_USD",
+            time,
+            Decimal("1.17501"),
+            Decimal("1.17512"),
+        )
+        assert (event.type, event.priority, event.code) == ("PRICE", 4, EventType.PRICE)
+        assert (StartEvent().type, StartEvent().priority, StartEvent().code) == ("START", 1, EventType.START)
+        assert not hasattr(event, "__dict__")
+
+    def test_instruments_are_shared(self):
+        time = datetime(2021, 4, 1, 12)
+        first = QuoteEvent("".join(["USD", "_JPY"]), time, Decimal("110.101"), Decimal("110.112"))
+        second = event_from_repr(f"QUOTE,USD_JPY,{int(time.timestamp())},110.101,110.112")
+        assert first.instrument is second.instrument
+
+    def test_repr_round_trip(self):
+        time = datetime(2021, 4, 1, 12)
+        for event in (
+            PriceEvent("EUR_USD", time, Decimal("1.17501"), Decimal("1.17512")),
+            SignalEvent("EUR_USD", time, "BUY", {"reason": "cross, up"}),
+            BarEvent("EUR_USD", "M5", time, *map(Decimal, ["1.1", "1.3", "1.0", "1.2"]), 12),
+        ):
+            assert repr(event_from_repr(repr(event))) == repr(event)
+            assert repr(type(event).from_repr(repr(event))) == repr(event)
+
+
+def event_fields(event):
+    # Everything a repr carries, to compare parsed events by value
+    fields = [event.type]
+    for name in (
+        "instrument",
+        "timestamp",
+        "granularity",
+        "side",
+        "info",
+        "bid",
+        "ask",
+        "open",
+        "high",
+        "low",
+        "close",
+    ):
+        if hasattr(event, name):
+            value = getattr(event, name)
+            fields.append(value.decimal if isinstance(value, FixedPrice) else value)
+    if hasattr(event, "ticks"):
+        fields.append(event.ticks)
+    return fields
+
+
+class TestEventParsing:
+    time = datetime(2021, 4, 1, 12)
+    events = [
+        PriceEvent("EUR_USD", time, FixedPrice(117501, 5), FixedPrice(117512, 5)),
+        QuoteEvent("USD_JPY", time, Decimal("110.101"), Decimal("110.112")),
+        BarEvent("GBP_USD", "M5", time, *map(Decimal, ["1.381", "1.383", "1.380", "1.382"]), 12),
+        SignalEvent("EUR_USD", time, "BUY", {"reason": "cross, up", "levels": [1.1, -2], "nested": {"ok": True}}),
+        SignalEvent("EUR_USD", time, "SELL", None),
+        StartEvent(),
+        StopEvent(),
+        ExitEvent(),
+    ]
+
+    def test_round_trip_every_type(self):
+        for event in self.events:
+            parsed = event_from_repr(repr(event))
+            assert type(parsed) is type(event)
+            assert event_fields(parsed) == event_fields(event)
+            assert repr(parsed) == repr(event)
+
+    def test_signal_info_is_a_literal(self):
+        parsed = event_from_repr(repr(self.events[3]))
+        assert parsed.info == {"reason": "cross, up", "levels": [1.1, -2], "nested": {"ok": True}}
+        assert parsed.info is not self.events[3].info
+
+    def test_block_matches_per_line(self):
+        lines = [repr(event) + "\n" for event in self.events] * 3
+        block = events_from_reprs(lines)
+        single = [event_from_repr(line) for line in lines]
+        assert [type(event) for event in block] == [type(event) for event in single]
+        assert [event_fields(event) for event in block] == [event_fields(event) for event in single]
+
+    def test_unknown_type_raises(self):
+        with pytest.raises(ValueError, match="TICK"):
+            event_from_repr("TICK,EUR_USD,1617278400,1.1,1.2")
+        with pytest.raises(ValueError, match="TICK"):
+            events_from_reprs([repr(self.events[0]), "TICK,EUR_USD,1617278400,1.1,1.2"])
+
+
+class TestEventQueue:
+    def test_priority_then_fifo(self):
+        queue = EventQueue()
+        prices = [PriceEvent("EUR_USD", datetime(2021, 4, 1, 12, i), Decimal("1.1"), Decimal("1.2")) for i in range(50)]
+        for price in prices[:25]:
+            queue.put(price)
+        queue.put(StopEvent())
+        queue.put(StartEvent())
+        for price in prices[25:]:
+            queue.put(price)
+        assert queue.get().type == "START"
+        assert [queue.get() for _ in prices] == prices
+        assert queue.get().type == "STOP"
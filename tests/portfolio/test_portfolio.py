@@ -0,0 +1,110 @@
+import random
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from peoples_advisor.common.common import PAError
+from peoples_advisor.common.fixed_price import FixedPrice
+from peoples_advisor.event.event import PriceEvent, QuoteEvent
+from peoples_advisor.portfolio.forex.common.common import ConversionTable, Portfolio
+
+TIME = datetime(2021, 4, 1, 12)
+RATES = {"EUR_USD": Decimal("0.02"), "EUR_GBP": Decimal("0.05"), "USD_JPY": Decimal("0.04")}
+INSTRUMENTS = ["EUR_USD", "EUR_GBP", "USD_JPY", "GBP_USD"]
+
+
+def tick(instrument, bid, ask, event_class=PriceEvent):
+    return event_class(instrument, TIME, FixedPrice.from_str(bid), FixedPrice.from_str(ask))
+
+
+def recomputed(portfolio):
+    # Every lot valued from scratch, the way the properties used to be computed
+    unrealized, margin = Decimal(0), Decimal(0)
+    for instrument, positions in portfolio.positions.items():
+        price = portfolio.prices[instrument]
+        profit = sum(units * ((price["bid"] if units > 0 else price["ask"]) - entry) for units, entry in positions)
+        unrealized += portfolio._convert(portfolio.home_cur, portfolio.quote_currency(instrument), profit)
+        for units, _ in positions:
+            margin += portfolio.required_margin(instrument, units)
+    return unrealized, margin
+
+
+class TestConversionTable:
+    def test_routes_and_rates(self):
+        table = ConversionTable(["GBP_USD", "USD_JPY"])
+        assert table.routes[("JPY", "USD")] == ("USD_JPY", True)
+        assert table.routes[("GBP", "USD")] == ("GBP_USD", False)
+        with pytest.raises(PAError):
+            table.convert("GBP", "USD", Decimal(1))
+        table.update("GBP_USD", FixedPrice.from_str("1.30000"), FixedPrice.from_str("1.30010"))
+        table.update("USD_JPY", FixedPrice.from_str("100.000"), FixedPrice.from_str("125.000"))
+        assert table.convert("GBP", "USD", Decimal(10)) == Decimal("13.0000")
+        assert table.convert("GBP", "USD", Decimal(-10)) == Decimal("-13.0010")
+        assert table.convert("USD", "GBP", Decimal(13)) == Decimal(13) / Decimal("1.30010")
+        assert table.convert("JPY", "USD", Decimal(1000)) == Decimal("8")
+        assert table.convert("JPY", "USD", Decimal(-1000)) == Decimal("-10")
+        assert table.convert("USD", "USD", Decimal(5)) == Decimal(5)
+        with pytest.raises(PAError):
+            table.convert("GBP", "JPY", Decimal(1))
+
+
+class TestPortfolio:
+    def test_long_and_short(self):
+        portfolio = Portfolio(Decimal(10000), "USD", RATES, INSTRUMENTS)
+        portfolio.update_price(tick("EUR_USD", "1.10000", "1.10010"))
+        portfolio.add_position("EUR_USD", Decimal(1000), Decimal("1.10010"))
+        portfolio.add_position("EUR_USD", Decimal(-500), Decimal("1.10000"))
+        portfolio.update_price(tick("EUR_USD", "1.12000", "1.12010"))
+        # The long lot gains 1000 * 0.0199, the short lot loses 500 * 0.0201
+        assert portfolio.unrealized_pl == Decimal("9.85")
+        assert portfolio.equity == Decimal("10009.85")
+        # 1500 EUR of gross units at a 2% margin rate, valued at the EUR_USD bid
+        assert portfolio.used_margin == Decimal("33.6")
+        assert portfolio.free_margin == portfolio.equity - portfolio.used_margin
+        assert portfolio.margin_level == portfolio.equity / portfolio.used_margin * 100
+
+    def test_conversion_prices(self):
+        portfolio = Portfolio(Decimal(10000), "USD", RATES, INSTRUMENTS)
+        portfolio.update_price(tick("EUR_GBP", "0.85000", "0.85010"))
+        portfolio.add_position("EUR_GBP", Decimal(1000), Decimal("0.85010"))
+        portfolio.update_price(tick("EUR_GBP", "0.86010", "0.86020"))
+        with pytest.raises(PAError):
+            portfolio.unrealized_pl
+        portfolio.update_price(tick("GBP_USD", "1.30000", "1.30010", QuoteEvent))
+        portfolio.update_price(tick("EUR_USD", "1.10000", "1.10010", QuoteEvent))
+        assert portfolio.unrealized_pl == Decimal("13.0000")
+        portfolio.update_price(tick("GBP_USD", "1.40000", "1.40010", QuoteEvent))
+        assert portfolio.unrealized_pl == Decimal("14.0000")
+        assert portfolio.used_margin == Decimal("55.0000")
+
+    def test_matches_recomputation(self):
+        rng = random.Random(5)
+        portfolio = Portfolio(Decimal(10000), "USD", RATES, INSTRUMENTS)
+        mids = {"EUR_USD": 1.1, "EUR_GBP": 0.85, "USD_JPY": 110.0, "GBP_USD": 1.3}
+        for step in range(2000):
+            instrument = rng.choice(list(mids))
+            mids[instrument] *= 1 + rng.gauss(0, 0.001)
+            places = 3 if "JPY" in instrument else 5
+            bid = f"{mids[instrument]:.{places}f}"
+            ask = f"{mids[instrument] + 10 ** -places * 12:.{places}f}"
+            portfolio.update_price(tick(instrument, bid, ask))
+            if instrument in RATES and rng.random() < 0.3:
+                if portfolio.positions.get(instrument) and rng.random() < 0.3:
+                    portfolio.remove_position(instrument, rng.randrange(len(portfolio.positions[instrument])))
+                else:
+                    units = Decimal(rng.choice([-1, 1]) * rng.randrange(1, 10000))
+                    portfolio.add_position(instrument, units, Decimal(ask if units > 0 else bid))
+            if len(portfolio.prices) == len(mids) and step % 50 == 0:
+                unrealized, margin = recomputed(portfolio)
+                assert portfolio.unrealized_pl == pytest.approx(unrealized, rel=Decimal("1e-20"), abs=Decimal("1e-18"))
+                assert portfolio.used_margin == pytest.approx(margin, rel=Decimal("1e-20"))
+
+    def test_closing_everything(self):
+        portfolio = Portfolio(Decimal(10000), "USD", RATES, INSTRUMENTS)
+        portfolio.update_price(tick("USD_JPY", "110.101", "110.113"))
+        for units in (Decimal(300), Decimal(-700), Decimal(1000)):
+            portfolio.add_position("USD_JPY", units, Decimal("110.107"))
+        while portfolio.positions:
+            portfolio.remove_position("USD_JPY", 0)
+        assert (portfolio.unrealized_pl, portfolio.used_margin, portfolio.margin_level) == (0, 0, 0)
+        assert str(portfolio.unrealized_pl) == "0"
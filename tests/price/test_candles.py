@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from peoples_advisor.common.fixed_price import FixedPrice
+from peoples_advisor.common.timestamps import datetime_to_ns
+from peoples_advisor.event.event import PriceEvent
+from peoples_advisor.price.common.common import CandleAggregator
+
+START = datetime(2021, 4, 1, 12)
+
+
+def price(instrument, seconds, mid):
+    mid = Decimal(mid)
+    return PriceEvent(
+        instrument, START + timedelta(seconds=seconds), mid - Decimal("0.00005"), mid + Decimal("0.00005")
+    )
+
+
+class TestCandleAggregator:
+    def test_ohlc(self):
+        aggregator = CandleAggregator(["M1"])
+        for seconds, mid in [(0, "1.1"), (10, "1.3"), (20, "1.0"), (59, "1.2")]:
+            assert aggregator.update(price("EUR_USD", seconds, mid)) == []
+        (bar,) = aggregator.update(price("EUR_USD", 60, "1.25"))
+        assert (bar.instrument, bar.granularity, bar.time) == ("EUR_USD", "M1", START)
+        assert (bar.open, bar.high, bar.low, bar.close, bar.ticks) == (
+            Decimal("1.1"),
+            Decimal("1.3"),
+            Decimal("1.0"),
+            Decimal("1.2"),
+            4,
+        )
+
+    def test_fixed_prices(self):
+        aggregator = CandleAggregator(["S5"])
+        for seconds, bid, ask in [(0, 117501, 117512), (1, 117490, 117500), (2, 117520, 117531)]:
+            aggregator.update(
+                PriceEvent("EUR_USD", START + timedelta(seconds=seconds), FixedPrice(bid, 5), FixedPrice(ask, 5))
+            )
+        (bar,) = aggregator.close_due(datetime_to_ns(START + timedelta(seconds=5)))
+        assert (bar.open, bar.high, bar.low, bar.close) == (
+            FixedPrice(1175065, 6),
+            FixedPrice(1175255, 6),
+            FixedPrice(1174950, 6),
+            FixedPrice(1175255, 6),
+        )
+        assert str(bar.low) == "1.174950"
+
+    def test_mixed_places_and_decimals(self):
+        aggregator = CandleAggregator(["S5", "M1"])
+        ticks = [
+            (0, FixedPrice(117501, 5), FixedPrice(117512, 5)),
+            # More places than the candle opened with, and bid and ask of different places
+            (1, FixedPrice(1175301, 6), FixedPrice(1175309, 6)),
+            (2, FixedPrice(11749, 4), FixedPrice(117500, 5)),
+            (3, FixedPrice(117520, 5), FixedPrice(117524, 5)),
+        ]
+        for seconds, bid, ask in ticks:
+            aggregator.update(PriceEvent("EUR_USD", START + timedelta(seconds=seconds), bid, ask))
+        # A Decimal tick in the next S5 candle, the M1 candle turns to Decimals
+        (s5,) = aggregator.update(
+            PriceEvent("EUR_USD", START + timedelta(seconds=6), Decimal("1.17602"), FixedPrice(117605, 5))
+        )
+        aggregator.update(PriceEvent("EUR_USD", START + timedelta(seconds=7), FixedPrice(117401, 5), Decimal("1.1741")))
+        s5_next, m1 = aggregator.close_due(datetime_to_ns(START + timedelta(minutes=1)))
+        assert (s5.open, s5.high, s5.low, s5.close) == (
+            FixedPrice(11750650, 7),
+            FixedPrice(11753050, 7),
+            FixedPrice(11749500, 7),
+            FixedPrice(11752200, 7),
+        )
+        assert all(isinstance(value, FixedPrice) for value in (s5.open, s5.high, s5.low, s5.close))
+        assert (s5_next.open, s5_next.high, s5_next.low, s5_next.close, s5_next.ticks) == (
+            Decimal("1.176035"),
+            Decimal("1.176035"),
+            Decimal("1.174055"),
+            Decimal("1.174055"),
+            2,
+        )
+        assert (m1.open, m1.high, m1.low, m1.close, m1.ticks) == (
+            Decimal("1.1750650"),
+            Decimal("1.176035"),
+            Decimal("1.174055"),
+            Decimal("1.174055"),
+            6,
+        )
+        assert all(isinstance(value, Decimal) for value in (m1.open, m1.high, m1.low, m1.close))
+
+    def test_granularities_and_quiet_instruments(self):
+        aggregator = CandleAggregator(["M1", "M5", "M1"])
+        aggregator.update(price("EUR_USD", 30, "1.1"))
+        aggregator.update(price("GBP_USD", 45, "1.3"))
+        closed = aggregator.update(price("EUR_USD", 200, "1.2"))
+        # The GBP_USD candle is closed by a EUR_USD price, the M5 candles are still open
+        assert [(bar.instrument, bar.granularity, bar.time) for bar in closed] == [
+            ("EUR_USD", "M1", START),
+            ("GBP_USD", "M1", START),
+        ]
+        closed = aggregator.update(price("GBP_USD", 300, "1.4"))
+        assert [(bar.instrument, bar.granularity, bar.time, bar.ticks) for bar in closed] == [
+            ("EUR_USD", "M1", START + timedelta(minutes=3), 1),
+            ("EUR_USD", "M5", START, 2),
+            ("GBP_USD", "M5", START, 1),
+        ]
+
+    def test_unsupported_granularity(self):
+        with pytest.raises(ValueError):
+            CandleAggregator(["M1", "D"])
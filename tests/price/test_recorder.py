@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from peoples_advisor.backtest.common.history import history_events
+from peoples_advisor.common.fixed_price import FixedPrice
+from peoples_advisor.event.event import PriceEvent, QuoteEvent
+from peoples_advisor.price.common.recorder import COLLECTING_FILENAME, TickRecorder
+
+START = datetime(2021, 4, 1, 12)
+
+
+def ticks(count):
+    events = []
+    for i in range(count):
+        event_class = PriceEvent if i % 3 else QuoteEvent
+        time = START + timedelta(seconds=i)
+        events.append(event_class("EUR_USD", time, FixedPrice(117500 + i, 5), FixedPrice(117514 + i, 5)))
+    return events
+
+
+class TestTickRecorder:
+    def test_recorded_history(self, tmp_path):
+        events = ticks(50)
+        with TickRecorder(tmp_path, flush_interval=0.01) as recorder:
+            for event in events:
+                recorder.record(event)
+        (filepath,) = recorder.files
+        assert filepath.name == "LIVE-[2021.04.01T12.00.00-2021.04.01T12.00.49].txt"
+        assert [repr(event) for event in history_events(filepath)] == [repr(event) for event in events]
+        assert (recorder.count, recorder.dropped) == (50, 0)
+        assert not (tmp_path / COLLECTING_FILENAME).exists()
+
+    def test_rotation(self, tmp_path):
+        events = ticks(30)
+        with TickRecorder(tmp_path, flush_interval=60, max_bytes=200) as recorder:
+            for start in range(0, 30, 10):
+                for event in events[start : start + 10]:
+                    recorder.record(event)
+                # Write each group of ten as if the flush interval had passed
+                recorder._write()
+        assert len(recorder.files) == 3
+        recorded = [event for filepath in recorder.files for event in history_events(filepath)]
+        assert [repr(event) for event in recorded] == [repr(event) for event in events]
+
+    def test_full_buffer_drops(self, tmp_path):
+        with TickRecorder(tmp_path, flush_interval=60, buffer_size=4) as recorder:
+            for event in ticks(10):
+                recorder.record(event)
+        assert (recorder.count, recorder.dropped) == (4, 6)
+
+    def test_nothing_recorded(self, tmp_path):
+        with TickRecorder(tmp_path / "history") as recorder:
+            pass
+        assert recorder.files == [] and list((tmp_path / "history").iterdir()) == []
@@ -0,0 +1,102 @@
+import random
+from decimal import Decimal
+from statistics import pstdev
+
+import pytest
+from peoples_advisor.signal.indicators import (
+    ATR,
+    EMA,
+    SMA,
+    BollingerBands,
+    InstrumentIndicators,
+    RingBuffer,
+    RollingStd,
+    atr,
+    bollinger_bands,
+    ema,
+    rolling_std,
+    sma,
+)
+
+numpy = pytest.importorskip("numpy")
+
+
+def random_walk(count, start=1.17500, seed=7):
+    rng = random.Random(seed)
+    prices, price = [], start
+    for _ in range(count):
+        price += rng.gauss(0, 0.0002)
+        prices.append(price)
+    return prices
+
+
+def stream(indicator, values):
+    return numpy.array([numpy.nan if value is None else value for value in map(indicator.update, values)])
+
+
+class TestRingBuffer:
+    def test_window(self):
+        window = RingBuffer(3)
+        assert [window.push(value) for value in [1, 2, 3, 4, 5]] == [None, None, None, 1, 2]
+        assert list(window) == [3, 4, 5]
+        assert (window[0], window[-1], len(window), window.full) == (3, 5, 3, True)
+        with pytest.raises(IndexError):
+            window[3]
+
+
+class TestIndicators:
+    def test_sma(self):
+        average = SMA(3)
+        assert [average.update(value) for value in [1, 2, 3, 4]] == [None, None, 2.0, 3.0]
+        assert average.ready
+        prices = random_walk(1000)
+        numpy.testing.assert_allclose(stream(SMA(20), prices), sma(prices, 20), rtol=1e-12)
+
+    def test_ema(self):
+        average = EMA(3)
+        assert [average.update(value) for value in [1, 2, 3, 5]] == [None, None, 2.0, 3.5]
+        prices = random_walk(5000)
+        for period in (1, 2, 20, 500):
+            numpy.testing.assert_allclose(stream(EMA(period), prices), ema(prices, period), rtol=1e-12)
+
+    def test_rolling_std(self):
+        prices = random_walk(3000)
+        deviation = RollingStd(50)
+        streamed = stream(deviation, prices)
+        assert deviation.value == pytest.approx(pstdev(prices[-50:]), rel=1e-9)
+        numpy.testing.assert_allclose(streamed, rolling_std(prices, 50), rtol=1e-9)
+        numpy.testing.assert_allclose(
+            stream(RollingStd(50, ddof=1), prices), rolling_std(prices, 50, ddof=1), rtol=1e-9
+        )
+
+    def test_bollinger_bands(self):
+        prices = random_walk(500)
+        bands = BollingerBands(20, 2.5)
+        streamed = [bands.update(price) or (numpy.nan,) * 3 for price in prices]
+        for streamed_band, band in zip(zip(*streamed), bollinger_bands(prices, 20, 2.5)):
+            numpy.testing.assert_allclose(streamed_band, band, rtol=1e-9)
+        lower, middle, upper = bands.value
+        assert lower < middle < upper
+
+    def test_atr(self):
+        closes = random_walk(400)
+        highs = [close + 0.0003 for close in closes]
+        lows = [close - 0.0002 for close in closes]
+        average = ATR(14)
+        streamed = numpy.array(
+            [numpy.nan if value is None else value for value in map(average.update, highs, lows, closes)]
+        )
+        numpy.testing.assert_allclose(streamed, atr(highs, lows, closes, 14), rtol=1e-9)
+        assert numpy.isnan(streamed[:13]).all() and not numpy.isnan(streamed[13:]).any()
+
+    def test_short_input(self):
+        assert numpy.isnan(sma([1.0, 2.0], 3)).all()
+        assert numpy.isnan(ema([1.0, 2.0], 3)).all()
+
+    def test_instrument_indicators(self):
+        averages = InstrumentIndicators(lambda: SMA(2))
+        averages["EUR_USD"].update(Decimal("1.1"))
+        averages["GBP_USD"].update(Decimal("1.3"))
+        assert averages["EUR_USD"].update(Decimal("1.2")) == pytest.approx(1.15)
+        assert not averages["GBP_USD"].ready
+        assert sorted(averages) == ["EUR_USD", "GBP_USD"]